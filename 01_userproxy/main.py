@@ -1,5 +1,5 @@
-import os
 import sys
+from pathlib import Path
 
 # Import the autogen package for creating agents
 import autogen
@@ -9,8 +9,10 @@ import autogen
 # Enable Debug Logging
 # logging.basicConfig(level=logging.DEBUG)
 
-# Append the project root to sys.path for module discovery
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+# Add the project root to sys.path once for module discovery
+PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
 # Import configuration settings from model_config module
 from model_config import *
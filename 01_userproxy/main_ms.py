@@ -3,9 +3,10 @@ import sys
 
 from dotenv import load_dotenv
 
-from autogen_agentchat.agents import AssistantAgent, UserProxyAgent
+from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import Response
 from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_agentchat.messages import TextMessage
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent, TextMessage
 from autogen_core import CancellationToken
 
 import asyncio
@@ -28,12 +29,18 @@ assistant = AssistantAgent(
 message = TextMessage(content="Tell me a joke.", source="user")
 
 
-agent = UserProxyAgent("User")
-
 async def main():
-    response = await agent.on_messages([message], cancellation_token=CancellationToken())
-    assert isinstance(response.chat_message, TextMessage)
-    print(f"Your query: {response.chat_message.content}")
+    # Stream the assistant's reply token by token instead of waiting for the full completion
+    response = None
+    async for chunk in assistant.on_messages_stream(
+        [message], cancellation_token=CancellationToken()
+    ):
+        if isinstance(chunk, ModelClientStreamingChunkEvent):
+            print(chunk.content, end="", flush=True)
+        elif isinstance(chunk, Response):
+            response = chunk
+    print()
+    assert response is not None and isinstance(response.chat_message, TextMessage)
 
 if __name__ == "__main__":
     asyncio.run(main())
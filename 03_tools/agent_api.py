@@ -1,19 +1,71 @@
+import asyncio
 import os
 import sys
-import json
+from pathlib import Path
+import orjson
 from typing import Dict, Any
 
 import autogen
 from tool_api import APITool
+from cache import CachedAssistant
 
-# Append the project root directory to sys.path for module discovery
-# This enables absolute imports (e.g., model_config) from the project root
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+# Add the project root to sys.path once for module discovery
+PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
 # Import configuration settings from model_config module
 from model_config import *
 
 
+# Function spec exposed to the assistant for making API calls
+_API_FUNCTIONS = [
+    {
+        "name": "query_api",
+        "description": "Make API requests to check order or billing status",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "endpoint": {
+                    "type": "string",
+                    "description": "API endpoint to call",
+                },
+                "method": {
+                    "type": "string",
+                    "description": "HTTP method (GET, POST, PUT, DELETE)",
+                },
+                "params": {
+                    "type": "object",
+                    "description": "Query parameters for the request",
+                },
+                "data": {
+                    "type": "object",
+                    "description": "Data payload for POST/PUT requests",
+                },
+            },
+            "required": ["endpoint", "method"],
+        },
+    }
+]
+
+# Pretty-print API responses for human readers; the LLM is served the raw body otherwise
+PRETTY_API_RESPONSES = os.getenv("PRETTY_API_RESPONSES", "").lower() in ("1", "true")
+
+# LLM config with the function spec, built once and shared by every assistant
+_API_LLM_CONFIG = {**llm_config, "functions": _API_FUNCTIONS}
+
+
+def _is_termination_msg(msg: Dict[str, Any]) -> bool:
+    """Return True when a message ends with the TERMINATE keyword.
+
+    The system prompts instruct the assistant to end its reply with TERMINATE,
+    so only a short tail of the message is inspected, which keeps the check
+    constant-time regardless of message length.
+    """
+    content = msg.get("content")
+    return content is not None and content[-32:].rstrip().endswith("TERMINATE")
+
+
 class APIAgent:
     """
     APIAgent interfaces with an external API using AutoGen agents.
@@ -35,37 +87,7 @@ class APIAgent:
         # Create the assistant agent with an embedded API function for query handling
         self.assistant = autogen.AssistantAgent(
             name="api_assistant",
-            llm_config={
-                **self.llm_config,
-                "functions": [
-                    {
-                        "name": "query_api",
-                        "description": "Make API requests to check order or billing status",
-                        "parameters": {
-                            "type": "object",
-                            "properties": {
-                                "endpoint": {
-                                    "type": "string",
-                                    "description": "API endpoint to call",
-                                },
-                                "method": {
-                                    "type": "string",
-                                    "description": "HTTP method (GET, POST, PUT, DELETE)",
-                                },
-                                "params": {
-                                    "type": "object",
-                                    "description": "Query parameters for the request",
-                                },
-                                "data": {
-                                    "type": "object",
-                                    "description": "Data payload for POST/PUT requests",
-                                },
-                            },
-                            "required": ["endpoint", "method"],
-                        },
-                    }
-                ],
-            },
+            llm_config=_API_LLM_CONFIG,
             system_message="""You are an assistant that helps users check order and billing status through API calls.
 
 You can:
@@ -82,16 +104,14 @@ End your response with TERMINATE""",
         self.user = autogen.UserProxyAgent(
             name="Admin",
             system_message="A human admin.",
-            is_termination_msg=lambda msg: (
-                msg.get("content") is not None and "TERMINATE" in msg.get("content")
-            ),
+            is_termination_msg=_is_termination_msg,
             human_input_mode="NEVER",  # Disable interactive human input
             code_execution_config=False,  # Code execution is disabled
         )
 
         # Register the API function so the user proxy can execute API calls
         @self.user.register_for_execution()
-        def query_api(
+        async def query_api(
             endpoint: str, method: str, params: Dict = None, data: Dict = None
         ) -> str:
             """
@@ -106,16 +126,25 @@ End your response with TERMINATE""",
             Returns:
                 str: Formatted API response or an error message.
             """
-            result = self.api_tool.run(
-                {"endpoint": endpoint, "method": method, "params": params, "data": data}
+            # The HTTP request blocks, so keep it off the event loop
+            result = await asyncio.to_thread(
+                self.api_tool.run,
+                {"endpoint": endpoint, "method": method, "params": params, "data": data},
             )
 
             # Check for errors in the API response and return an error message if found
             if "error" in result:
                 return f"Error making API request: {result['error']}"
 
-            # Return a formatted API response including status code and response data
-            return f"API Response (Status {result['status_code']}):\n{json.dumps(result['data'], indent=2)}"
+            # Return the API response body as received, avoiding a re-serialization round-trip
+            if PRETTY_API_RESPONSES:
+                body = orjson.dumps(result["data"], option=orjson.OPT_INDENT_2).decode()
+            else:
+                body = result["text"]
+            return f"API Response (Status {result['status_code']}):\n{body}"
+
+        # Serve repeated queries from the exact-match response cache
+        self.cached_chat = CachedAssistant(self.user, self.assistant, self.llm_config)
 
     def process_query(self, user_query: str) -> None:
         """
@@ -124,21 +153,27 @@ End your response with TERMINATE""",
         Parameters:
             user_query (str): The user query to be processed.
         """
-        # Initiate a chat with the assistant agent using the provided user query
-        self.user.initiate_chat(self.assistant, message=user_query)
+        # Initiate a chat with the assistant agent (or replay a cached one);
+        # the chat clears previous history, so the agents need no reset
+        self.cached_chat.initiate_chat(user_query)
+
+    async def process_query_async(self, user_query: str) -> None:
+        """
+        Asynchronously process a user query so several queries can run concurrently.
 
-        # Reset the agents to clear the conversation state for subsequent queries
-        self.user.reset()
-        self.assistant.reset()
+        Parameters:
+            user_query (str): The user query to be processed.
+        """
+        await self.cached_chat.a_initiate_chat(user_query)
 
 
-def main():
-    """
-    Main function to test the APIAgent by processing a series of test queries.
+async def main(max_concurrency: int = 8):
     """
-    # Initialize the APIAgent instance
-    agent = APIAgent()
+    Main function to test the APIAgent by processing a series of test queries concurrently.
 
+    Parameters:
+        max_concurrency (int): Maximum number of queries processed at the same time.
+    """
     # Define a list of test queries to simulate API interactions
     test_queries = [
         "Check the status of order #12345",
@@ -147,13 +182,26 @@ def main():
         "Get all orders from last week",  # Complex query
     ]
 
-    # Process each query and display the output
-    for query in test_queries:
-        print(f"\nQuery: {query}")
-        print("-" * 50)
-        agent.process_query(query)
-        print("-" * 50)
+    # Build one APIAgent per concurrent worker up front and reuse them for all
+    # queries; an agent is checked out of the pool for the duration of one chat
+    pool: asyncio.Queue = asyncio.Queue()
+    for _ in range(min(max_concurrency, len(test_queries))):
+        pool.put_nowait(APIAgent())
+
+    async def run_query(query: str) -> None:
+        agent = await pool.get()
+        try:
+            print(f"\nQuery: {query}")
+            print("-" * 50)
+            await agent.process_query_async(query)
+            print("-" * 50)
+        finally:
+            # Each chat starts with clear_history=True, so no reset is needed
+            pool.put_nowait(agent)
+
+    # Process all queries concurrently and display the output
+    await asyncio.gather(*(run_query(query) for query in test_queries))
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
\ No newline at end of file
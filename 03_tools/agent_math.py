@@ -5,45 +5,89 @@ Purpose: Implements a math assistant agent that uses CalculatorTool to solve mat
 Sets up the agent, registers the solve_math function, and runs test queries.
 """
 
-import os
+import asyncio
 import sys
+from pathlib import Path
 from typing import Dict, Any
 
 import autogen
 from tool_calculator import CalculatorTool
+from cache import CachedAssistant, ResponseCache
 
-# Append the project root to sys.path for module discovery
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+# Add the project root to sys.path once for module discovery
+PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
 # Import configuration settings from model_config module
 from model_config import *
 
-# Initialize CalculatorTool with the provided LLM configuration
-calculator = CalculatorTool(llm_config)
-
-# Create the assistant agent for handling math queries
-assistant = autogen.AssistantAgent(
-    name="math_assistant",
-    llm_config={
-        **llm_config,
-        "functions": [
-            {
-                "name": "solve_math",
-                "description": "Solve mathematical problems given in natural language",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {
-                            "type": "string",
-                            "description": "The mathematical query in natural language",
-                        }
-                    },
-                    "required": ["query"],
-                },
-            }
-        ],
-    },
-    system_message="""You are a helpful assistant that specializes in solving mathematical problems.
+
+# Function spec exposed to the assistant for solving math queries
+_MATH_FUNCTIONS = [
+    {
+        "name": "solve_math",
+        "description": "Solve mathematical problems given in natural language",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The mathematical query in natural language",
+                }
+            },
+            "required": ["query"],
+        },
+    }
+]
+
+# LLM config with the function spec, built once and shared by every assistant
+_MATH_LLM_CONFIG = {**llm_config, "functions": _MATH_FUNCTIONS}
+
+
+def _is_termination_msg(msg: Dict[str, Any]) -> bool:
+    """Return True when a message ends with the TERMINATE keyword."""
+    content = msg.get("content")
+    return content is not None and content[-32:].rstrip().endswith("TERMINATE")
+
+
+def create_agents():
+    """Create a math assistant and a user proxy with solve_math registered.
+
+    AutoGen agents and the CalculatorTool (which runs its own expression chat)
+    are stateful, so concurrent queries each need their own set.
+
+    Returns:
+        Tuple of (user proxy agent, assistant agent).
+    """
+    # Initialize CalculatorTool with the provided LLM configuration
+    calculator = CalculatorTool(llm_config)
+
+    # Function executed by the user proxy for math queries
+    async def solve_math(query: str) -> str:
+        """Solve a mathematical problem given in natural language.
+
+        Args:
+            query (str): The math problem expressed in natural language.
+
+        Returns:
+            str: The result and the generated arithmetic expression, or an error message.
+        """
+        # CalculatorTool.run blocks on an LLM call, so keep it off the event loop
+        result = await asyncio.to_thread(calculator.run, query)
+
+        if "error" in result:
+            return f"Error: {result['error']}"
+
+        return (
+            f"Result: {result['result']}\nGenerated expression: {result['code_generated']}"
+        )
+
+    # Create the assistant agent for handling math queries
+    assistant = autogen.AssistantAgent(
+        name="math_assistant",
+        llm_config=_MATH_LLM_CONFIG,
+        system_message="""You are a helpful assistant that specializes in solving mathematical problems.
 For mathematical queries:
     - Use the solve_math function to calculate the result
     - Explain your approach clearly
@@ -56,42 +100,28 @@ For non-mathematical queries:
     - End with TERMINATE
 
 Remember: Always verify if a query needs calculation before using the solve_math function.""",
-)
+    )
+
+    # Create the user proxy agent for interacting with the assistant
+    user = autogen.UserProxyAgent(
+        name="Admin",
+        system_message="A human admin.",
+        is_termination_msg=_is_termination_msg,
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
 
-# Create the user proxy agent for interacting with the assistant
-user = autogen.UserProxyAgent(
-    name="Admin",
-    system_message="A human admin.",
-    is_termination_msg=lambda msg: (
-        msg.get("content") is not None and "TERMINATE" in msg.get("content")
-    ),
-    human_input_mode="NEVER",
-    code_execution_config=False,
-)
+    # Register the solve_math function for executing math queries
+    user.register_for_execution()(solve_math)
+    return user, assistant
 
 
-# Register the solve_math function for executing math queries
-@user.register_for_execution()
-def solve_math(query: str) -> str:
-    """Solve a mathematical problem given in natural language.
+async def main(max_concurrency: int = 8):
+    """Run the test queries concurrently on a fixed pool of agent pairs.
 
     Args:
-        query (str): The math problem expressed in natural language.
-
-    Returns:
-        str: The result and the generated arithmetic expression, or an error message.
+        max_concurrency (int): Maximum number of queries processed at the same time.
     """
-    result = calculator.run(query)
-
-    if "error" in result:
-        return f"Error: {result['error']}"
-
-    return (
-        f"Result: {result['result']}\nGenerated expression: {result['code_generated']}"
-    )
-
-
-if __name__ == "__main__":
     # Define test queries for the math assistant
     queries = [
         "What is the capital of France?",
@@ -101,14 +131,29 @@ if __name__ == "__main__":
         "What is 25 percent of 80?",
     ]
 
-    # Process each test query
-    for query in queries:
-        print(f"\nQuery: {query}")
-        print("-" * 50)
-        # Initiate chat between the user proxy and the assistant with the current query
-        user.initiate_chat(assistant, message=query)
-
-        # Reset agents for the next query
-        user.reset()
-        assistant.reset()
-        print("-" * 50)
\ No newline at end of file
+    # Build one agent pair per concurrent worker up front and reuse them for all
+    # queries; a pair is checked out of the pool for the duration of one chat
+    pool: asyncio.Queue = asyncio.Queue()
+    cache = ResponseCache()
+    for _ in range(min(max_concurrency, len(queries))):
+        user, assistant = create_agents()
+        pool.put_nowait(CachedAssistant(user, assistant, llm_config, cache))
+
+    async def run_query(query: str) -> None:
+        chat = await pool.get()
+        try:
+            print(f"\nQuery: {query}")
+            print("-" * 50)
+            # Initiate chat (or replay a cached one) for the current query
+            await chat.a_initiate_chat(query)
+            print("-" * 50)
+        finally:
+            # Each chat starts with clear_history=True, so no reset is needed
+            pool.put_nowait(chat)
+
+    # Process all test queries concurrently
+    await asyncio.gather(*(run_query(query) for query in queries))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -5,77 +5,110 @@ Purpose: Implements a Retrieval-Augmented Generation (RAG) agent.
 This module sets up the RAG tool, assistant agent, and user proxy to process queries using a knowledge base.
 """
 
-import os
+import asyncio
 import sys
-from typing import Dict, List
+from pathlib import Path
+from typing import Any, Dict, List
 
 import autogen
 from tool_rag import SimpleRAGTool
+from cache import CachedAssistant, ResponseCache
 
-# Append the project root to sys.path for module discovery
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+# Add the project root to sys.path once for module discovery
+PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
 # Import configuration settings (e.g., llm_config) from model_config module
 from model_config import *
 
-# Initialize the RAG tool for retrieving documents and generating responses
-rag = SimpleRAGTool()
-
-# Create the assistant agent for handling queries with the RAG system
-assistant = autogen.AssistantAgent(
-    name="rag_assistant",
-    llm_config={
-        **llm_config,
-        "functions": [
-            {
-                "name": "search_and_generate",
-                "description": "Search knowledge base and generate response",
-                "parameters": {
-                    "type": "object",
-                    "properties": {
-                        "query": {"type": "string", "description": "The user's query"}
-                    },
-                    "required": ["query"],
-                },
-            }
-        ],
-    },
-    system_message="""You are a knowledgeable assistant with access to a RAG system.
+
+# Function spec exposed to the assistant for knowledge base lookups
+_RAG_FUNCTIONS = [
+    {
+        "name": "search_and_generate",
+        "description": "Search knowledge base and generate response",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "query": {"type": "string", "description": "The user's query"}
+            },
+            "required": ["query"],
+        },
+    }
+]
+
+# LLM config with the function spec, built once and shared by every assistant
+_RAG_LLM_CONFIG = {**llm_config, "functions": _RAG_FUNCTIONS}
+
+
+def _is_termination_msg(msg: Dict[str, Any]) -> bool:
+    """Return True when a message ends with the TERMINATE keyword."""
+    content = msg.get("content")
+    return content is not None and content[-32:].rstrip().endswith("TERMINATE")
+
+
+def create_agents(documents: List[str]):
+    """Create a RAG assistant and a user proxy with search_and_generate registered.
+
+    AutoGen agents and the RAG tool (which keeps a per-tool answer cache) are
+    stateful, so concurrent queries each need their own set.
+
+    Args:
+        documents (List[str]): Documents to populate the knowledge base with.
+
+    Returns:
+        Tuple of (user proxy agent, assistant agent).
+    """
+    # Initialize the RAG tool; an unchanged corpus is loaded from the persisted index
+    rag = SimpleRAGTool()
+    rag.load_or_add_documents(documents)
+
+    # Function executed by the user proxy for RAG queries
+    async def search_and_generate(query: str) -> str:
+        """Search the knowledge base and generate a response.
+
+        Args:
+            query (str): The user's query.
+
+        Returns:
+            str: The generated response from the RAG tool.
+        """
+        # Embedding, search and the LLM call all block, so keep them off the event loop
+        return await asyncio.to_thread(rag.run, query)
+
+    # Create the assistant agent for handling queries with the RAG system
+    assistant = autogen.AssistantAgent(
+        name="rag_assistant",
+        llm_config=_RAG_LLM_CONFIG,
+        system_message="""You are a knowledgeable assistant with access to a RAG system.
 For user queries:
 1. Use the search_and_generate function to find and synthesize relevant information.
 2. Present information clearly and cite sources when possible.
 3. If no relevant information is found, say so clearly.
 Always end your response with TERMINATE.""",
-)
+    )
 
-# Create the user proxy agent to simulate admin interaction
-user = autogen.UserProxyAgent(
-    name="Admin",
-    system_message="A human admin.",
-    is_termination_msg=lambda msg: (
-        msg.get("content") is not None and "TERMINATE" in msg.get("content")
-    ),
-    human_input_mode="NEVER",
-    code_execution_config=False,
-)
+    # Create the user proxy agent to simulate admin interaction
+    user = autogen.UserProxyAgent(
+        name="Admin",
+        system_message="A human admin.",
+        is_termination_msg=_is_termination_msg,
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
 
+    # Register the RAG function for processing queries
+    user.register_for_execution()(search_and_generate)
+    return user, assistant
 
-# Register the RAG function for processing queries
-@user.register_for_execution()
-def search_and_generate(query: str) -> str:
-    """Search the knowledge base and generate a response.
 
-    Args:
-        query (str): The user's query.
+async def main(max_concurrency: int = 8):
+    """Populate the knowledge base and run the test queries concurrently.
 
-    Returns:
-        str: The generated response from the RAG tool.
+    Args:
+        max_concurrency (int): Maximum number of queries processed at the same time.
     """
-    response = rag.run(query)
-    return response
-
-
-if __name__ == "__main__":
     # Sample documents to populate the knowledge base
     documents = [
         "The company's return policy allows returns within 30 days of purchase with original receipt.",
@@ -85,22 +118,37 @@ if __name__ == "__main__":
         "All employees are eligible for 401k matching up to 5% after 6 months of employment.",
     ]
 
-    print("Adding documents to knowledge base...")
-    rag.add_documents(documents)
-
     # Test queries to validate the RAG system functionality
     test_queries = [
         "What are the company's working hours?",
         "What's the vacation policy?",  # Query not covered by provided documents
     ]
 
+    print("Adding documents to knowledge base...")
+
+    # Build one agent pair per concurrent worker up front and reuse them for all
+    # queries; a pair is checked out of the pool for the duration of one chat
+    pool: asyncio.Queue = asyncio.Queue()
+    cache = ResponseCache()
+    for _ in range(min(max_concurrency, len(test_queries))):
+        user, assistant = create_agents(documents)
+        pool.put_nowait(CachedAssistant(user, assistant, llm_config, cache))
+
+    async def run_query(query: str) -> None:
+        chat = await pool.get()
+        try:
+            print(f"\nQuery: {query}")
+            print("-" * 50)
+            # Initiate chat (or replay a cached one) for the current query
+            await chat.a_initiate_chat(query)
+            print("-" * 50)
+        finally:
+            # Each chat starts with clear_history=True, so no reset is needed
+            pool.put_nowait(chat)
+
     print("\nProcessing test queries:")
-    for query in test_queries:
-        print(f"\nQuery: {query}")
-        print("-" * 50)
-        # Initiate chat between the assistant agent and the user proxy for the current query
-        user.initiate_chat(assistant, message=query)
-        # Reset agents for the next query
-        user.reset()
-        assistant.reset()
-        print("-" * 50)
\ No newline at end of file
+    await asyncio.gather(*(run_query(query) for query in test_queries))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,182 @@
+"""
+cache.py
+--------
+Purpose: Provides an exact-match response cache for AutoGen chats.
+Responses are keyed on a SHA-256 hash of the model, system message, normalized
+user message and temperature, and persisted in a small SQLite database so that
+repeated test queries skip the LLM roundtrip entirely.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# Default location of the SQLite cache database (next to this module)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "response_cache.db")
+
+
+class ResponseCache:
+    """A SQLite-backed key/value store for cached chat histories."""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH):
+        """
+        Initialize the cache and create the backing table if needed.
+
+        Parameters:
+        * db_path: Path of the SQLite database file.
+        """
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, response BLOB, ts REAL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(
+        model: str, system_message: str, message: str, temperature: float
+    ) -> str:
+        """
+        Compute a deterministic cache key for a chat request.
+
+        Parameters:
+        * model: Name of the LLM model.
+        * system_message: System message of the assistant agent.
+        * message: The user message; normalized before hashing.
+        * temperature: Sampling temperature of the LLM.
+
+        Returns:
+        * Hex-encoded SHA-256 digest.
+        """
+        normalized = unicodedata.normalize("NFC", message).strip().lower()
+        payload = json.dumps(
+            {
+                "model": model,
+                "sys": system_message,
+                "msg": normalized,
+                "temp": temperature,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a cached chat history.
+
+        Parameters:
+        * key: Cache key produced by make_key.
+
+        Returns:
+        * The cached chat history, or None on a miss.
+        """
+        row = self.conn.execute(
+            "SELECT response FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, chat_history: List[Dict[str, Any]]) -> None:
+        """
+        Store a chat history under the given key.
+
+        Parameters:
+        * key: Cache key produced by make_key.
+        * chat_history: List of chat messages to store.
+        """
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache(key, response, ts) VALUES (?, ?, ?)",
+            (key, json.dumps(chat_history, default=str), time.time()),
+        )
+        self.conn.commit()
+
+
+class CachedAssistant:
+    """
+    Wraps a user proxy / assistant pair so that initiate_chat is served from
+    a ResponseCache whenever the exact same query has been answered before.
+    """
+
+    def __init__(self, user, assistant, llm_config: Dict[str, Any], cache=None):
+        """
+        Initialize the cached assistant wrapper.
+
+        Parameters:
+        * user: The UserProxyAgent that initiates chats.
+        * assistant: The AssistantAgent that answers queries.
+        * llm_config: LLM configuration used by the assistant.
+        * cache: Optional ResponseCache instance (a default one is created otherwise).
+        """
+        self.user = user
+        self.assistant = assistant
+        self.cache = cache or ResponseCache()
+        self.model = llm_config["config_list"][0]["model"]
+        self.temperature = llm_config.get("temperature", 0)
+
+    def _lookup(self, message: str):
+        """
+        Compute the cache key for a message and look up its chat history.
+
+        Parameters:
+        * message: The user query.
+
+        Returns:
+        * Tuple of (cache key, cached chat history or None).
+        """
+        key = ResponseCache.make_key(
+            self.model, self.assistant.system_message, message, self.temperature
+        )
+        chat_history = self.cache.get(key)
+
+        # An empty history or a final message without text content (e.g. a tool
+        # call) cannot be replayed as an answer, so treat it as a miss
+        if not chat_history or not isinstance(chat_history[-1].get("content"), str):
+            return key, None
+        print(f"[cache hit]\n{chat_history[-1]['content']}")
+        return key, chat_history
+
+    def initiate_chat(self, message: str) -> List[Dict[str, Any]]:
+        """
+        Run a chat for the message, or replay the cached chat history on a hit.
+
+        Parameters:
+        * message: The user query.
+
+        Returns:
+        * The chat history of the conversation.
+        """
+        # Serve the stored conversation on a cache hit
+        key, chat_history = self._lookup(message)
+        if chat_history is not None:
+            return chat_history
+
+        # On a miss, run the chat and store the resulting history
+        result = self.user.initiate_chat(
+            self.assistant, message=message, clear_history=True
+        )
+        self.cache.set(key, result.chat_history)
+        return result.chat_history
+
+    async def a_initiate_chat(self, message: str) -> List[Dict[str, Any]]:
+        """
+        Asynchronous variant of initiate_chat.
+
+        Parameters:
+        * message: The user query.
+
+        Returns:
+        * The chat history of the conversation.
+        """
+        # Serve the stored conversation on a cache hit
+        key, chat_history = self._lookup(message)
+        if chat_history is not None:
+            return chat_history
+
+        # On a miss, run the chat and store the resulting history
+        result = await self.user.a_initiate_chat(
+            self.assistant, message=message, clear_history=True
+        )
+        self.cache.set(key, result.chat_history)
+        return result.chat_history
@@ -24,7 +24,7 @@ def main():
 
     # Add documents to the RAG index
     print("Adding documents...")
-    doc_ids = rag.add_documents(documents)
+    doc_ids = rag.load_or_add_documents(documents)
     print(f"Added {len(doc_ids)} documents with IDs: {doc_ids}")
 
     # Test single document addition
@@ -45,9 +45,11 @@ def main():
             print(f"Similarity Score: {result['similarity']:.4f}")
             print(f"Content: {result['content']}")
 
-    # Generate a response based on the query and retrieved context
-    response = rag.generate_response(query=queries[0], context=results)
-    print(f"\n ############# \nFinal Response: {response}")
+    # Stream a response based on the query and retrieved context
+    print("\n ############# \nFinal Response: ", end="", flush=True)
+    for token in rag.stream_response(query=queries[0], context=results):
+        print(token, end="", flush=True)
+    print()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,10 @@
 from typing import Dict, Any, Optional
-import requests
+import httpx
 from enum import Enum
-import json
+import importlib.util
 import logging
+import time
+import orjson
 
 
 # Enum for HTTP methods to enforce valid method types
@@ -13,6 +15,37 @@ class HttpMethod(Enum):
     DELETE = "DELETE"
 
 
+# Lookup table from method names (upper- and lowercase) to HttpMethod members
+_METHOD_MAP = {
+    **{method.value: method for method in HttpMethod},
+    **{method.value.lower(): method for method in HttpMethod},
+}
+
+
+# HTTP/2 multiplexing needs the optional h2 package (httpx[http2])
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Retry policy: the transport retries failed connections, and idempotent requests
+# answered with a gateway error are retried with exponential backoff
+_RETRY_TOTAL = 3
+_RETRY_BACKOFF = 0.2
+_RETRY_STATUSES = frozenset({502, 503, 504})
+_RETRY_METHODS = frozenset({HttpMethod.GET, HttpMethod.PUT, HttpMethod.DELETE})
+
+# Process-wide client shared by all APITool instances so that connections are
+# kept alive, pooled and (with HTTP/2) multiplexed across requests
+_SESSION = httpx.Client(
+    timeout=30.0,
+    transport=httpx.HTTPTransport(
+        http2=_HTTP2_AVAILABLE,
+        limits=httpx.Limits(max_keepalive_connections=8, max_connections=16),
+        retries=_RETRY_TOTAL,
+    ),
+    # Set default headers for JSON communication
+    headers={"Content-Type": "application/json", "Accept": "application/json"},
+)
+
+
 class APITool:
     def __init__(self, base_url: str, auth_token: Optional[str] = None):
         """
@@ -24,16 +57,13 @@ class APITool:
         """
         # Normalize base URL by removing trailing slash
         self.base_url = base_url.rstrip("/")
-        # Create a persistent session for HTTP requests
-        self.session = requests.Session()
-
-        # Set authentication header if auth token is provided
-        if auth_token:
-            self.session.headers.update({"Authorization": f"Bearer {auth_token}"})
+        # Reuse the shared, connection-pooled client for HTTP requests
+        self.session = _SESSION
 
-        # Set default headers for JSON communication
-        self.session.headers.update(
-            {"Content-Type": "application/json", "Accept": "application/json"}
+        # Authentication is applied per request so tokens never leak across
+        # instances sharing the session
+        self.auth_headers = (
+            {"Authorization": f"Bearer {auth_token}"} if auth_token else {}
         )
 
     def make_request(
@@ -55,20 +85,29 @@ class APITool:
         * headers: Additional HTTP headers.
 
         Returns:
-        * Dictionary with response data, status code, and headers.
+        * Dictionary with parsed response data, raw response text, status code, and headers.
         * In case of error, returns error details.
         """
         try:
             # Construct full URL by appending endpoint to base_url
             url = f"{self.base_url}/{endpoint.lstrip('/')}"
-            request_kwargs = {"params": params or {}, "headers": headers or {}}
+            request_kwargs = {
+                "params": params or {},
+                "headers": {**self.auth_headers, **(headers or {})},
+            }
 
             # Include JSON payload for POST and PUT methods
             if method in [HttpMethod.POST, HttpMethod.PUT] and data:
                 request_kwargs["json"] = data
 
-            # Send the HTTP request using the session
-            response = self.session.request(method.value, url, **request_kwargs)
+            # Send the HTTP request using the shared client, retrying gateway
+            # errors for methods that are safe to repeat
+            retries = _RETRY_TOTAL if method in _RETRY_METHODS else 0
+            for attempt in range(retries + 1):
+                response = self.session.request(method.value, url, **request_kwargs)
+                if response.status_code not in _RETRY_STATUSES or attempt == retries:
+                    break
+                time.sleep(_RETRY_BACKOFF * 2**attempt)
 
             # Raise exception for HTTP error responses
             response.raise_for_status()
@@ -77,17 +116,19 @@ class APITool:
             try:
                 return {
                     "status_code": response.status_code,
-                    "data": response.json(),
+                    "data": orjson.loads(response.content),
+                    "text": response.text,
                     "headers": dict(response.headers),
                 }
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 return {
                     "status_code": response.status_code,
                     "data": response.text,
+                    "text": response.text,
                     "headers": dict(response.headers),
                 }
 
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             # Log error details for troubleshooting
             logging.error(f"API request failed: {str(e)}")
             return {
@@ -114,10 +155,12 @@ class APITool:
                 if field not in query:
                     raise ValueError(f"Missing required field: {field}")
 
-            # Convert method string to HttpMethod enum; ensure uppercase conversion
-            try:
-                method = HttpMethod(query["method"].upper())
-            except ValueError:
+            # Resolve the method string to an HttpMethod enum via the lookup table,
+            # falling back to uppercase conversion for mixed-case input
+            method = _METHOD_MAP.get(query["method"]) or _METHOD_MAP.get(
+                str(query["method"]).upper()
+            )
+            if method is None:
                 raise ValueError(f"Invalid HTTP method: {query['method']}")
 
             # Execute the API request using the provided query parameters
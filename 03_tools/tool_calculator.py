@@ -1,9 +1,75 @@
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 import ast
+import functools
 import operator
+import re
 from textwrap import dedent
 import autogen
 
+# Polite filler phrases stripped from queries before cache lookup
+_FILLER_PATTERN = re.compile(
+    r"\b(please|can you|could you|would you|tell me|kindly)\b[,]?\s*", re.IGNORECASE
+)
+
+# Cheap prefilter applied before parsing: arithmetic characters only, bounded length
+_EXPR_RE = re.compile(r"^[\s\d+\-*/().eE]+$")
+_MAX_EXPR_LEN = 512
+
+# Allowed operators for safe evaluation
+_OPS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+    ast.USub: operator.neg,
+}
+
+# AST node types permitted in an arithmetic expression
+_ALLOWED_NODES = frozenset({ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, *_OPS})
+
+
+def _validate(tree: ast.AST) -> None:
+    """
+    Check in a single pass that an AST contains only numeric arithmetic.
+
+    Parameters:
+    * tree: The parsed expression tree.
+
+    Raises:
+    * ValueError: If a node, operator or constant is not allowed.
+    """
+    for node in ast.walk(tree):
+        node_type = type(node)
+        if node_type not in _ALLOWED_NODES:
+            raise ValueError(f"Operation {node_type.__name__} not allowed")
+        if node_type is ast.Constant and type(node.value) not in (int, float):
+            raise ValueError(f"Constant {node.value!r} not allowed")
+
+
+@functools.lru_cache(maxsize=1024)
+def _eval_expr(expression: str) -> float:
+    """
+    Parse, validate and evaluate an arithmetic expression.
+
+    Expressions contain only numeric literals, so results are memoized on the
+    expression string.
+
+    Parameters:
+    * expression: The arithmetic expression as a string.
+
+    Returns:
+    * The evaluated numerical result.
+    """
+    # Parse the expression into an AST
+    tree = ast.parse(expression, mode="eval")
+
+    # Reject anything other than numeric literals and allowed operators
+    _validate(tree)
+
+    # Evaluate the validated AST as bytecode with no builtins available
+    return eval(compile(tree, "<expr>", "eval"), {"__builtins__": {}}, {})
+
 
 class CalculatorTool:
     """A tool for evaluating mathematical expressions derived from natural language queries."""
@@ -16,14 +82,7 @@ class CalculatorTool:
         * llm_config: Configuration parameters for the LLM used in expression generation.
         """
         # Allowed operators for safe evaluation
-        self.allowed_operators = {
-            ast.Add: operator.add,
-            ast.Sub: operator.sub,
-            ast.Mult: operator.mul,
-            ast.Div: operator.truediv,
-            ast.Pow: operator.pow,
-            ast.USub: operator.neg,
-        }
+        self.allowed_operators = _OPS
 
         # Create expression generator agent using LLM
         self.expression_generator = autogen.AssistantAgent(
@@ -59,6 +118,28 @@ class CalculatorTool:
             code_execution_config=False,
         )
 
+        # Exact-match cache: canonicalized query -> (expression, result). Queries
+        # differing only in a number must never share an answer, so there is no
+        # similarity-based matching.
+        self.cache: Dict[str, Tuple[str, float]] = {}
+
+    @staticmethod
+    def _canonicalize(query: str) -> str:
+        """
+        Normalize a query for exact cache lookup.
+
+        Only filler phrases, whitespace, case and trailing punctuation are
+        normalized; numbers and operators are kept verbatim.
+
+        Parameters:
+        * query: The natural language math query.
+
+        Returns:
+        * Lowercased query with polite filler phrases and trailing punctuation removed.
+        """
+        query = _FILLER_PATTERN.sub("", query).strip().rstrip("?.!").lower()
+        return " ".join(query.split())
+
     def _safe_eval(self, expression: str) -> float:
         """
         Safely evaluate a mathematical expression using an Abstract Syntax Tree (AST).
@@ -70,48 +151,16 @@ class CalculatorTool:
         * The evaluated numerical result.
 
         Raises:
-        * ValueError: If the expression contains invalid or disallowed operators.
+        * ValueError: If the expression is too long, contains disallowed characters,
+          or uses invalid or disallowed operators.
         """
         print("Inside _safe_eval()")
-        try:
-            # Parse the expression into an AST
-            tree = ast.parse(expression, mode="eval")
-
-            # Define a visitor class to safely evaluate the AST nodes
-            class SafeEvaluator(ast.NodeTransformer):
-                def __init__(self, operators):
-                    # Allowed operators passed from CalculatorTool
-                    self.operators = operators
-
-                def visit_BinOp(self, node):
-                    # Evaluate binary operations (e.g., addition, subtraction)
-                    left = self.visit(node.left)
-                    right = self.visit(node.right)
-                    if type(node.op) not in self.operators:
-                        raise ValueError(
-                            f"Operator {type(node.op).__name__} not allowed"
-                        )
-                    return self.operators[type(node.op)](left, right)
-
-                def visit_Num(self, node):
-                    # Return numeric literal value
-                    return node.n
-
-                def visit_UnaryOp(self, node):
-                    # Evaluate unary operations (e.g., negation)
-                    operand = self.visit(node.operand)
-                    if type(node.op) not in self.operators:
-                        raise ValueError(
-                            f"Operator {type(node.op).__name__} not allowed"
-                        )
-                    return self.operators[type(node.op)](operand)
-
-            # Instantiate the safe evaluator with allowed operators
-            evaluator = SafeEvaluator(self.allowed_operators)
-            # Evaluate the parsed AST safely and return the result
-            result = evaluator.visit(tree.body)
-            return result
+        # Reject oversized or non-arithmetic input before invoking the parser
+        if len(expression) > _MAX_EXPR_LEN or not _EXPR_RE.match(expression):
+            raise ValueError(f"Rejected expression: {expression[:50]!r}")
 
+        try:
+            return _eval_expr(expression)
         except Exception as e:
             raise ValueError(f"Error evaluating expression: {str(e)}")
 
@@ -129,6 +178,13 @@ class CalculatorTool:
         * In case of error, returns a dictionary with an "error" key.
         """
         try:
+            # Reuse the answer of an identical query asked before
+            key = self._canonicalize(query)
+            cached = self.cache.get(key)
+            if cached is not None:
+                expression, result = cached
+                return {"result": result, "code_generated": expression}
+
             # Generate arithmetic expression using the LLM agent
             response = self.user_proxy.initiate_chat(
                 self.expression_generator,
@@ -142,6 +198,9 @@ class CalculatorTool:
             # Safely evaluate the generated arithmetic expression
             result = self._safe_eval(expression)
 
+            # Remember the expression for future repeats of this query
+            self.cache[key] = (expression, result)
+
             return {"result": result, "code_generated": expression}
 
         except Exception as e:
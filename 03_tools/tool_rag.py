@@ -1,17 +1,57 @@
 import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 import together
+import functools
+import hashlib
 import os
+import pickle
 import sys
+from pathlib import Path
 
-# Append the project root to sys.path for module discovery
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+# Add the project root to sys.path once for module discovery
+PROJECT_ROOT = str(Path(__file__).resolve().parents[1])
+if PROJECT_ROOT not in sys.path:
+    sys.path.append(PROJECT_ROOT)
 
 # Import configuration settings from model_config module
 from model_config import *
 
+# Default on-disk location of the persisted knowledge base
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "rag_index.faiss")
+DEFAULT_DOCS_PATH = os.path.join(os.path.dirname(__file__), "rag_docs.pkl")
+
+# Cap FAISS OpenMP threads to avoid oversubscription with the torch threads used
+# by the SentenceTransformer; a process-wide setting, so it is applied once here
+faiss.omp_set_num_threads(max(1, (os.cpu_count() or 2) // 2))
+
+# Minimum number of vectors used to train the 4-bit PQ fast-scan codebooks
+PQ_FASTSCAN_MIN_TRAIN = 10_000
+
+# Minimum number of vectors used to train the per-dimension ranges of the 8-bit
+# scalar quantizer; smaller corpora stay in the exact flat index
+SQ8_MIN_TRAIN = 1_000
+
+
+@functools.lru_cache(maxsize=4)
+def _get_embed_model(name: str) -> SentenceTransformer:
+    """
+    Load a SentenceTransformer once per process and share it between RAG tools.
+
+    On a CUDA device the model runs in half precision for higher encode throughput.
+
+    Parameters:
+    * name: Name of the SentenceTransformer model
+
+    Returns:
+    * The loaded SentenceTransformer
+    """
+    model = SentenceTransformer(name)
+    if model.device.type == "cuda":
+        model.half()
+    return model
+
 
 class SimpleRAGTool:
     """
@@ -19,42 +59,110 @@ class SimpleRAGTool:
     generates responses using an LLM based on retrieved context.
     """
 
-    def __init__(self):
+    # Default prompt split around the context and query slots, so building a prompt is
+    # plain concatenation instead of a str.format pass over the whole template
+    _PROMPT_PARTS = (
+        "You are a helpful AI assistant. Use the following retrieved documents to answer the user's question.\n"
+        "If the information is not in the documents, say so. Do not make up information.\n\n"
+        "Retrieved Documents:\n",
+        "\n\nUser Question: ",
+        "\n\nUsing ONLY the information from the retrieved documents, provide a clear and concise answer.\n"
+        "Do not return the context as-is; formulate a smooth response for a chat interface.\n",
+    )
+
+    def __init__(
+        self,
+        quantize: bool = False,
+        flush_size: int = 32,
+        hnsw_threshold: int = 10_000,
+        ivfpq: bool = False,
+        ivf_nlist: int = 100,
+        pq_fastscan: bool = False,
+        cache_threshold: float = 0.97,
+    ):
         """
         Initialize the FAISS index, embedding model, and generation model.
 
         - Initializes the SentenceTransformer for generating embeddings.
         - Sets up a FAISS index for cosine similarity search.
         - Prepares document storage and a generation model via Together.
+
+        Parameters:
+        * quantize: Rebuild the flat index with 8-bit scalar-quantized codes (4x less memory)
+          once SQ8_MIN_TRAIN vectors are available to train the quantizer
+        * flush_size: Number of queued documents embedded together in one batch
+        * hnsw_threshold: Corpus size at which the flat index is rebuilt as an HNSW graph
+        * ivfpq: Rebuild the flat index as a product-quantized IVFPQ index (~16x less memory)
+          instead of HNSW once enough vectors are available to train it
+        * ivf_nlist: Number of inverted lists (clusters) of the IVFPQ index
+        * pq_fastscan: Rebuild the flat index as a 4-bit PQ fast-scan index (24 bytes per
+          vector, SIMD lookup-table search) instead of HNSW once PQ_FASTSCAN_MIN_TRAIN
+          vectors are available to train it
+        * cache_threshold: Minimum query similarity for serving a cached answer from run()
         """
-        # Initialize the embedding model using a pre-defined EMBEDDING_MODEL
-        self.embed_model = SentenceTransformer(EMBEDDING_MODEL)
+        # Reuse the process-wide embedding model for the pre-defined EMBEDDING_MODEL
+        self.embed_model = _get_embed_model(EMBEDDING_MODEL)
         self.embedding_dim = 384  # Dimension for all-MiniLM-L6-v2
 
         # Initialize FAISS index for cosine similarity
-        # Using IndexFlatIP with normalized vectors to compute cosine similarity
+        # Using inner product over normalized vectors to compute cosine similarity
         self.index = faiss.IndexFlatIP(self.embedding_dim)
+        self.quantize = quantize
+
+        # Move the flat index to the GPU when a GPU-enabled FAISS build and device exist;
+        # brute-force inner product on the GPU outpaces approximate CPU indexes
+        self.gpu_resources = None
+        if not quantize and hasattr(faiss, "StandardGpuResources"):
+            if faiss.get_num_gpus() > 0:
+                self.gpu_resources = faiss.StandardGpuResources()
+                self.index = faiss.index_cpu_to_gpu(self.gpu_resources, 0, self.index)
+
+        self.hnsw_threshold = hnsw_threshold
+        self.ivfpq = ivfpq
+        self.ivf_nlist = ivf_nlist
+        self.pq_fastscan = pq_fastscan
+
+        # Storage for document texts; IDs are dense, so a document's ID is its list position
+        self.documents: List[str] = []
+
+        # Content hashes of stored documents, so re-adding a known text skips embedding
+        self._seen: Dict[bytes, int] = {}
+
+        # Single documents queued for embedding, flushed to the index in micro-batches
+        self._pending_texts: List[str] = []
+        self.flush_size = flush_size
 
-        # Storage for document texts with unique IDs
-        self.documents: Dict[int, str] = {}
-        self.current_id: int = 0
+        # Semantic answer cache: query embeddings paired with (answer, retrieved doc IDs)
+        self.cache_index = faiss.IndexFlatIP(self.embedding_dim)
+        self.cache_answers: List[Tuple[str, Set[int]]] = []
+        self.cache_threshold = cache_threshold
 
         # Setup generation model using Together
         together.api_key = API_KEY
         self.generation_model = GENERATION_MODEL
 
-    def _normalize_vectors(self, vectors: np.ndarray) -> np.ndarray:
+    def _build_quantized_index(self, vectors: np.ndarray) -> faiss.Index:
         """
-        Normalize vectors to unit length for cosine similarity.
+        Train and populate an int8 scalar-quantized inner-product index over the given vectors.
+
+        The quantizer learns the value range of every dimension from the embeddings
+        themselves; normalized embeddings only span a narrow part of [-1, 1] per
+        dimension, so fixed bounds would waste most of the 8-bit resolution.
 
         Parameters:
-        * vectors: np.ndarray of embeddings
+        * vectors: Normalized embeddings as a (n, dim) np.ndarray
 
         Returns:
-        * Normalized vectors (in-place normalization by FAISS)
+        * A trained and populated faiss.IndexScalarQuantizer
         """
-        faiss.normalize_L2(vectors)  # Normalizes vectors in-place
-        return vectors
+        index = faiss.IndexScalarQuantizer(
+            self.embedding_dim,
+            faiss.ScalarQuantizer.QT_8bit,
+            faiss.METRIC_INNER_PRODUCT,
+        )
+        index.train(vectors)
+        index.add(vectors)
+        return index
 
     def generate_embedding(self, text: str) -> np.ndarray:
         """
@@ -64,61 +172,281 @@ class SimpleRAGTool:
         * text: The input text to be embedded
 
         Returns:
-        * Normalized embedding as a np.ndarray
+        * Normalized embedding as a (1, dim) np.ndarray
         """
-        embedding = self.embed_model.encode([text])[0]
-        return self._normalize_vectors(embedding.reshape(1, -1))
+        return self._encode([text])
 
-    def add_document(self, text: str) -> int:
+    def _encode(self, texts: List[str]) -> np.ndarray:
         """
-        Add a single document to the index and store its text.
+        Embed several texts in batched forward passes.
+
+        Parameters:
+        * texts: The input texts to be embedded
+
+        Returns:
+        * Normalized embeddings as a (len(texts), dim) np.ndarray
+        """
+        embeddings = self.embed_model.encode(
+            texts,
+            batch_size=64,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+        )
+        # A half-precision model yields float16, but FAISS indexes are float32
+        return embeddings.astype(np.float32, copy=False)
+
+    def _build_hnsw_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Build an HNSW graph index (M=32) over the given vectors.
+
+        Parameters:
+        * vectors: Normalized embeddings as a (n, dim) np.ndarray
+
+        Returns:
+        * A populated faiss.IndexHNSWFlat
+        """
+        index = faiss.IndexHNSWFlat(self.embedding_dim, 32, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = 200
+        index.hnsw.efSearch = 64
+        index.add(vectors)
+        return index
+
+    def _build_ivfpq_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Train and populate an IVFPQ index (8 sub-quantizers of 8 bits) over the given vectors.
+
+        Parameters:
+        * vectors: Normalized embeddings as a (n, dim) np.ndarray
+
+        Returns:
+        * A trained and populated faiss.IndexIVFPQ
+        """
+        # The coarse quantizer must outlive the index, so keep a reference to it
+        self._ivf_quantizer = faiss.IndexFlatIP(self.embedding_dim)
+        index = faiss.IndexIVFPQ(
+            self._ivf_quantizer,
+            self.embedding_dim,
+            self.ivf_nlist,
+            8,
+            8,
+            faiss.METRIC_INNER_PRODUCT,
+        )
+        index.train(vectors)
+        index.add(vectors)
+        index.nprobe = 10
+        return index
+
+    def _build_pq_fastscan_index(self, vectors: np.ndarray) -> faiss.Index:
+        """
+        Train and populate a PQ fast-scan index (48 sub-quantizers of 4 bits) over the given vectors.
+
+        Parameters:
+        * vectors: Normalized embeddings as a (n, dim) np.ndarray
+
+        Returns:
+        * A trained and populated faiss.IndexPQFastScan
+        """
+        index = faiss.IndexPQFastScan(
+            self.embedding_dim, 48, 4, faiss.METRIC_INNER_PRODUCT
+        )
+        index.train(vectors)
+        index.add(vectors)
+        return index
+
+    def _add_embeddings(self, embeddings: np.ndarray) -> None:
+        """
+        Add embeddings to the FAISS index, switching to an approximate index once the corpus is large.
+
+        Brute-force inner product is exact and fastest for small corpora. Beyond
+        hnsw_threshold vectors the index is rebuilt as an HNSW graph so searches
+        scale as O(log N); with ivfpq enabled it is instead rebuilt as IVFPQ once
+        256 * ivf_nlist vectors are available to train the quantizer, and with
+        pq_fastscan enabled as a PQ fast-scan index once PQ_FASTSCAN_MIN_TRAIN are.
+        With quantize enabled it is rebuilt as an 8-bit scalar-quantized index
+        trained on the vectors once SQ8_MIN_TRAIN are available.
+
+        Parameters:
+        * embeddings: Normalized embeddings as a (n, dim) np.ndarray
+        """
+        # FAISS expects C-contiguous float32 and would otherwise copy internally
+        self.index.add(np.ascontiguousarray(embeddings, dtype=np.float32))
+
+        # Only the exact flat index is ever migrated
+        if not isinstance(self.index, faiss.IndexFlatIP):
+            return
+
+        ntotal = self.index.ntotal
+        if self.quantize:
+            if ntotal >= SQ8_MIN_TRAIN:
+                self.index = self._build_quantized_index(self.index.reconstruct_n(0, ntotal))
+        elif self.ivfpq and ntotal >= 256 * self.ivf_nlist:
+            self.index = self._build_ivfpq_index(self.index.reconstruct_n(0, ntotal))
+        elif self.pq_fastscan and ntotal >= PQ_FASTSCAN_MIN_TRAIN:
+            self.index = self._build_pq_fastscan_index(
+                self.index.reconstruct_n(0, ntotal)
+            )
+        elif not (self.ivfpq or self.pq_fastscan) and ntotal >= self.hnsw_threshold:
+            self.index = self._build_hnsw_index(self.index.reconstruct_n(0, ntotal))
+
+    def _flush(self) -> None:
+        """
+        Embed all queued documents in one batch and add them to the FAISS index.
+        """
+        if self._pending_texts:
+            self._add_embeddings(self._encode(self._pending_texts))
+            self._pending_texts = []
+
+    @staticmethod
+    def _content_hash(text: str) -> bytes:
+        """
+        Compute the 128-bit BLAKE2b digest used to deduplicate documents.
 
         Parameters:
         * text: The document content
 
         Returns:
-        * Unique document ID
+        * The raw digest bytes
         """
-        # Generate embedding for the document
-        embedding = self.generate_embedding(text)
+        return hashlib.blake2b(text.encode(), digest_size=16).digest()
 
-        # Add embedding to FAISS index
-        self.index.add(embedding)
+    def add_document(self, text: str) -> int:
+        """
+        Add a single document to the index and store its text.
 
-        # Store document text with a unique ID
-        doc_id = self.current_id
-        self.documents[doc_id] = text
-        self.current_id += 1
+        Parameters:
+        * text: The document content
 
-        return doc_id
+        Returns:
+        * Unique document ID
+        """
+        return self.add_documents([text])[0]
 
     def add_documents(self, texts: List[str]) -> List[int]:
         """
         Add multiple documents to the index and store their texts.
 
+        Texts that are already stored keep their existing ID and are not embedded
+        again. New texts are queued and embedded together with other queued
+        documents once flush_size is reached (or before the next search).
+
         Parameters:
         * texts: List of document contents
 
         Returns:
-        * List of unique document IDs
+        * List of unique document IDs, one per input text
         """
-        # Generate embeddings for all documents
-        embeddings = self.embed_model.encode(texts)
-        embeddings = self._normalize_vectors(embeddings)
-
-        # Add embeddings to FAISS index
-        self.index.add(embeddings)
-
-        # Store documents and assign unique IDs
         doc_ids = []
         for text in texts:
-            doc_id = self.current_id
-            self.documents[doc_id] = text
+            digest = self._content_hash(text)
+            doc_id = self._seen.get(digest)
+            if doc_id is None:
+                # Store the new text; its position in the list is its unique ID
+                doc_id = self._seen[digest] = len(self.documents)
+                self.documents.append(text)
+                self._pending_texts.append(text)
             doc_ids.append(doc_id)
-            self.current_id += 1
+
+        # Embed queued documents in one batch once enough have accumulated
+        if len(self._pending_texts) >= self.flush_size:
+            self._flush()
 
         return doc_ids
 
+    def save(
+        self, index_path: str = DEFAULT_INDEX_PATH, docs_path: str = DEFAULT_DOCS_PATH
+    ) -> None:
+        """
+        Persist the FAISS index and document texts to disk.
+
+        Parameters:
+        * index_path: File path for the FAISS index
+        * docs_path: File path for the pickled document store
+        """
+        self._flush()
+        # FAISS can only serialize CPU indexes
+        if self.gpu_resources is not None:
+            faiss.write_index(faiss.index_gpu_to_cpu(self.index), index_path)
+        else:
+            faiss.write_index(self.index, index_path)
+        with open(docs_path, "wb") as f:
+            pickle.dump(self.documents, f)
+
+    def load(
+        self, index_path: str = DEFAULT_INDEX_PATH, docs_path: str = DEFAULT_DOCS_PATH
+    ) -> None:
+        """
+        Load a previously persisted FAISS index and document texts.
+
+        Parameters:
+        * index_path: File path of the FAISS index
+        * docs_path: File path of the pickled document store
+        """
+        self.index = faiss.read_index(index_path)
+        if self.gpu_resources is not None and isinstance(self.index, faiss.IndexFlatIP):
+            self.index = faiss.index_cpu_to_gpu(self.gpu_resources, 0, self.index)
+        with open(docs_path, "rb") as f:
+            documents = pickle.load(f)
+        # Stores pickled before the list layout map dense IDs to texts
+        if isinstance(documents, dict):
+            documents = [documents[doc_id] for doc_id in sorted(documents)]
+        self.documents = documents
+        self._seen = {self._content_hash(text): i for i, text in enumerate(documents)}
+        self._pending_texts = []
+
+    def load_or_add_documents(
+        self,
+        texts: List[str],
+        index_path: str = DEFAULT_INDEX_PATH,
+        docs_path: str = DEFAULT_DOCS_PATH,
+    ) -> List[int]:
+        """
+        Populate the knowledge base, reusing the persisted index when the corpus is unchanged.
+
+        A SHA-256 hash of the documents, the embedding model and the index
+        configuration is stored next to the index; when it matches, the index is
+        loaded from disk instead of re-embedding every document. Changing the model
+        or any index option therefore rebuilds (and overwrites) the persisted index.
+
+        Parameters:
+        * texts: List of document contents
+        * index_path: File path of the FAISS index
+        * docs_path: File path of the pickled document store
+
+        Returns:
+        * List of unique document IDs
+        """
+        index_config = repr(
+            (
+                EMBEDDING_MODEL,
+                self.embedding_dim,
+                self.quantize,
+                self.hnsw_threshold,
+                self.ivfpq,
+                self.ivf_nlist,
+                self.pq_fastscan,
+            )
+        )
+        corpus_hash = hashlib.sha256(
+            "\n".join([index_config, *texts]).encode()
+        ).hexdigest()
+        marker_path = f"{index_path}.sha256"
+
+        # Load the persisted knowledge base if it was built from the same corpus,
+        # embedding model and index configuration
+        if all(os.path.exists(path) for path in (index_path, docs_path, marker_path)):
+            with open(marker_path) as f:
+                if f.read().strip() == corpus_hash:
+                    self.load(index_path, docs_path)
+                    return [self._seen[self._content_hash(text)] for text in texts]
+
+        # Otherwise embed the documents once and persist the result
+        doc_ids = self.add_documents(texts)
+        self.save(index_path, docs_path)
+        with open(marker_path, "w") as f:
+            f.write(corpus_hash)
+        return doc_ids
+
     def search(self, query: str, top_k: int = 2) -> List[Dict[str, any]]:
         """
         Search for the top_k most similar documents given a query.
@@ -130,28 +458,65 @@ class SimpleRAGTool:
         Returns:
         * List of dictionaries containing document ID, content, and similarity score
         """
-        # Generate embedding for the query
-        query_embedding = self.generate_embedding(query)
+        return self.search_batch([query], top_k)[0]
 
-        # Perform search in the FAISS index
-        similarities, indices = self.index.search(query_embedding, top_k)
+    def search_batch(
+        self, queries: List[str], top_k: int = 2
+    ) -> List[List[Dict[str, any]]]:
+        """
+        Search for the top_k most similar documents for several queries at once.
 
-        # Format the search results
-        results = []
-        for idx, similarity in zip(indices[0], similarities[0]):
-            if idx != -1:
-                doc = self.documents[int(idx)]
-                results.append(
-                    {"id": int(idx), "content": doc, "similarity": float(similarity)}
-                )
+        All queries are embedded in one encode call and searched in one FAISS call.
 
-        return results
+        Parameters:
+        * queries: The input query texts
+        * top_k: Number of top documents to retrieve per query (default: 2)
 
-    def generate_response(
+        Returns:
+        * One result list per query, each containing document ID, content, and similarity score
+        """
+        # Generate embeddings for all queries and search the FAISS index in one call
+        return self._search_embeddings(self._encode(queries), top_k)
+
+    def _search_embeddings(
+        self, query_embeddings: np.ndarray, top_k: int
+    ) -> List[List[Dict[str, any]]]:
+        """
+        Search the FAISS index with precomputed query embeddings.
+
+        Parameters:
+        * query_embeddings: Normalized query embeddings as a (n, dim) np.ndarray
+        * top_k: Number of top documents to retrieve per query
+
+        Returns:
+        * One result list per query, each containing document ID, content, and similarity score
+        """
+        # Make sure queued documents are searchable
+        self._flush()
+
+        # FAISS expects C-contiguous float32; this is a no-op for _encode output
+        query_embeddings = np.ascontiguousarray(query_embeddings, dtype=np.float32)
+        similarities, indices = self.index.search(query_embeddings, top_k)
+
+        # Format the search results
+        all_results = []
+        for row_indices, row_similarities in zip(indices, similarities):
+            results = []
+            for idx, similarity in zip(row_indices, row_similarities):
+                if idx != -1:
+                    doc = self.documents[int(idx)]
+                    results.append(
+                        {"id": int(idx), "content": doc, "similarity": float(similarity)}
+                    )
+            all_results.append(results)
+
+        return all_results
+
+    def _build_prompt(
         self, query: str, context: List[Dict], prompt_template: Optional[str] = None
-    ):
+    ) -> str:
         """
-        Generate a response using the LLM based on the query and retrieved context.
+        Build the LLM prompt from the query and retrieved context.
 
         Parameters:
         * query: The user's question
@@ -159,54 +524,79 @@ class SimpleRAGTool:
         * prompt_template: (Optional) Custom prompt template
 
         Returns:
-        * A generated text response from the LLM
+        * The final prompt
         """
-        # Use default prompt template if none is provided
-        if not prompt_template:
-            prompt_template = """
-                You are a helpful AI assistant. Use the following retrieved documents to answer the user's question.
-                If the information is not in the documents, say so. Do not make up information.
-                
-                Retrieved Documents:
-                {context}
-                
-                User Question: {query}
-                
-                Using ONLY the information from the retrieved documents, provide a clear and concise answer.
-                Do not return the context as-is; formulate a smooth response for a chat interface.
-            """
-
-        # Format the retrieved documents for the prompt
+        # Format the retrieved documents for the prompt in doc-ID order and without
+        # per-query scores, so the same document set always yields a byte-identical
+        # prompt prefix that the LLM server's prefix (KV) cache can reuse
         formatted_context = "\n\n".join(
-            [
-                f"Document {i + 1} (Similarity: {doc['similarity']:.2f}):\n{doc['content']}"
-                for i, doc in enumerate(context)
-            ]
+            f"Document {doc['id']}:\n{doc['content']}"
+            for doc in sorted(context, key=lambda doc: doc["id"])
         )
 
-        # Create the final prompt using the template
-        final_prompt = prompt_template.format(context=formatted_context, query=query)
+        # Create the final prompt from the custom template or the default prompt parts
+        if prompt_template:
+            return prompt_template.format(context=formatted_context, query=query)
+        prefix, mid, suffix = self._PROMPT_PARTS
+        return prefix + formatted_context + mid + query + suffix
+
+    def generate_response(
+        self, query: str, context: List[Dict], prompt_template: Optional[str] = None
+    ) -> str:
+        """
+        Generate a response using the LLM based on the query and retrieved context.
 
-        # Generate response using the Together LLM
+        Parameters:
+        * query: The user's question
+        * context: List of retrieved documents with similarity scores
+        * prompt_template: (Optional) Custom prompt template
+
+        Returns:
+        * A generated text response from the LLM
+        """
         response = together.Complete.create(
-            prompt=final_prompt,
+            prompt=self._build_prompt(query, context, prompt_template),
             model=self.generation_model,
             max_tokens=512,
             temperature=0.3,
             stop=["User:", "Assistant:"],
         )
+        return response["choices"][0]["text"].strip()
 
-        # Debug: Print the response type
-        print(type(response))
+    def stream_response(
+        self, query: str, context: List[Dict], prompt_template: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Stream a response from the LLM based on the query and retrieved context.
 
-        # Return the generated text response after stripping whitespace
-        return response["choices"][0]["text"].strip()
+        Tokens are yielded as soon as the LLM produces them, so a chat interface can
+        start rendering the answer before generation has finished.
+
+        Parameters:
+        * query: The user's question
+        * context: List of retrieved documents with similarity scores
+        * prompt_template: (Optional) Custom prompt template
+
+        Yields:
+        * Generated text fragments from the LLM
+        """
+        chunks = together.Complete.create_streaming(
+            prompt=self._build_prompt(query, context, prompt_template),
+            model=self.generation_model,
+            max_tokens=512,
+            temperature=0.3,
+            stop=["User:", "Assistant:"],
+        )
+        for chunk in chunks:
+            if chunk.get("choices"):
+                yield chunk["choices"][0].get("text", "")
 
     def run(self, query: str):
         """
         Execute the RAG process:
         - Searches for similar documents based on the query
-        - Generates an LLM response using the retrieved context
+        - Returns a cached answer if a near-duplicate query was answered from the same documents
+        - Otherwise generates an LLM response using the retrieved context
 
         Parameters:
         * query: The user's question
@@ -214,10 +604,28 @@ class SimpleRAGTool:
         Returns:
         * The final response generated by the LLM
         """
+        # Embed the query once for both retrieval and the semantic cache lookup
+        query_embedding = self.generate_embedding(query)
+
         # Retrieve relevant documents
-        context = self.search(query)
+        context = self._search_embeddings(query_embedding, top_k=2)[0]
+        doc_ids = {doc["id"] for doc in context}
+
+        # Serve a cached answer for a near-duplicate query, provided it was grounded
+        # in largely the same documents (guards against stale answers on corpus drift)
+        if self.cache_index.ntotal:
+            similarities, indices = self.cache_index.search(query_embedding, 1)
+            if similarities[0][0] >= self.cache_threshold:
+                answer, cached_ids = self.cache_answers[int(indices[0][0])]
+                union = doc_ids | cached_ids
+                if not union or len(doc_ids & cached_ids) / len(union) >= 0.5:
+                    return answer
 
         # Generate response using the query and retrieved context
         response = self.generate_response(query, context)
 
+        # Remember the answer for future near-duplicate queries
+        self.cache_index.add(query_embedding)
+        self.cache_answers.append((response, doc_ids))
+
         return response
\ No newline at end of file
@@ -1,15 +1,28 @@
+import functools
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 
+# Weather changes slowly, so lookups for the same city are reused for this many seconds
+_CACHE_TTL = 60
 
-def get_weather(city: str) -> str:
+# Shared session keeping TLS connections to the OpenWeatherMap API alive between calls
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+
+@functools.lru_cache(maxsize=256)
+def _fetch_weather(city: str, ttl_bucket: int) -> dict:
     """
-    Fetches real-time weather data for a given city using the OpenWeatherMap API.
+    Fetches the raw OpenWeatherMap payload for a normalized city name.
 
     Args:
-        city (str): The name of the city.
+        city (str): The normalized name of the city.
+        ttl_bucket (int): Current time window; a new window invalidates cached entries.
 
     Returns:
-        str: Weather information in a user-friendly format or an error message.
+        dict: The parsed JSON weather data.
     """
     # TODO: Replace 'your_api_key_here' with your actual OpenWeatherMap API key
     api_key = "your_api_key_here"
@@ -17,15 +30,31 @@ def get_weather(city: str) -> str:
     # Construct the API URL with the city, API key, and set units to metric
     url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
 
-    try:
-        # Send a GET request to the OpenWeatherMap API
-        response = requests.get(url)
+    # Send a GET request to the OpenWeatherMap API over the pooled session
+    response = _SESSION.get(url, timeout=5)
+
+    # Raise an exception for HTTP error responses (e.g., 404, 500); failures are not cached
+    response.raise_for_status()
+
+    # Parse the JSON response into a Python dictionary
+    return response.json()
+
 
-        # Raise an exception for HTTP error responses (e.g., 404, 500)
-        response.raise_for_status()
+def get_weather(city: str) -> str:
+    """
+    Fetches real-time weather data for a given city using the OpenWeatherMap API.
+
+    Args:
+        city (str): The name of the city.
 
-        # Parse the JSON response into a Python dictionary
-        weather_data = response.json()
+    Returns:
+        str: Weather information in a user-friendly format or an error message.
+    """
+    try:
+        # Reuse a recent lookup for the same city, otherwise query the API
+        weather_data = _fetch_weather(
+            city.strip().lower(), int(time.monotonic() // _CACHE_TTL)
+        )
 
         # Extract weather details from the JSON data
         weather_desc = weather_data["weather"][0][
@@ -42,4 +71,4 @@ def get_weather(city: str) -> str:
         )
     except requests.exceptions.RequestException as e:
         # In case of any HTTP request issues, return an error message
-        return f"Failed to retrieve weather data: {str(e)}"
\ No newline at end of file
+        return f"Failed to retrieve weather data: {str(e)}"
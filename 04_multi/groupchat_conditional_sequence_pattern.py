@@ -4,9 +4,12 @@ This module demonstrates a conditional multi-agent group chat system.
 Agents include sentiment analysis, topic classification, and summarization.
 """
 
+import functools
 import warnings
 import os
+import re
 import sys
+from typing import Final
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
@@ -28,154 +31,219 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 # Import configuration settings from model_config
 from model_config import *
 
+# Matches a "negative" sentiment label without lowercasing the whole message
+_NEG = re.compile(r"negative", re.IGNORECASE)
+
 # -----------------------------------------------------------------------------
-# Agent Prompt Functions
+# Agent Prompts
 # -----------------------------------------------------------------------------
 
-
-def get_sentiment_agent_prompt() -> str:
-    """
-    Returns the prompt for the sentiment analysis agent.
-    Classifies user reviews as positive, negative, or neutral.
-    """
-    return """
+# Prompt for the sentiment analysis agent.
+# Classifies user reviews as positive, negative, or neutral.
+SENTIMENT_PROMPT: Final[str] = """
     Your job is to classify the sentiment of a user review and output a single sentiment label.
     The sentiment categories must be either "positive", "negative", or "neutral".
     Do not output anything except the sentiment. No additional commentary.
     """
 
-
-def get_topic_agent_prompt() -> str:
-    """
-    Returns the prompt for the topic classification agent.
-    Determines the main topic of a user review.
-    """
-    return """
+# Prompt for the topic classification agent.
+# Determines the main topic of a user review.
+TOPIC_PROMPT: Final[str] = """
     Your job is to classify a user review into its main topic and output a single topic label.
     Example negative topics: "Used product", "doesnt work", "broken item", "late delivery".
     Example positive topics: "Excellent", "brand new", "works great", "good craftsmanship".
     Do not output anything except the main topic. No additional commentary.
     """
 
-
-def get_summarizer_agent_prompt() -> str:
-    """
-    Returns the prompt for the summarization agent.
-    Provides a brief summary of the customer inquiry.
-    """
-    return """
+# Prompt for the summarization agent.
+# Provides a brief summary of the customer inquiry.
+SUMMARIZER_PROMPT: Final[str] = """
     In a brief, natural language sentence, describe the customer inquiry.
     Include in quotes any category tags that have been assigned.
     """
 
 
 # -----------------------------------------------------------------------------
-# Initialize Agents
+# Local Sentiment Classifier
 # -----------------------------------------------------------------------------
 
-# User proxy agent acting as the admin initiator
-user = UserProxyAgent(
-    name="Admin",
-    system_message="A human admin.",
-    is_termination_msg=lambda msg: (
-        msg.get("content") is not None and "TERMINATE" in msg.get("content")
-    ),
-    human_input_mode="NEVER",
-    code_execution_config=False,
-)
+# Small local model used instead of the LLM for clear-cut reviews. It predicts the
+# same three labels as SENTIMENT_PROMPT (negative, neutral, positive), so neutral
+# reviews are not forced into positive or negative. The weights (~500 MB) are
+# downloaded from the Hugging Face Hub on first use.
+FAST_SENTIMENT_MODEL = "cardiffnlp/twitter-roberta-base-sentiment-latest"
 
-# Sentiment analysis agent
-sentiment_agent = AssistantAgent(
-    name="Sentiment",
-    system_message=get_sentiment_agent_prompt(),
-    llm_config=llm_config,
-)
+# Minimum confidence of the local model for skipping the sentiment LLM call
+FAST_SENTIMENT_THRESHOLD = 0.85
 
-# Topic classification agent
-topic_agent = AssistantAgent(
-    name="Topic",
-    system_message=get_topic_agent_prompt(),
-    llm_config=llm_config,
-)
 
-# Summarization agent
-summarize_agent = AssistantAgent(
-    name="Summarize",
-    system_message=get_summarizer_agent_prompt(),
-    llm_config=llm_config,
-)
+@functools.lru_cache(maxsize=1)
+def _get_sentiment_pipeline():
+    """
+    Loads the local sentiment classifier once, on first use.
 
-# -----------------------------------------------------------------------------
-# Custom Speaker Selection Function
-# -----------------------------------------------------------------------------
+    Returns:
+        A transformers text classification pipeline running on the CPU.
+    """
+    from transformers import pipeline
+
+    return pipeline("sentiment-analysis", model=FAST_SENTIMENT_MODEL, device=-1)
 
 
-def custom_speaker_selection_func(last_speaker: Agent, groupchat: GroupChat):
+def classify_sentiment_fast(text: str) -> tuple[str, float]:
     """
-    Determines the next speaker based on the last speaker and message content.
+    Classifies the sentiment of a review with the local model.
 
     Args:
-        last_speaker: The agent who spoke last.
-        groupchat: The current group chat instance.
+        text: The review to classify.
 
     Returns:
-        The next agent to speak.
+        A tuple of the lowercase label ("positive", "neutral" or "negative") and its confidence.
     """
-    messages = groupchat.messages
-
-    # If the user initiated, next is the sentiment agent
-    if last_speaker == user:
-        return sentiment_agent
-    # After sentiment analysis, decide based on sentiment value
-    elif last_speaker == sentiment_agent:
-        last_message = messages[-1]["content"]
-        if "negative" in last_message.lower():
-            return topic_agent
-        else:
-            return summarize_agent
-    # After topic classification, move to summarization
-    elif last_speaker == topic_agent:
-        return summarize_agent
-    # Optionally, a default case can be added
+    result = _get_sentiment_pipeline()(text, truncation=True)[0]
+    return result["label"].lower(), result["score"]
 
 
-# -----------------------------------------------------------------------------
-# Group Chat Initialization
-# -----------------------------------------------------------------------------
+def fast_sentiment_reply(recipient, messages=None, sender=None, config=None):
+    """
+    Reply function answering for the sentiment agent when the local model is confident.
+
+    Args:
+        recipient: The sentiment agent generating the reply.
+        messages: The messages received so far.
+        sender: The agent requesting the reply.
+        config: Unused reply function configuration.
+
+    Returns:
+        A tuple of (True, label) when confident, otherwise (False, None) so the
+        sentiment agent falls back to its LLM.
+    """
+    label, confidence = classify_sentiment_fast(messages[-1]["content"])
+    if confidence > FAST_SENTIMENT_THRESHOLD:
+        return True, label
+    return False, None
 
-# Create group chat using custom speaker selection function
-groupchat = GroupChat(
-    agents=[sentiment_agent, topic_agent, summarize_agent],
-    messages=[],
-    max_round=20,
-    speaker_selection_method=custom_speaker_selection_func,
-)
 
 # -----------------------------------------------------------------------------
-# Group Chat Manager Setup
+# Group Chat Setup
 # -----------------------------------------------------------------------------
 
-# Initialize group chat manager to handle interactions
-manager = GroupChatManager(
-    groupchat=groupchat,
-    llm_config=llm_config,
-)
+
+def create_group_chat() -> tuple[UserProxyAgent, GroupChatManager]:
+    """
+    Initializes the agents, the conditional group chat and its manager.
+
+    Agents are only created when this function is called, so importing the
+    module has no side effects.
+
+    Returns:
+        A tuple of the admin user proxy and the group chat manager.
+    """
+    # User proxy agent acting as the admin initiator
+    user = UserProxyAgent(
+        name="Admin",
+        system_message="A human admin.",
+        is_termination_msg=lambda msg: (
+            msg.get("content") is not None and "TERMINATE" in msg.get("content")
+        ),
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
+
+    # Sentiment analysis agent
+    sentiment_agent = AssistantAgent(
+        name="Sentiment",
+        system_message=SENTIMENT_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Answer clear-cut reviews locally; the LLM only handles uncertain ones
+    sentiment_agent.register_reply([Agent, None], fast_sentiment_reply)
+
+    # Topic classification agent
+    topic_agent = AssistantAgent(
+        name="Topic",
+        system_message=TOPIC_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Summarization agent
+    summarize_agent = AssistantAgent(
+        name="Summarize",
+        system_message=SUMMARIZER_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Transition table mapping the last speaker to a function of the chat messages
+    # that returns the next speaker
+    transitions = {
+        # If the user initiated, next is the sentiment agent
+        user: lambda messages: sentiment_agent,
+        # After sentiment analysis, decide based on sentiment value
+        sentiment_agent: lambda messages: (
+            topic_agent if _NEG.search(messages[-1]["content"]) else summarize_agent
+        ),
+        # After topic classification, move to summarization
+        topic_agent: lambda messages: summarize_agent,
+    }
+
+    def custom_speaker_selection_func(last_speaker: Agent, groupchat: GroupChat):
+        """
+        Determines the next speaker based on the last speaker and message content.
+
+        Args:
+            last_speaker: The agent who spoke last.
+            groupchat: The current group chat instance.
+
+        Returns:
+            The next agent to speak, or None if the last speaker has no transition.
+        """
+        next_speaker = transitions.get(last_speaker)
+        return next_speaker(groupchat.messages) if next_speaker else None
+
+    # Create group chat using custom speaker selection function
+    groupchat = GroupChat(
+        agents=[sentiment_agent, topic_agent, summarize_agent],
+        messages=[],
+        max_round=20,
+        speaker_selection_method=custom_speaker_selection_func,
+    )
+
+    # Initialize group chat manager to handle interactions
+    manager = GroupChatManager(
+        groupchat=groupchat,
+        llm_config=llm_config,
+    )
+
+    return user, manager
+
 
 # -----------------------------------------------------------------------------
 # Execution Example
 # -----------------------------------------------------------------------------
 
-# Sample customer review for demonstration
-customer_review = "I ordered a juicer and grinder and it is too bad.."
 
-print(f"\n## Customer Query: {customer_review}")
-print(
-    "\n## Sequential Multi Agent Pattern, this flow will be (sentiment >> topic >> summarize) no matter what...\n"
-)
-print("##################\n")
+def main():
+    """
+    Runs the conditional group chat on a sample customer review.
+    """
+    user, manager = create_group_chat()
+
+    # Sample customer review for demonstration
+    customer_review = "I ordered a juicer and grinder and it is too bad.."
+
+    sys.stdout.write(
+        f"\n## Customer Query: {customer_review}\n"
+        "\n## Sequential Multi Agent Pattern, this flow will be (sentiment >> topic >> summarize) no matter what...\n\n"
+        "##################\n\n"
+    )
+
+    # Initiate chat with the customer review
+    user.initiate_chat(
+        manager,
+        message=customer_review,
+    )
+
 
-# Initiate chat with the customer review
-user.initiate_chat(
-    manager,
-    message=customer_review,
-)
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,11 @@ This module demonstrates a hierarchical multi-agent group chat system.
 Agents include sentiment analysis, topic classification, technical and car product classification, and summarization.
 """
 
+import asyncio
 import warnings
 import os
 import sys
+from typing import Final
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
@@ -29,186 +31,213 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 from model_config import *
 
 # ---------------------------------------------------------------------------
-# Agent Prompt Functions
+# Agent Prompts
 # ---------------------------------------------------------------------------
 
-
-def get_sentiment_agent_prompt() -> str:
-    """
-    Returns the prompt for the sentiment analysis agent.
-    This prompt instructs the agent to classify user reviews as positive, negative, or neutral.
-    """
-    return """
+# Prompt for the sentiment analysis agent.
+# This prompt instructs the agent to classify user reviews as positive, negative, or neutral.
+SENTIMENT_PROMPT: Final[str] = """
     Your job is to classify the sentiment of a user review and output a single sentiment label.
     The sentiment categories have to be either "positive", "negative", or "neutral".
     Do not output anything except the sentiment. Do not include any additional commentary.
     """
 
-
-def get_topic_agent_prompt() -> str:
-    """
-    Returns the prompt for the topic classification agent.
-    This prompt instructs the agent to determine the main topic of a user review.
-    """
-    return """
+# Prompt for the topic classification agent.
+# This prompt instructs the agent to determine the main topic of a user review.
+TOPIC_PROMPT: Final[str] = """
     Your job is to classify a user review into its main topic and output a single topic label.
     Some example topics for negative reviews could be "Used product", "doesnt work", "broken item", "late delivery", etc.
     Some example topics for positive reviews could be "Excellent", "brand new", "works great", "good craftsmanship", etc.
     Do not output anything except the main topic. Do not include any additional commentary.
     """
 
-
-def get_tech_product_agent_prompt() -> str:
-    """
-    Returns the prompt for the technical product classification agent.
-    This prompt instructs the agent to classify a review regarding technical products like phones, tablets, laptops, etc.
-    """
-    return """
+# Prompt for the technical product classification agent.
+# This prompt instructs the agent to classify a review regarding technical products like phones, tablets, laptops, etc.
+TECH_PRODUCT_PROMPT: Final[str] = """
     Your job is to classify a user review into technical products like phone, tablets, laptops, etc.
     If the review is not about a technology product, do not do anything.
     Do not output anything except the sentiment. Do not include any additional commentary.
     """
 
-
-def get_car_product_agent_prompt() -> str:
-    """
-    Returns the prompt for the car product classification agent.
-    This prompt instructs the agent to classify a review regarding car products.
-    """
-    return """
+# Prompt for the car product classification agent.
+# This prompt instructs the agent to classify a review regarding car products.
+CAR_PRODUCT_PROMPT: Final[str] = """
     Your job is to classify a user review into car products.
     If the review is not about a car product, do not do anything.
     Do not output anything except the sentiment. Do not include any additional commentary.
     """
 
-
-def get_summarizer_agent_prompt() -> str:
-    """
-    Returns the prompt for the summarization agent.
-    This prompt instructs the agent to provide a brief summary of the customer inquiry.
-    """
-    return """
+# Prompt for the summarization agent.
+# This prompt instructs the agent to provide a brief summary of the customer inquiry.
+SUMMARIZER_PROMPT: Final[str] = """
     In a brief, natural language sentence, describe the customer inquiry.
     Include in quotes any category tags that have been assigned.
     """
 
 
 # ---------------------------------------------------------------------------
-# Initialize Agents
+# Group Chat Setup
 # ---------------------------------------------------------------------------
 
-# Create a user proxy agent acting as an admin initiator
-user = UserProxyAgent(
-    name="Admin",
-    system_message="A human admin.",
-    is_termination_msg=lambda msg: (
-        msg.get("content") is not None and "TERMINATE" in msg.get("content")
-    ),
-    human_input_mode="NEVER",
-    code_execution_config=False,
-)
-
-# Initialize the sentiment analysis agent
-sentiment_agent = AssistantAgent(
-    name="Sentiment",
-    system_message=get_sentiment_agent_prompt(),
-    llm_config=llm_config,
-)
 
-# Initialize the topic classification agent
-topic_agent = AssistantAgent(
-    name="Topic",
-    system_message=get_topic_agent_prompt(),
-    llm_config=llm_config,
-)
-
-# Initialize the technical product classification agent
-tech_agent = AssistantAgent(
-    name="TechnologyProducts",
-    system_message=get_tech_product_agent_prompt(),
-    llm_config=llm_config,
-)
+def create_group_chat() -> tuple[UserProxyAgent, GroupChatManager]:
+    """
+    Initializes the agents, the hierarchical group chat and its manager.
 
-# Initialize the car product classification agent
-car_agent = AssistantAgent(
-    name="CarProducts",
-    system_message=get_car_product_agent_prompt(),
-    llm_config=llm_config,
-)
+    Agents are only created when this function is called, so importing the
+    module has no side effects.
 
-# Initialize the summarization agent
-summarize_agent = AssistantAgent(
-    name="Summarize",
-    system_message=get_summarizer_agent_prompt(),
-    llm_config=llm_config,
-)
+    Returns:
+        A tuple of the admin user proxy and the group chat manager.
+    """
+    # Create a user proxy agent acting as an admin initiator
+    user = UserProxyAgent(
+        name="Admin",
+        system_message="A human admin.",
+        is_termination_msg=lambda msg: (
+            msg.get("content") is not None and "TERMINATE" in msg.get("content")
+        ),
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
+
+    # Initialize the sentiment analysis agent
+    sentiment_agent = AssistantAgent(
+        name="Sentiment",
+        system_message=SENTIMENT_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Initialize the topic classification agent
+    topic_agent = AssistantAgent(
+        name="Topic",
+        system_message=TOPIC_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Initialize the technical product classification agent
+    tech_agent = AssistantAgent(
+        name="TechnologyProducts",
+        system_message=TECH_PRODUCT_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Initialize the car product classification agent
+    car_agent = AssistantAgent(
+        name="CarProducts",
+        system_message=CAR_PRODUCT_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Initialize the summarization agent
+    summarize_agent = AssistantAgent(
+        name="Summarize",
+        system_message=SUMMARIZER_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Group chat member that queries both domain agents concurrently
+    domain_agent = ConversableAgent(
+        name="ProductDomains",
+        description="Classifies a user review into technology products or car products.",
+        llm_config=False,
+        human_input_mode="NEVER",
+    )
+
+    async def classify_domains(recipient, messages=None, sender=None, config=None):
+        """
+        Runs the technical and car product agents in parallel on the review.
+
+        Args:
+            recipient: The domain agent generating the reply.
+            messages: The group chat messages so far.
+            sender: The agent requesting the reply.
+            config: Unused reply function configuration.
+
+        Returns:
+            A tuple of (True, the non-empty domain classifications).
+        """
+        replies = await asyncio.gather(
+            tech_agent.a_generate_reply(messages=messages, sender=sender),
+            car_agent.a_generate_reply(messages=messages, sender=sender),
+        )
+        # Drop the agent that found the review outside its domain and stayed silent
+        contents = [
+            reply.get("content") if isinstance(reply, dict) else reply
+            for reply in replies
+        ]
+        return True, "\n".join(
+            content for content in contents if content and content.strip()
+        )
+
+    domain_agent.register_reply([Agent, None], classify_domains)
+
+    # Transition table mapping the last speaker to the next speaker
+    transitions = {
+        # When initiated by the user, let the manager decide the domain.
+        user: "auto",
+        # After the domain-specific agents, route to the topic agent.
+        domain_agent: topic_agent,
+        # After topic classification, route to the summarization agent.
+        topic_agent: summarize_agent,
+    }
 
-# ---------------------------------------------------------------------------
-# Custom Speaker Selection Function
-# ---------------------------------------------------------------------------
+    def custom_speaker_selection_func(last_speaker: Agent, groupchat: GroupChat):
+        """
+        Determines the next speaker based on the last speaker in the conversation.
 
+        Args:
+            last_speaker: The agent who spoke last.
+            groupchat: The current group chat instance containing all messages.
 
-def custom_speaker_selection_func(last_speaker: Agent, groupchat: GroupChat):
-    """
-    Determines the next speaker based on the last speaker in the conversation.
+        Returns:
+            The next agent to speak or a special command for automatic selection.
+        """
+        # Default case: if the last speaker has no transition, return None.
+        return transitions.get(last_speaker)
 
-    Args:
-        last_speaker: The agent who spoke last.
-        groupchat: The current group chat instance containing all messages.
+    groupchat = GroupChat(
+        agents=[sentiment_agent, topic_agent, summarize_agent, domain_agent],
+        messages=[],
+        max_round=20,
+        speaker_selection_method=custom_speaker_selection_func,
+    )
 
-    Returns:
-        The next agent to speak or a special command for automatic selection.
-    """
-    messages = groupchat.messages
+    manager = GroupChatManager(
+        groupchat=groupchat,
+        llm_config=llm_config,
+    )
 
-    if last_speaker == user:
-        # When initiated by the user, let the manager decide the domain.
-        return "auto"
-    if last_speaker in (tech_agent, car_agent):
-        # After domain-specific agents, route to the topic agent.
-        return topic_agent
-    elif last_speaker == topic_agent:
-        # After topic classification, route to the summarization agent.
-        return summarize_agent
-    # Default case: if none of the conditions match, return None.
-    return None
+    return user, manager
 
 
 # ---------------------------------------------------------------------------
-# Group Chat Initialization
+# Execution Example
 # ---------------------------------------------------------------------------
 
-groupchat = GroupChat(
-    agents=[sentiment_agent, topic_agent, summarize_agent, tech_agent, car_agent],
-    messages=[],
-    max_round=20,
-    speaker_selection_method=custom_speaker_selection_func,
-)
 
-# ---------------------------------------------------------------------------
-# Group Chat Manager Setup
-# ---------------------------------------------------------------------------
+async def main():
+    """
+    Runs the hierarchical group chat on a sample customer review.
+    """
+    user, manager = create_group_chat()
 
-manager = GroupChatManager(
-    groupchat=groupchat,
-    llm_config=llm_config,
-)
+    # Sample customer review for demonstration
+    customer_review = "I ordered a tech product, the screen was broken."
 
-# ---------------------------------------------------------------------------
-# Execution Example
-# ---------------------------------------------------------------------------
+    sys.stdout.write(
+        f"\n## Customer Query: {customer_review}\n"
+        "\n## Sequential Multi Agent Pattern, this flow will be (sentiment >> topic >> summarize) no matter what...\n\n"
+        "##################\n\n"
+    )
 
-# Sample customer review for demonstration
-customer_review = "I ordered a tech product, the screen was broken."
+    # Initiate chat with the customer review; the async chat lets the domain
+    # agents classify the review concurrently
+    await user.a_initiate_chat(
+        manager,
+        message=customer_review,
+    )
 
-print(f"\n## Customer Query: {customer_review}")
-print(
-    "\n## Sequential Multi Agent Pattern, this flow will be (sentiment >> topic >> summarize) no matter what...\n"
-)
-print("##################\n")
 
-# Initiate chat with the customer review
-user.initiate_chat(
-    manager,
-    message=customer_review,
-)
\ No newline at end of file
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,9 +6,14 @@ This module demonstrates a sequential multi-agent group chat system where each a
 - Summarization
 """
 
+import asyncio
+import functools
 import warnings
 import os
 import sys
+from typing import Final
+
+import orjson
 
 # Suppress warnings for cleaner output
 warnings.filterwarnings("ignore")
@@ -31,112 +36,256 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 from model_config import *
 
 # ---------------------------------------------------------------------------
-# Agent Prompt Functions
+# Agent Prompts
 # ---------------------------------------------------------------------------
 
-
-def get_sentiment_agent_prompt() -> str:
-    """
-    Returns the prompt for the sentiment analysis agent.
-    The agent classifies a user review as positive, negative, or neutral.
-    """
-    return """
+# Prompt for the sentiment analysis agent.
+# The agent classifies a user review as positive, negative, or neutral.
+SENTIMENT_PROMPT: Final[str] = """
     Your job is to classify the sentiment of a user review and output a single sentiment label.
     The sentiment categories must be either "positive", "negative", or "neutral".
     Do not output anything except the sentiment. No additional commentary.
     """
 
-
-def get_topic_agent_prompt() -> str:
-    """
-    Returns the prompt for the topic classification agent.
-    The agent identifies the main topic of a user review.
-    """
-    return """
+# Prompt for the topic classification agent.
+# The agent identifies the main topic of a user review.
+TOPIC_PROMPT: Final[str] = """
     Your job is to classify a user review into its main topic and output a single topic label.
     Example negative topics: "Used product", "doesnt work", "broken item", "late delivery", etc.
     Example positive topics: "Excellent", "brand new", "works great", "good craftsmanship", etc.
     Do not output anything except the main topic. No additional commentary.
     """
 
-
-def get_summarizer_agent_prompt() -> str:
-    """
-    Returns the prompt for the summarization agent.
-    The agent provides a brief summary of the customer inquiry.
-    """
-    return """
+# Prompt for the summarization agent.
+# The agent provides a brief summary of the customer inquiry.
+SUMMARIZER_PROMPT: Final[str] = """
     In a brief, natural language sentence, describe the customer inquiry.
     Include in quotes any category tags that have been assigned.
     """
 
+# Prompt for the fused review analysis agent.
+# The agent performs all three tasks in a single call and answers in JSON.
+REVIEW_ANALYSIS_PROMPT: Final[str] = """
+    Your job is to analyze a user review and output a single JSON object with exactly these keys:
+    "sentiment": the sentiment of the review, either "positive", "negative", or "neutral".
+    "topic": a single topic label, e.g. "Used product", "broken item", "works great", "brand new".
+    "summary": a brief, natural language sentence describing the customer inquiry,
+    including in quotes the sentiment and topic labels.
+    Do not output anything except the JSON object. No additional commentary.
+    """
+
 
 # ---------------------------------------------------------------------------
 # Initialize Agents
 # ---------------------------------------------------------------------------
 
-# Create a user proxy agent acting as an admin initiator
-user = UserProxyAgent(
-    name="Admin",
-    system_message="A human admin.",
-    is_termination_msg=lambda msg: (
-        msg.get("content") is not None and "TERMINATE" in msg.get("content")
-    ),
-    human_input_mode="NEVER",
-    code_execution_config=False,
-)
 
-# Initialize the sentiment analysis agent
-sentiment_agent = AssistantAgent(
-    name="Sentiment",
-    system_message=get_sentiment_agent_prompt(),
-    llm_config=llm_config,
-)
+@functools.lru_cache(maxsize=None)
+def get_agents() -> (
+    tuple[UserProxyAgent, AssistantAgent, AssistantAgent, AssistantAgent]
+):
+    """
+    Builds the admin, sentiment, topic and summarization agents once per process.
 
-# Initialize the topic classification agent
-topic_agent = AssistantAgent(
-    name="Topic",
-    system_message=get_topic_agent_prompt(),
-    llm_config=llm_config,
-)
+    Later calls return the same agents, so a long-running worker reuses them
+    across conversations (see run_group_chat) instead of reconstructing them.
+
+    Returns:
+        A tuple of (user, sentiment_agent, topic_agent, summarize_agent).
+    """
+    # Create a user proxy agent acting as an admin initiator
+    user = UserProxyAgent(
+        name="Admin",
+        system_message="A human admin.",
+        is_termination_msg=lambda msg: (
+            msg.get("content") is not None and "TERMINATE" in msg.get("content")
+        ),
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
+
+    # Initialize the sentiment analysis agent
+    sentiment_agent = AssistantAgent(
+        name="Sentiment",
+        system_message=SENTIMENT_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Initialize the topic classification agent
+    topic_agent = AssistantAgent(
+        name="Topic",
+        system_message=TOPIC_PROMPT,
+        llm_config=llm_config,
+    )
+
+    # Initialize the summarization agent
+    summarize_agent = AssistantAgent(
+        name="Summarize",
+        system_message=SUMMARIZER_PROMPT,
+        llm_config=llm_config,
+    )
+
+    return user, sentiment_agent, topic_agent, summarize_agent
+
+
+user, sentiment_agent, topic_agent, summarize_agent = get_agents()
+
+
+@functools.lru_cache(maxsize=None)
+def get_review_agent() -> AssistantAgent:
+    """
+    Builds the fused review analysis agent on first use (only the --fused path needs it).
+
+    Returns:
+        The review analysis agent.
+    """
+    return AssistantAgent(
+        name="ReviewAnalysis",
+        system_message=REVIEW_ANALYSIS_PROMPT,
+        llm_config=llm_config,
+    )
+
+# ---------------------------------------------------------------------------
+# Direct Agent Calls
+# ---------------------------------------------------------------------------
+
+
+def _reply_content(reply) -> str:
+    """
+    Extracts the text content of an agent reply.
+
+    Args:
+        reply: The reply returned by generate_reply or a_generate_reply.
+
+    Returns:
+        The reply text.
+    """
+    return reply.get("content") if isinstance(reply, dict) else reply
+
+
+def call(agent: AssistantAgent, content: str) -> str:
+    """
+    Asks a single agent for a reply to one message, outside of any chat.
+
+    Args:
+        agent: The agent to query.
+        content: The user message.
+
+    Returns:
+        The agent's reply text.
+    """
+    reply = agent.generate_reply(messages=[{"role": "user", "content": content}])
+    return _reply_content(reply)
+
+
+async def acall(agent: AssistantAgent, content: str) -> str:
+    """
+    Asks a single agent for a reply to one message, outside of any chat.
+
+    Args:
+        agent: The agent to query.
+        content: The user message.
+
+    Returns:
+        The agent's reply text.
+    """
+    reply = await agent.a_generate_reply(messages=[{"role": "user", "content": content}])
+    return _reply_content(reply)
+
+
+async def run_pipeline(review: str) -> str:
+    """
+    Runs the sentiment >> topic >> summarize pipeline as a DAG.
+
+    Sentiment and topic classification do not depend on each other, so they
+    run concurrently; only the summarization waits for both.
+
+    Args:
+        review: The customer review to analyze.
+
+    Returns:
+        The summary of the customer inquiry.
+    """
+    sentiment, topic = await asyncio.gather(
+        acall(sentiment_agent, review), acall(topic_agent, review)
+    )
+    return await acall(
+        summarize_agent, f"Review: {review}\nSentiment: {sentiment}\nTopic: {topic}"
+    )
+
+
+def analyze_review(review: str) -> dict:
+    """
+    Computes sentiment, topic and summary of a review in one LLM call.
+
+    This avoids the three sequential LLM round trips (plus the manager's
+    orchestration) of the group chat below. If the reply is missing or not a
+    JSON object, the three agents are asked one after the other instead.
+
+    Args:
+        review: The customer review to analyze.
+
+    Returns:
+        A dict with "sentiment", "topic" and "summary" keys.
+    """
+    result = _parse_review_analysis(call(get_review_agent(), review))
+    if result is not None:
+        return result
+
+    # Fall back to the sequential sentiment >> topic >> summarize calls
+    sentiment = call(sentiment_agent, review)
+    topic = call(topic_agent, review)
+    summary = call(
+        summarize_agent, f"Review: {review}\nSentiment: {sentiment}\nTopic: {topic}"
+    )
+    return {"sentiment": sentiment, "topic": topic, "summary": summary}
+
+
+def _parse_review_analysis(content) -> dict | None:
+    """
+    Parses the JSON object of a fused review analysis reply.
+
+    Args:
+        content: The reply text, or None if the agent gave no reply.
+
+    Returns:
+        The parsed dict, or None if the reply holds no valid JSON object.
+    """
+    if not isinstance(content, str):
+        return None
+
+    # Tolerate a markdown code fence around the JSON object
+    start, end = content.find("{"), content.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        result = orjson.loads(content[start : end + 1])
+    except orjson.JSONDecodeError:
+        return None
+    return result if isinstance(result, dict) else None
 
-# Initialize the summarization agent
-summarize_agent = AssistantAgent(
-    name="Summarize",
-    system_message=get_summarizer_agent_prompt(),
-    llm_config=llm_config,
-)
 
 # ---------------------------------------------------------------------------
 # Custom Speaker Selection Function
 # ---------------------------------------------------------------------------
 
+# Speaker order of the strict user >> sentiment >> topic >> summarize pipeline,
+# indexed by the number of messages posted after the user's review
+_ORDER = (sentiment_agent, topic_agent, summarize_agent, None)
+
 
 def custom_speaker_selection_func(last_speaker: Agent, groupchat: GroupChat):
     """
-    Determines the next agent to speak based on the last speaker.
+    Determines the next agent to speak from the position in the pipeline.
 
     Args:
         last_speaker: The agent who spoke last.
         groupchat: The current group chat instance containing all messages.
 
     Returns:
-        The next agent to speak.
+        The next agent to speak, or None once the summary has been given.
     """
-    messages = groupchat.messages
-
-    # If the user initiated the conversation, start with the sentiment agent
-    if last_speaker == user:
-        return sentiment_agent
-    # After sentiment analysis, move to topic classification
-    elif last_speaker == sentiment_agent:
-        return topic_agent
-    # After topic classification, proceed to summarization
-    elif last_speaker == topic_agent:
-        return summarize_agent
-
-    # If no condition matches, return None
-    return None
+    return _ORDER[min(len(groupchat.messages) - 1, len(_ORDER) - 1)]
 
 
 # ---------------------------------------------------------------------------
@@ -159,6 +308,25 @@ manager = GroupChatManager(
     llm_config=llm_config,
 )
 
+
+def run_group_chat(review: str):
+    """
+    Runs the sequential group chat for one review, reusing the cached agents.
+
+    Chat histories from previous conversations are cleared first.
+
+    Args:
+        review: The customer review to analyze.
+
+    Returns:
+        The ChatResult of the conversation.
+    """
+    for agent in (*get_agents(), manager):
+        agent.reset()
+    groupchat.reset()
+
+    return user.initiate_chat(manager, message=review)
+
 # ---------------------------------------------------------------------------
 # Execution Example
 # ---------------------------------------------------------------------------
@@ -167,11 +335,20 @@ manager = GroupChatManager(
 customer_review = "I ordered a juicer and grinder and it is awesome.."
 
 print(f"\n## Customer Query: {customer_review}")
-print("\n## Sequential Multi Agent Pattern: sentiment >> topic >> summarize\n")
-print("##################\n")
-
-# Initiate chat with the customer review
-user.initiate_chat(
-    manager,
-    message=customer_review,
-)
\ No newline at end of file
+
+if "--fused" in sys.argv:
+    # Run all three tasks as a single structured LLM call
+    print("\n## Fused Single-Call Pattern: sentiment + topic + summary\n")
+    print("##################\n")
+    print(analyze_review(customer_review))
+elif "--parallel" in sys.argv:
+    # Classify sentiment and topic concurrently, then summarize
+    print("\n## Parallel Pattern: (sentiment | topic) >> summarize\n")
+    print("##################\n")
+    print(asyncio.run(run_pipeline(customer_review)))
+else:
+    print("\n## Sequential Multi Agent Pattern: sentiment >> topic >> summarize\n")
+    print("##################\n")
+
+    # Initiate chat with the customer review
+    run_group_chat(customer_review)
\ No newline at end of file
@@ -7,7 +7,10 @@ A user proxy (Admin) coordinates the conversation.
 """
 
 from autogen import AssistantAgent, UserProxyAgent
+import functools
+import hashlib
 import os
+import shelve
 import sys
 
 # -----------------------------------------------------------------------------
@@ -19,64 +22,121 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 # Import configuration settings from model_config.
 from model_config import *
 
+# Append the evaluation module directory for the termination detector.
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../05_eval")))
+from termination import detect_termination
+
+# On-disk cache of answers and critiques, keyed by a hash of their inputs.
+CACHE_PATH = os.path.join(os.path.dirname(__file__), "critique_cache")
+
 # -----------------------------------------------------------------------------
 # Agent Initialization
 # -----------------------------------------------------------------------------
-# Create the answering agent with a detailed answer prompt.
-answerer = AssistantAgent(
-    name="Answerer",
-    llm_config=llm_config,
-    system_message=(
-        "You are a knowledgeable assistant who provides detailed answers to questions. "
-        "After giving the answer, end with TERMINATE in a new line."
-    ),
-)
-
-# Create the critic agent with instructions for evaluating the answer.
-critic = AssistantAgent(
-    name="Critic",
-    llm_config=llm_config,
-    system_message=(
-        "You are a critical thinker who evaluates answers for accuracy, completeness, and clarity. "
-        "Provide constructive feedback and suggestions for improvement."
-    ),
-)
-
-# Create a user proxy agent acting as an admin initiator.
-user_proxy = UserProxyAgent(
-    name="Admin",
-    system_message="A human admin.",
-    is_termination_msg=lambda msg: (
-        msg.get("content") is not None and "TERMINATE" in msg.get("content")
-    ),
-    human_input_mode="NEVER",
-    code_execution_config=False,
-)
+@functools.lru_cache(maxsize=None)
+def get_agents():
+    """
+    Builds the answerer, critic and admin agents once per process.
+
+    Later calls return the same agents, so repeated conversations reuse them
+    instead of reconstructing them; initiate_chat clears their chat history.
+
+    Returns:
+        tuple: The (answerer, critic, user_proxy) agents.
+    """
+    # Create the answering agent with a detailed answer prompt.
+    answerer = AssistantAgent(
+        name="Answerer",
+        llm_config=llm_config,
+        system_message=(
+            "You are a knowledgeable assistant who provides detailed answers to questions. "
+            "After giving the answer, end with TERMINATE in a new line."
+        ),
+    )
+
+    # Create the critic agent with instructions for evaluating the answer.
+    critic = AssistantAgent(
+        name="Critic",
+        llm_config=llm_config,
+        system_message=(
+            "You are a critical thinker who evaluates answers for accuracy, completeness, and clarity. "
+            "Provide constructive feedback and suggestions for improvement."
+        ),
+    )
+
+    # Create a user proxy agent acting as an admin initiator.
+    user_proxy = UserProxyAgent(
+        name="Admin",
+        system_message="A human admin.",
+        is_termination_msg=lambda msg: (
+            msg.get("content") is not None and "TERMINATE" in msg.get("content")
+        ),
+        human_input_mode="NEVER",
+        code_execution_config=False,
+    )
+
+    return answerer, critic, user_proxy
+
+
+answerer, critic, user_proxy = get_agents()
 
 
 # -----------------------------------------------------------------------------
 # Conversation Function
 # -----------------------------------------------------------------------------
-def get_answer_with_critique(question):
+def _cache_key(*parts):
+    """
+    Hashes the inputs of an agent call into a cache key.
+
+    Args:
+        *parts (str): The strings identifying the call.
+
+    Returns:
+        str: A 128-bit BLAKE2b hex digest.
+    """
+    return hashlib.blake2b("\x1f".join(parts).encode(), digest_size=16).hexdigest()
+
+
+def get_answer_with_critique(question, skip_critic_if_terminate=False):
     """
     Initiates a conversation to obtain an answer and then a critique for the given question.
 
+    Answers are cached by question and critiques by (question, answer), so a
+    repeated question makes no LLM calls.
+
     Args:
         question (str): The question to be answered and evaluated.
+        skip_critic_if_terminate (bool): Skip the critique when the answer contains
+            a termination phrase.
+
+    Returns:
+        tuple: The answer and the critique (None if the critique was skipped).
     """
-    # Initiate chat with the answerer to get the answer.
-    user_proxy.initiate_chat(
-        answerer, message=f"Please answer this question: {question}"
-    )
+    with shelve.open(CACHE_PATH) as cache:
+        answer_key = _cache_key("answer", question)
+        answer = cache.get(answer_key)
+        if answer is None:
+            # Initiate chat with the answerer to get the answer.
+            user_proxy.initiate_chat(
+                answerer, message=f"Please answer this question: {question}"
+            )
 
-    # Retrieve the last message, which contains the answer.
-    answer = user_proxy.last_message()
+            # Retrieve the last message, which contains the answer.
+            answer = cache[answer_key] = user_proxy.last_message(answerer)["content"]
 
-    # Initiate chat with the critic to evaluate the answer.
-    user_proxy.initiate_chat(
-        critic,
-        message=f"Please evaluate this answer to the question '{question}':\n\n{answer}",
-    )
+        if skip_critic_if_terminate and detect_termination(answer):
+            return answer, None
+
+        critique_key = _cache_key("critique", question, answer)
+        critique = cache.get(critique_key)
+        if critique is None:
+            # Initiate chat with the critic to evaluate the answer.
+            user_proxy.initiate_chat(
+                critic,
+                message=f"Please evaluate this answer to the question '{question}':\n\n{answer}",
+            )
+            critique = cache[critique_key] = user_proxy.last_message(critic)["content"]
+
+    return answer, critique
 
 
 # -----------------------------------------------------------------------------
@@ -84,4 +144,8 @@ def get_answer_with_critique(question):
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
     question = "What are the main causes of climate change?"
-    get_answer_with_critique(question)
\ No newline at end of file
+    answer, critique = get_answer_with_critique(question)
+
+    # Print the results; cached answers produce no chat output of their own.
+    print(f"\n## Answer:\n{answer}")
+    print(f"\n## Critique:\n{critique if critique is not None else '(skipped)'}")
\ No newline at end of file
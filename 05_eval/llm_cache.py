@@ -0,0 +1,110 @@
+"""
+llm_cache.py
+------------
+Purpose: Provides a two-tier cache for LLM evaluator responses.
+Responses are keyed on a SHA-256 hash of the model, prompt, temperature and
+max_tokens. Lookups hit a process-level dict first and fall back to a small
+SQLite database, so repeated evaluations of identical inputs (e.g. on every
+CI run) skip the Together AI roundtrip entirely.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+# Default location of the SQLite cache database (next to this module)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(__file__), "llm_cache.db")
+
+
+class DiskLLMCache:
+    """An in-memory + SQLite-backed key/value store for LLM responses with a TTL."""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, ttl: float = 3600.0):
+        """
+        Initialize the cache and create the backing table if needed.
+
+        Parameters:
+        * db_path: Path of the SQLite database file.
+        * ttl: Number of seconds a cached response stays valid.
+        """
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache(key TEXT PRIMARY KEY, response TEXT, expires REAL)"
+        )
+        self.conn.commit()
+        self.ttl = ttl
+
+        # Process-level tier mapping a key to (response, expiry timestamp)
+        self.memory: Dict[str, Tuple[str, float]] = {}
+
+        # Hit/miss counters for monitoring the cache effectiveness
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(model: str, prompt: str, temperature: float, max_tokens: int,
+                 system: Optional[str] = None) -> str:
+        """
+        Compute a deterministic cache key for an LLM request.
+
+        Parameters:
+        * model: Name of the LLM model.
+        * prompt: The full prompt sent to the model.
+        * temperature: Sampling temperature of the LLM.
+        * max_tokens: Maximum number of generated tokens.
+        * system: Optional system message sent along with the prompt.
+
+        Returns:
+        * Hex-encoded SHA-256 digest.
+        """
+        fields = {"m": model, "p": prompt, "t": temperature, "mt": max_tokens}
+        # Requests without a system message keep their existing keys
+        if system is not None:
+            fields["s"] = system
+        payload = json.dumps(fields, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response, checking memory before disk.
+
+        Parameters:
+        * key: Cache key produced by make_key.
+
+        Returns:
+        * The cached response, or None on a miss or if the entry expired.
+        """
+        now = time.time()
+
+        entry = self.memory.get(key)
+        if entry is None:
+            row = self.conn.execute(
+                "SELECT response, expires FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = self.memory[key] = (row[0], row[1])
+
+        if entry is None or entry[1] < now:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: str, response: str) -> None:
+        """
+        Store a response under the given key in both tiers.
+
+        Parameters:
+        * key: Cache key produced by make_key.
+        * response: The model's response content.
+        """
+        expires = time.time() + self.ttl
+        self.memory[key] = (response, expires)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO cache(key, response, expires) VALUES (?, ?, ?)",
+            (key, response, expires),
+        )
+        self.conn.commit()
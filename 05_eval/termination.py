@@ -3,13 +3,34 @@ Module: Termination Detection
 This module contains a function to detect if a conversation should be gracefully terminated based on user messages.
 """
 
+import re
+from importlib.util import find_spec
+
+# Lowercased phrases whose presence ends a conversation.
+TERMINATION_PHRASES = ("thank you", "bye", "that's all", "thats all", "goodbye")
+
+# Termination phrases compiled into one case-insensitive alternation, so a message is
+# scanned in a single pass without building a lowercased copy.
+_TERM_RE = re.compile("|".join(map(re.escape, TERMINATION_PHRASES)), re.IGNORECASE)
+
+# When pyahocorasick is installed, an Aho-Corasick automaton matches all phrases in
+# one linear pass whose cost does not grow with the number of phrases.
+_AUTOMATON = None
+if find_spec("ahocorasick") is not None:
+    import ahocorasick
+
+    _AUTOMATON = ahocorasick.Automaton()
+    for _phrase in TERMINATION_PHRASES:
+        _AUTOMATON.add_word(_phrase, _phrase)
+    _AUTOMATON.make_automaton()
+
 
 def detect_termination(user_message):
     """
     Detects if a conversation should be gracefully terminated.
 
     This function checks the user_message for any termination phrases such as "thank you", "bye",
-    "that's all", or "goodbye". If any of these phrases are found, it returns True indicating
+    "that's all" (with or without the apostrophe), or "goodbye". If any of these phrases are found, it returns True indicating
     that the conversation should be terminated.
 
     Args:
@@ -18,14 +39,9 @@ def detect_termination(user_message):
     Returns:
         bool: True if a termination phrase is detected, otherwise False.
     """
-    # Define a list of termination phrases to check in the message.
-    termination_phrases = ["thank you", "bye", "that's all", "goodbye"]
-
-    # Convert the message to lower case and check for each termination phrase.
-    for phrase in termination_phrases:
-        if phrase in user_message.lower():
-            return True
-    return False
+    if _AUTOMATON is not None:
+        return next(_AUTOMATON.iter(user_message.lower()), None) is not None
+    return _TERM_RE.search(user_message) is not None
 
 
 # -----------------------------------------------------------------------------
@@ -1,22 +1,131 @@
 # Section: AI Usage Monitoring using Logging
+import atexit
 import logging
+import mmap
+import os
+import queue
+import struct
+import time
+from logging.handlers import QueueHandler, QueueListener
 
-# Configure logging to record AI interactions.
-logging.basicConfig(filename="ai_usage.log", level=logging.INFO)
+import orjson
+
+# Header of every binary record: payload length (u32) and timestamp in ns (u64).
+_RECORD_HEADER = struct.Struct("<IQ")
+
+# The first 8 bytes of a binary log hold the end offset of the written records.
+_OFFSET_FIELD = struct.Struct("<Q")
+
+
+class MmapRecordHandler(logging.Handler):
+    """
+    Logging handler appending length-prefixed binary records to a memory-mapped file.
+
+    Each record is stored as [u32 length | u64 timestamp ns | JSON payload]. The
+    file is pre-sized and grown in large steps, so writing a record is a memcpy
+    into the page cache instead of a write() syscall.
+    """
+
+    def __init__(self, filename, size=256 << 20):
+        """
+        Open (or create) the binary log and map it into memory.
+
+        Parameters:
+        * filename: Path of the binary log file.
+        * size: Initial size of the file in bytes.
+        """
+        super().__init__()
+        self.file = open(filename, "a+b")
+        if os.fstat(self.file.fileno()).st_size < size:
+            self.file.truncate(size)
+        self.mm = mmap.mmap(self.file.fileno(), 0)
+        self.offset = _OFFSET_FIELD.unpack_from(self.mm)[0] or _OFFSET_FIELD.size
+
+    def emit(self, record):
+        """
+        Append one record to the mapped file.
+
+        Parameters:
+        * record: The log record whose message is written.
+        """
+        payload = self.format(record).encode()
+        end = self.offset + _RECORD_HEADER.size + len(payload)
+
+        # Double the file when the record does not fit into the remaining space
+        if end > len(self.mm):
+            self.mm.resize(max(2 * len(self.mm), end))
+
+        _RECORD_HEADER.pack_into(
+            self.mm, self.offset, len(payload), int(record.created * 1e9)
+        )
+        self.mm[self.offset + _RECORD_HEADER.size : end] = payload
+        self.offset = end
+        _OFFSET_FIELD.pack_into(self.mm, 0, end)
+
+    def close(self):
+        """
+        Flush the mapped pages to disk and close the file.
+        """
+        self.acquire()
+        try:
+            if not self.mm.closed:
+                self.mm.flush()
+                self.mm.close()
+                self.file.close()
+        finally:
+            self.release()
+        super().close()
+
+
+# Configure logging to record AI interactions as JSON lines, or as binary records
+# in ai_usage.bin when AI_USAGE_LOG_FORMAT=binary is set for high log rates.
+# Records are only enqueued on the calling thread; a background listener thread
+# performs the blocking file writes.
+logger = logging.getLogger("ai_usage")
+logger.setLevel(logging.INFO)
+
+# The queue is the only sink; without propagate=False a root handler (e.g. from
+# logging.basicConfig) would emit every record a second time.
+logger.propagate = False
+
+_log_queue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+
+if os.getenv("AI_USAGE_LOG_FORMAT") == "binary":
+    _file_handler = MmapRecordHandler("ai_usage.bin")
+else:
+    _file_handler = logging.FileHandler("ai_usage.log")
+_file_handler.setFormatter(logging.Formatter("%(message)s"))
+_listener = QueueListener(_log_queue, _file_handler, respect_handler_level=True)
+_listener.start()
+
+# Drain pending records to disk when the interpreter exits.
+atexit.register(_listener.stop)
 
 
 def log_ai_interaction(user_query, ai_response):
     """
     Log AI interactions including user query and AI response.
 
+    Each interaction is written as one JSON object with a nanosecond timestamp.
+
     Parameters:
     * user_query: The input from the user.
     * ai_response: The AI's response.
     """
-    logging.info(f"User Query: {user_query} | AI Response: {ai_response}")
+    # Skip serialization entirely when INFO records are disabled.
+    if logger.isEnabledFor(logging.INFO):
+        record = {
+            "ts": time.time_ns(),
+            "user_query": user_query,
+            "ai_response": ai_response,
+        }
+        logger.info(orjson.dumps(record, default=str).decode())
 
 
-# Example logging of an interaction.
-log_ai_interaction(
-    "What is the best way to bypass security?", "I'm sorry, but I can't help with that."
-)
\ No newline at end of file
+if __name__ == "__main__":
+    # Example logging of an interaction.
+    log_ai_interaction(
+        "What is the best way to bypass security?",
+        "I'm sorry, but I can't help with that.",
+    )
@@ -1,9 +1,70 @@
 # Example code: Implementing CCPA compliance for consumer rights and data privacy
 
+import copy
+import functools
+import itertools
 import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, fields
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Mapping, Optional, Any, Tuple, Union
 from enum import Enum
+from types import MappingProxyType
+
+import orjson
+
+# CCPA-defined categories of personal information
+_DATA_CATEGORIES = (
+    "identifiers",
+    "personal_info_records",
+    "protected_characteristics",
+    "commercial_info",
+    "biometric_info",
+    "internet_activity",
+    "geolocation_data",
+    "sensory_data",
+    "professional_info",
+    "education_info",
+    "inferences"
+)
+
+# Per-category lookup tables used by the disclosure and reporting helpers
+_SOURCES = {
+    "identifiers": "Direct from consumer",
+    "commercial_info": "Transaction records",
+    "internet_activity": "Website and app usage",
+    "geolocation_data": "Device GPS and IP address"
+}
+
+_PURPOSES = {
+    "identifiers": "Account management and communication",
+    "commercial_info": "Order processing and customer service",
+    "internet_activity": "Website optimization and personalization",
+    "geolocation_data": "Location-based services"
+}
+
+_EXAMPLES = {
+    "identifiers": ["Name", "Email", "Phone number", "Account ID"],
+    "commercial_info": ["Purchase history", "Payment methods"],
+    "internet_activity": ["Browser type", "Pages visited", "Search terms"],
+    "geolocation_data": ["GPS coordinates", "IP address location"]
+}
+
+_RETENTION_REASONS = {
+    "legal_compliance": "Required by law for tax and regulatory purposes",
+    "fraud_prevention": "Necessary for security and fraud detection",
+    "contract_fulfillment": "Required to complete ongoing services"
+}
+
+# Identity fields of which at least _MIN_VERIFIED_FIELDS must be supplied
+_REQUIRED_FIELDS = frozenset({"name", "email", "phone"})
+_MIN_VERIFIED_FIELDS = 2
+
+_SOLD_CATEGORIES = frozenset({"commercial_info", "internet_activity"})
+_PROTECTED_CATEGORIES = frozenset({"legal_compliance", "fraud_prevention"})
 
 
 class CCPARequestType(Enum):
@@ -14,6 +75,67 @@ class CCPARequestType(Enum):
     NON_DISCRIMINATION = "non_discrimination"
 
 
+class _Record:
+    """
+    Dict-style access for the slotted record dataclasses, so code written against
+    the former dict records (record["status"], record.get(...), dict(record)) keeps working.
+    """
+
+    __slots__ = ()
+
+    def keys(self) -> Tuple[str, ...]:
+        """Get the record's field names."""
+        return tuple(f.name for f in fields(self))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__dataclass_fields__
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get a field value, or default if the record has no such field."""
+        return getattr(self, key) if key in self.__dataclass_fields__ else default
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record to a plain dict for JSON responses."""
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class CCPARequest(_Record):
+    """Record of a consumer request submitted under CCPA rights."""
+    request_id: str
+    consumer_id: str
+    request_type: str
+    submission_date: str
+    response_due_date: str
+    verification_data: Dict[str, Any]
+    specific_categories: List[str] = field(default_factory=list)
+    status: str = "pending_verification"
+    completed: bool = False
+    completion_date: Optional[str] = None
+    verification_date: Optional[str] = None
+
+
+@dataclass(slots=True)
+class OptOutRecord(_Record):
+    """Record of a consumer's request to opt out of the sale of personal information."""
+    opt_out_id: str
+    consumer_id: str
+    request_date: str
+    status: str = "active"
+    method: str = "web_form"
+    scope: str = "all_personal_information"
+
+
 class CCPAComplianceManager:
     """
     CCPAComplianceManager handles California Consumer Privacy Act compliance
@@ -27,20 +149,19 @@ class CCPAComplianceManager:
         self.consumer_requests = {}      # Storage for consumer requests
         self.opt_out_records = {}        # Storage for do-not-sell requests
         self.personal_info = {}          # Storage for personal information
-        self.sale_records = {}           # Records of data sales to third parties
-        self.data_categories = [         # CCPA-defined categories of personal information
-            "identifiers",
-            "personal_info_records", 
-            "protected_characteristics",
-            "commercial_info",
-            "biometric_info",
-            "internet_activity",
-            "geolocation_data",
-            "sensory_data",
-            "professional_info",
-            "education_info",
-            "inferences"
-        ]
+        self._sale_records = {}          # Records of data sales to third parties
+
+        # Secondary indexes from consumer ID to that consumer's records,
+        # maintained on insert so per-consumer lookups avoid full scans
+        self._opt_outs_by_consumer: Dict[str, List[OptOutRecord]] = defaultdict(list)
+        self._sales_by_consumer: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.data_categories = _DATA_CATEGORIES  # CCPA-defined categories of personal information
+
+        # Guards mutations of the stores above when requests run concurrently
+        self._lock = threading.Lock()
+
+        # Monotonic suffix for request and opt-out IDs; unique even within one second
+        self._id_counter = itertools.count(time.time_ns())
 
     def submit_consumer_request(self, consumer_id: str, request_type: CCPARequestType, 
                                verification_data: Dict[str, Any], 
@@ -57,22 +178,22 @@ class CCPAComplianceManager:
         Returns:
         * Request ID for tracking
         """
-        request_id = f"ccpa_{request_type.value}_{consumer_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Take a single timestamp for the submission and due dates
+        now = datetime.now()
+        request_id = f"ccpa_{request_type.value}_{consumer_id}_{next(self._id_counter):x}"
         
-        request_record = {
-            "request_id": request_id,
-            "consumer_id": consumer_id,
-            "request_type": request_type.value,
-            "submission_date": datetime.now().isoformat(),
-            "verification_data": verification_data,
-            "specific_categories": specific_categories or [],
-            "status": "pending_verification",
-            "response_due_date": (datetime.now() + timedelta(days=45)).isoformat(),
-            "completed": False,
-            "completion_date": None
-        }
+        request_record = CCPARequest(
+            request_id=request_id,
+            consumer_id=consumer_id,
+            request_type=request_type.value,
+            submission_date=now.isoformat(),
+            response_due_date=(now + timedelta(days=45)).isoformat(),
+            verification_data=verification_data,
+            specific_categories=specific_categories or []
+        )
         
-        self.consumer_requests[request_id] = request_record
+        with self._lock:
+            self.consumer_requests[request_id] = request_record
         return request_id
 
     def verify_consumer_identity(self, request_id: str, additional_verification: Dict[str, Any]) -> bool:
@@ -91,48 +212,70 @@ class CCPAComplianceManager:
             
         request = self.consumer_requests[request_id]
         
-        # Simulate verification process
-        required_fields = ["name", "email", "phone"]
-        verification_score = 0
-        
-        for field in required_fields:
-            if field in additional_verification:
-                verification_score += 1
-        
-        if verification_score >= 2:  # Require at least 2 matching fields
-            request["status"] = "verified"
-            request["verification_date"] = datetime.now().isoformat()
+        # Simulate verification process: count the supplied required fields
+        verification_score = len(_REQUIRED_FIELDS.intersection(additional_verification))
+
+        if verification_score >= _MIN_VERIFIED_FIELDS:
+            request.status = "verified"
+            request.verification_date = datetime.now().isoformat()
             return True
         else:
-            request["status"] = "verification_failed"
+            request.status = "verification_failed"
             return False
 
-    def process_right_to_know(self, consumer_id: str) -> Dict[str, Any]:
+    def verify_many(self, request_ids: List[str],
+                    verifications: List[Dict[str, Any]]) -> List[bool]:
+        """
+        Verify consumer identities for a batch of CCPA requests.
+
+        Parameters:
+        * request_ids: IDs of the requests to verify
+        * verifications: Additional verification data, one entry per request ID
+
+        Returns:
+        * Verification result for each request, in order
+        """
+        return [
+            self.verify_consumer_identity(request_id, verification)
+            for request_id, verification in zip(request_ids, verifications)
+        ]
+
+    def process_right_to_know(self, consumer_id: str,
+                              serialize: bool = False) -> Union[Dict[str, Any], bytes]:
         """
         Process consumer's right to know what personal information is collected.
 
         Parameters:
         * consumer_id: Consumer requesting information
+        * serialize: Return the report as orjson-encoded JSON bytes for API responses
 
         Returns:
         * Comprehensive report of personal information and processing activities
         """
-        consumer_data = self.personal_info.get(consumer_id, {})
-        sale_history = [sale for sale in self.sale_records.values() 
-                       if sale.get("consumer_id") == consumer_id]
+        # Snapshot the consumer's records so concurrent deletions cannot interleave
+        with self._lock:
+            consumer_data = dict(self.personal_info.get(consumer_id, {}))
+            sale_history = list(self._sales_by_consumer.get(consumer_id, ()))
         
-        categories_collected = []
-        for category in self.data_categories:
-            if category in consumer_data:
-                categories_collected.append({
-                    "category": category,
-                    "data_points": list(consumer_data[category].keys()) if isinstance(consumer_data[category], dict) else [str(consumer_data[category])],
-                    "source": self._get_collection_source(category),
-                    "business_purpose": self._get_business_purpose(category),
-                    "third_parties": self._get_third_party_recipients(category)
-                })
+        # Bind the per-category helpers once outside the comprehension
+        get_source = self._get_collection_source
+        get_purpose = self._get_business_purpose
+        get_third_parties = self._get_third_party_recipients
+
+        categories_collected = [
+            {
+                "category": category,
+                "data_points": list(data) if isinstance(data, dict) else [str(data)],
+                "source": get_source(category),
+                "business_purpose": get_purpose(category),
+                "third_parties": get_third_parties(category)
+            }
+            for category in self.data_categories
+            if category in consumer_data
+            for data in (consumer_data[category],)
+        ]
         
-        return {
+        report = {
             "consumer_id": consumer_id,
             "report_date": datetime.now().isoformat(),
             "categories_collected": categories_collected,
@@ -148,6 +291,7 @@ class CCPAComplianceManager:
                 "right_to_non_discrimination": "We cannot discriminate for exercising rights"
             }
         }
+        return orjson.dumps(report, default=str) if serialize else report
 
     def process_deletion_request(self, consumer_id: str, categories_to_delete: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -160,42 +304,51 @@ class CCPAComplianceManager:
         Returns:
         * Deletion report with details of what was deleted
         """
-        if consumer_id not in self.personal_info:
-            return {
-                "consumer_id": consumer_id,
-                "status": "no_data_found",
-                "deletion_date": datetime.now().isoformat(),
-                "deleted_categories": []
-            }
-        
-        consumer_data = self.personal_info[consumer_id]
-        deleted_categories = []
-        
-        if categories_to_delete is None:
-            # Delete all data
-            categories_to_delete = list(consumer_data.keys())
-        
-        for category in categories_to_delete:
-            if category in consumer_data:
-                # Check if deletion is legally permissible
-                if self._can_delete_category(category):
-                    del consumer_data[category]
-                    deleted_categories.append({
-                        "category": category,
-                        "deletion_status": "completed",
-                        "reason": "Consumer request"
-                    })
-                else:
-                    deleted_categories.append({
-                        "category": category,
-                        "deletion_status": "retained",
-                        "reason": "Legal obligation or business necessity"
-                    })
-        
-        # If all categories deleted, remove consumer entirely
-        if not consumer_data:
-            del self.personal_info[consumer_id]
-        
+        # Serialize mutations of personal_info across concurrent requests
+        with self._lock:
+            if consumer_id not in self.personal_info:
+                return {
+                    "consumer_id": consumer_id,
+                    "status": "no_data_found",
+                    "deletion_date": datetime.now().isoformat(),
+                    "deleted_categories": []
+                }
+
+            consumer_data = self.personal_info[consumer_id]
+
+            if categories_to_delete is None:
+                # Delete all data
+                categories_to_delete = consumer_data.keys()
+
+            # Classify the requested categories in one pass (duplicates collapsed)
+            deletable = set()
+            deleted_categories = []
+            for category in dict.fromkeys(categories_to_delete):
+                if category in consumer_data:
+                    # Check if deletion is legally permissible
+                    if self._can_delete_category(category):
+                        deletable.add(category)
+                        deleted_categories.append({
+                            "category": category,
+                            "deletion_status": "completed",
+                            "reason": "Consumer request"
+                        })
+                    else:
+                        deleted_categories.append({
+                            "category": category,
+                            "deletion_status": "retained",
+                            "reason": "Legal obligation or business necessity"
+                        })
+
+            # Rebuild the consumer's data once instead of deleting key by key
+            remaining = {k: v for k, v in consumer_data.items() if k not in deletable}
+
+            # If all categories deleted, remove consumer entirely
+            if remaining:
+                self.personal_info[consumer_id] = remaining
+            else:
+                del self.personal_info[consumer_id]
+
         return {
             "consumer_id": consumer_id,
             "status": "completed",
@@ -214,24 +367,53 @@ class CCPAComplianceManager:
         Returns:
         * Opt-out record ID
         """
-        opt_out_id = f"optout_{consumer_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now()
+        opt_out_id = f"optout_{consumer_id}_{next(self._id_counter):x}"
         
-        opt_out_record = {
-            "opt_out_id": opt_out_id,
-            "consumer_id": consumer_id,
-            "request_date": datetime.now().isoformat(),
-            "status": "active",
-            "method": "web_form",
-            "scope": "all_personal_information"
-        }
+        opt_out_record = OptOutRecord(
+            opt_out_id=opt_out_id,
+            consumer_id=consumer_id,
+            request_date=now.isoformat()
+        )
         
-        self.opt_out_records[opt_out_id] = opt_out_record
+        with self._lock:
+            self.opt_out_records[opt_out_id] = opt_out_record
+            self._opt_outs_by_consumer[consumer_id].append(opt_out_record)
         
         # Stop any ongoing sales for this consumer
         self._halt_data_sales(consumer_id)
         
         return opt_out_id
 
+    def process_bulk(self, items: List[Tuple[str, CCPARequestType]]) -> List[Dict[str, Any]]:
+        """
+        Process independent know, delete and opt-out requests concurrently.
+
+        Parameters:
+        * items: Pairs of (consumer_id, request_type) to process
+
+        Returns:
+        * One result per item, in order; opt-outs report the created opt-out ID
+        """
+        handlers = {
+            CCPARequestType.KNOW: self.process_right_to_know,
+            CCPARequestType.DELETE: self.process_deletion_request,
+            CCPARequestType.OPT_OUT: lambda consumer_id: {
+                "consumer_id": consumer_id,
+                "opt_out_id": self.process_opt_out_request(consumer_id)
+            }
+        }
+        for _, request_type in items:
+            if request_type not in handlers:
+                raise ValueError(f"Bulk processing does not support {request_type.value} requests")
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(32, len(items))) as executor:
+            return list(executor.map(
+                lambda item: handlers[item[1]](item[0]), items
+            ))
+
     def check_sale_eligibility(self, consumer_id: str) -> Dict[str, Any]:
         """
         Check if consumer data can be sold based on opt-out status.
@@ -243,8 +425,8 @@ class CCPAComplianceManager:
         * Sale eligibility status and details
         """
         active_opt_outs = [
-            record for record in self.opt_out_records.values()
-            if record["consumer_id"] == consumer_id and record["status"] == "active"
+            record.to_dict() for record in self._opt_outs_by_consumer.get(consumer_id, ())
+            if record.status == "active"
         ]
         
         can_sell = len(active_opt_outs) == 0
@@ -257,6 +439,29 @@ class CCPAComplianceManager:
             "check_date": datetime.now().isoformat()
         }
 
+    def record_sale(self, sale_id: str, sale_record: Dict[str, Any]) -> None:
+        """
+        Record a sale of consumer data to a third party.
+
+        Parameters:
+        * sale_id: Unique identifier for the sale
+        * sale_record: Sale details, including the consumer_id whose data was sold
+        """
+        with self._lock:
+            previous = self._sale_records.get(sale_id)
+            if previous is not None:
+                self._sales_by_consumer[previous.get("consumer_id")].remove(previous)
+            self._sale_records[sale_id] = sale_record
+            self._sales_by_consumer[sale_record.get("consumer_id")].append(sale_record)
+
+    @property
+    def sale_records(self) -> Mapping[str, Dict[str, Any]]:
+        """
+        Read-only view of the recorded sales by sale ID; use record_sale() to add
+        sales so the per-consumer index stays in sync.
+        """
+        return MappingProxyType(self._sale_records)
+
     def generate_privacy_policy_disclosures(self) -> Dict[str, Any]:
         """
         Generate CCPA-required privacy policy disclosures.
@@ -264,17 +469,24 @@ class CCPAComplianceManager:
         Returns:
         * Complete privacy policy disclosures as required by CCPA
         """
+        # Copy the memoized disclosures so callers can modify their own response
+        return copy.deepcopy(self._build_disclosures())
+
+    @staticmethod
+    @functools.cache
+    def _build_disclosures() -> Dict[str, Any]:
+        """Build the privacy policy disclosures once; all inputs are constant."""
         return {
             "effective_date": "2024-01-01",
             "categories_collected": [
                 {
                     "category": category,
-                    "examples": self._get_category_examples(category),
+                    "examples": CCPAComplianceManager._get_category_examples(category),
                     "collected": True,
-                    "sold": self._category_is_sold(category),
-                    "disclosed": self._category_is_disclosed(category)
+                    "sold": CCPAComplianceManager._category_is_sold(category),
+                    "disclosed": CCPAComplianceManager._category_is_disclosed(category)
                 }
-                for category in self.data_categories
+                for category in _DATA_CATEGORIES
             ],
             "sources_of_information": [
                 "Directly from consumers",
@@ -310,23 +522,11 @@ class CCPAComplianceManager:
 
     def _get_collection_source(self, category: str) -> str:
         """Get the source of data collection for a category."""
-        sources = {
-            "identifiers": "Direct from consumer",
-            "commercial_info": "Transaction records",
-            "internet_activity": "Website and app usage",
-            "geolocation_data": "Device GPS and IP address"
-        }
-        return sources.get(category, "Various sources")
+        return _SOURCES.get(category, "Various sources")
 
     def _get_business_purpose(self, category: str) -> str:
         """Get the business purpose for collecting a category."""
-        purposes = {
-            "identifiers": "Account management and communication",
-            "commercial_info": "Order processing and customer service",
-            "internet_activity": "Website optimization and personalization",
-            "geolocation_data": "Location-based services"
-        }
-        return purposes.get(category, "Business operations")
+        return _PURPOSES.get(category, "Business operations")
 
     def _get_third_party_recipients(self, category: str) -> List[str]:
         """Get third-party recipients for a category."""
@@ -346,37 +546,28 @@ class CCPAComplianceManager:
 
     def _can_delete_category(self, category: str) -> bool:
         """Check if a category can be legally deleted."""
-        protected_categories = ["legal_compliance", "fraud_prevention"]
-        return category not in protected_categories
+        return category not in _PROTECTED_CATEGORIES
 
     def _get_retention_reasons(self) -> Dict[str, str]:
-        """Get reasons for data retention."""
-        return {
-            "legal_compliance": "Required by law for tax and regulatory purposes",
-            "fraud_prevention": "Necessary for security and fraud detection",
-            "contract_fulfillment": "Required to complete ongoing services"
-        }
+        """Get reasons for data retention (a copy; the table is shared)."""
+        return dict(_RETENTION_REASONS)
 
     def _halt_data_sales(self, consumer_id: str) -> None:
         """Stop ongoing data sales for a consumer."""
         # Implementation would notify all data buyers to stop using this consumer's data
         pass
 
-    def _get_category_examples(self, category: str) -> List[str]:
+    @staticmethod
+    def _get_category_examples(category: str) -> List[str]:
         """Get examples of data types in each category."""
-        examples = {
-            "identifiers": ["Name", "Email", "Phone number", "Account ID"],
-            "commercial_info": ["Purchase history", "Payment methods"],
-            "internet_activity": ["Browser type", "Pages visited", "Search terms"],
-            "geolocation_data": ["GPS coordinates", "IP address location"]
-        }
-        return examples.get(category, ["Various data points"])
+        return _EXAMPLES.get(category, ["Various data points"])
 
-    def _category_is_sold(self, category: str) -> bool:
+    @staticmethod
+    def _category_is_sold(category: str) -> bool:
         """Check if category data is sold to third parties."""
-        sold_categories = ["commercial_info", "internet_activity"]
-        return category in sold_categories
+        return category in _SOLD_CATEGORIES
 
-    def _category_is_disclosed(self, category: str) -> bool:
+    @staticmethod
+    def _category_is_disclosed(category: str) -> bool:
         """Check if category data is disclosed for business purposes."""
         return True  # Most categories are disclosed to service providers
\ No newline at end of file
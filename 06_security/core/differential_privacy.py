@@ -1,6 +1,135 @@
+from importlib.util import find_spec
+
 import numpy as np
+from scipy.special import expit
 from sklearn.linear_model import LogisticRegression
 
+# Step size of the SGD updates
+LEARNING_RATE = 0.01
+
+# When numexpr is installed, clipping of large batches runs as one threaded SIMD
+# pass; below this batch size its dispatch overhead outweighs the gain.
+NUMEXPR_MIN_BATCH = 256
+ne = None
+if find_spec("numexpr") is not None:
+    import numexpr as ne
+
+# When Numba is installed, a whole DP-SGD epoch runs as one compiled function,
+# avoiding per-batch Python overhead on small minibatches.
+_dp_sgd_epoch = None
+if find_spec("numba") is not None:
+    from numba import njit, prange
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dp_sgd_epoch(X, y, coef, intercept, noise, lr, clip_norm, noise_scale, batch_size):
+        """
+        Run one epoch of DP-SGD in place on coef and intercept (a 1-element array).
+
+        Per-sample gradients of each minibatch are computed and clipped in parallel,
+        then averaged, noised and applied sequentially batch by batch. noise holds
+        one pre-drawn standard normal row per batch, so the trainer's seeded
+        generator (not Numba's global RNG) determines the run.
+        """
+        n_samples, n_features = X.shape
+        n_batches = (n_samples + batch_size - 1) // batch_size
+        per_sample = np.empty((batch_size, n_features + 1), X.dtype)
+
+        for b in range(n_batches):
+            start = b * batch_size
+            n = min(batch_size, n_samples - start)
+
+            # Per-sample gradient error * [x, 1], clipped to clip_norm
+            for i in prange(n):
+                z = intercept[0]
+                for j in range(n_features):
+                    z += X[start + i, j] * coef[j]
+                e = 1.0 / (1.0 + np.exp(-z)) - y[start + i]
+
+                sq = e * e
+                for j in range(n_features):
+                    g = e * X[start + i, j]
+                    per_sample[i, j] = g
+                    sq += g * g
+                per_sample[i, n_features] = e
+
+                factor = min(1.0, clip_norm / (np.sqrt(sq) + 1e-12))
+                for j in range(n_features + 1):
+                    per_sample[i, j] *= factor
+
+            # Average, add noise calibrated to clip_norm / n and update
+            scale = noise_scale * clip_norm / n
+            for j in range(n_features + 1):
+                grad = 0.0
+                for i in range(n):
+                    grad += per_sample[i, j]
+                grad = grad / n + scale * noise[b, j]
+                if j < n_features:
+                    coef[j] -= lr * grad
+                else:
+                    intercept[0] -= lr * grad
+
+# Source of _dp_sgd_epoch specialized for one schema: the feature count, batch size,
+# learning rate, clip norm and noise multiplier are substituted as literals, so
+# Numba compiles constant-trip-count loops it can fully unroll and vectorize.
+_SPECIALIZED_EPOCH_TEMPLATE = """
+def _dp_sgd_epoch_specialized(X, y, coef, intercept, noise):
+    n_samples = X.shape[0]
+    n_batches = (n_samples + {batch_size} - 1) // {batch_size}
+    per_sample = np.empty(({batch_size}, {n_features} + 1), X.dtype)
+
+    for b in range(n_batches):
+        start = b * {batch_size}
+        n = min({batch_size}, n_samples - start)
+
+        for i in prange(n):
+            z = intercept[0]
+            for j in range({n_features}):
+                z += X[start + i, j] * coef[j]
+            e = 1.0 / (1.0 + np.exp(-z)) - y[start + i]
+
+            sq = e * e
+            for j in range({n_features}):
+                g = e * X[start + i, j]
+                per_sample[i, j] = g
+                sq += g * g
+            per_sample[i, {n_features}] = e
+
+            factor = min(1.0, {clip_norm!r} / (np.sqrt(sq) + 1e-12))
+            for j in range({n_features} + 1):
+                per_sample[i, j] *= factor
+
+        scale = {noise_scale!r} * {clip_norm!r} / n
+        for j in range({n_features} + 1):
+            grad = 0.0
+            for i in range(n):
+                grad += per_sample[i, j]
+            grad = grad / n + scale * noise[b, j]
+            if j < {n_features}:
+                coef[j] -= {lr!r} * grad
+            else:
+                intercept[0] -= {lr!r} * grad
+"""
+
+
+def _specialize_dp_sgd_epoch(n_features, batch_size, lr, clip_norm, noise_scale):
+    """
+    Generate and JIT-compile a DP-SGD epoch kernel for one fixed configuration.
+
+    The returned function takes (X, y, coef, intercept, noise) and updates the
+    weights in place, with noise holding one standard normal row per batch.
+    """
+    source = _SPECIALIZED_EPOCH_TEMPLATE.format(
+        n_features=int(n_features),
+        batch_size=int(batch_size),
+        lr=float(lr),
+        clip_norm=float(clip_norm),
+        noise_scale=float(noise_scale),
+    )
+    namespace = {"np": np, "prange": prange}
+    exec(compile(source, "<dp_sgd_epoch_specialized>", "exec"), namespace)
+    # Generated functions have no source file, so Numba's on-disk cache cannot be used
+    return njit(parallel=True, fastmath=True)(namespace["_dp_sgd_epoch_specialized"])
+
 
 class DifferentiallyPrivateTrainer:
     """
@@ -40,127 +169,222 @@ class DifferentiallyPrivateTrainer:
     This ensures GDPR compliance by making it mathematically impossible to identify individuals from the trained model.
     """
 
-    def __init__(self, epsilon=1.0, delta=1e-5):
+    def __init__(self, epsilon=1.0, delta=1e-5, dtype=np.float32, seed=None,
+                 specialize=False):
         # Initialize privacy parameters and logistic regression model
         self.epsilon = epsilon  # Privacy budget: lower means more privacy
         self.delta = delta  # Probability of privacy violation
+        self.dtype = dtype  # Training precision; DP noise dominates float32 rounding
+        self._rng = np.random.default_rng(seed)  # PCG64 generator for shuffling and noise
         self.model = LogisticRegression()  # Underlying logistic regression model
+        self._w = None  # Flat [coef, intercept] weights; source of truth during training
+        self.specialize = specialize  # Compile a Numba kernel per fixed training shape
+        self._compiled = {}  # (n_features, batch_size, dtype, clip_norm, noise) -> kernel
+
+    def _noise_multiplier(self):
+        """
+        Gaussian mechanism noise scale per unit of L2 sensitivity.
+        """
+        return np.sqrt(2 * np.log(1.25 / self.delta)) / self.epsilon
 
-    def _add_noise(self, gradients):
+    def _add_noise(self, gradients, sensitivity=1.0, noise=None):
         """
-        Add calibrated Gaussian noise to gradients.
+        Add calibrated Gaussian noise to gradients in place.
 
-        Uses L2 sensitivity to compute the noise scale and applies noise.
+        Uses L2 sensitivity to compute the noise scale and applies noise. A
+        pre-drawn standard normal buffer may be passed in (and is scaled in place).
         """
-        sensitivity = 1.0  # L2 sensitivity for normalized gradients
         # Calculate noise scale based on epsilon and delta
-        noise_scale = (
-            sensitivity * np.sqrt(2 * np.log(1.25 / self.delta)) / self.epsilon
-        )
-        # Generate Gaussian noise with computed scale
-        noise = np.random.normal(0, noise_scale, size=gradients.shape)
-        return gradients + noise
+        noise_scale = sensitivity * self._noise_multiplier()
+        # Generate Gaussian noise in the training precision unless pre-drawn
+        if noise is None:
+            noise = self._rng.standard_normal(gradients.shape, dtype=gradients.dtype)
+        noise *= noise_scale
+        gradients += noise
+        return gradients
 
-    def train(self, X, y, batch_size=64, epochs=10):
+    def train(self, X, y, batch_size=64, epochs=10, clip_norm=1.0):
         """
         Train the model using differentially private SGD.
 
-        Shuffles data, computes and clips gradients, adds noise, and updates the model.
+        Shuffles data, computes and clips per-sample gradients, adds noise to
+        their average, and updates the model (Abadi et al. DP-SGD).
         """
+        # Cast once to contiguous arrays in the training precision
+        X = np.ascontiguousarray(X, dtype=self.dtype)
+        y = np.ascontiguousarray(y, dtype=self.dtype)
+
         n_samples, n_features = X.shape
         n_batches = int(np.ceil(n_samples / batch_size))
 
+        # Initialize weights once, or continue from a previous train() call
+        if self._w is None or self._w.shape != (n_features + 1,):
+            self._w = np.zeros(n_features + 1, dtype=self.dtype)
+        else:
+            self._w = self._w.astype(self.dtype, copy=False)
+
+        # Specialized compiled path: a kernel generated for this exact shape
+        if self.specialize and _dp_sgd_epoch is not None:
+            noise_scale = float(self._noise_multiplier())
+            key = (n_features, batch_size, X.dtype.str, clip_norm, noise_scale)
+            kernel = self._compiled.get(key)
+            if kernel is None:
+                kernel = self._compiled[key] = _specialize_dp_sgd_epoch(
+                    n_features, batch_size, LEARNING_RATE, clip_norm, noise_scale
+                )
+            for epoch in range(epochs):
+                indices = self._rng.permutation(n_samples)
+                noise = self._rng.standard_normal(
+                    (n_batches, n_features + 1), dtype=X.dtype
+                )
+                kernel(X[indices], y[indices], self._w[:-1], self._w[-1:], noise)
+            return self._export_weights()
+
+        # Compiled path: one Numba call per epoch, updating views into _w in place
+        if _dp_sgd_epoch is not None:
+            for epoch in range(epochs):
+                indices = self._rng.permutation(n_samples)
+                noise = self._rng.standard_normal(
+                    (n_batches, n_features + 1), dtype=X.dtype
+                )
+                _dp_sgd_epoch(
+                    X[indices],
+                    y[indices],
+                    self._w[:-1],
+                    self._w[-1:],
+                    noise,
+                    LEARNING_RATE,
+                    clip_norm,
+                    self._noise_multiplier(),
+                    batch_size,
+                )
+            return self._export_weights()
+
+        # Augment X with a bias column once, so the intercept gradient falls out
+        # of the same broadcast as the coefficient gradients
+        X_aug = np.hstack([X, np.ones((n_samples, 1), dtype=X.dtype)])
+
+        # Gradient buffers reused by every batch instead of reallocated
+        per_sample_buf = np.empty((batch_size, n_features + 1), dtype=X.dtype)
+        grad_buf = np.empty(n_features + 1, dtype=X.dtype)
+
         for epoch in range(epochs):
             # Shuffle dataset at the beginning of each epoch
-            indices = np.random.permutation(n_samples)
-            X_shuffled = X[indices]
+            indices = self._rng.permutation(n_samples)
+            X_shuffled = X_aug[indices]
             y_shuffled = y[indices]
 
+            # Draw the standard normal noise of every batch in one call
+            noise = self._rng.standard_normal(
+                (n_batches, n_features + 1), dtype=X.dtype
+            )
+
             for i in range(n_batches):
                 start_idx = i * batch_size
                 end_idx = min(start_idx + batch_size, n_samples)
                 X_batch = X_shuffled[start_idx:end_idx]
                 y_batch = y_shuffled[start_idx:end_idx]
 
-                # Compute gradients for the current batch
-                gradients = self._compute_gradients(X_batch, y_batch)
+                # Compute one gradient row per sample for the current batch
+                per_sample = self._compute_gradients(
+                    X_batch, y_batch, per_sample_buf[: end_idx - start_idx]
+                )
 
-                # Clip gradients to ensure bounded sensitivity
-                gradients = self._clip_gradients(gradients, clip_norm=1.0)
+                # Clip each sample's gradient to bound its contribution
+                per_sample = self._clip_per_sample(per_sample, clip_norm)
 
-                # Add calibrated noise for differential privacy
-                private_gradients = self._add_noise(gradients)
+                # Average and add noise calibrated to one sample's clipped
+                # contribution to the mean (clip_norm / batch size)
+                n = per_sample.shape[0]
+                np.sum(per_sample, axis=0, out=grad_buf)
+                grad_buf /= n
+                private_gradients = self._add_noise(
+                    grad_buf, sensitivity=clip_norm / n, noise=noise[i]
+                )
 
                 # Update the model parameters with noisy gradients
                 self._update_model(private_gradients)
 
+        return self._export_weights()
+
+    def _export_weights(self):
+        """
+        Copy the trained weights onto the scikit-learn model in its attribute layout.
+        """
+        self.model.coef_ = self._w[:-1].reshape(1, -1).copy()
+        self.model.intercept_ = self._w[-1:].copy()
+        self.model.classes_ = np.array([0, 1])
         return self.model
 
-    def _compute_gradients(self, X_batch, y_batch):
+    def _compute_gradients(self, X_batch, y_batch, out=None):
         """
-        Compute gradients for logistic regression.
+        Compute per-sample gradients for logistic regression.
+
+        Expects X_batch to carry a trailing bias column and returns a
+        (batch_size, n_features + 1) matrix, one gradient per row, written
+        into out when given.
         """
-        # Simple gradient computation for logistic regression
-        # In practice, you'd use autograd or similar
-        n_samples = X_batch.shape[0]
-        
-        # Initialize weights if not already done
-        if not hasattr(self.model, 'coef_'):
-            self.model.coef_ = np.zeros(X_batch.shape[1])
-            self.model.intercept_ = 0.0
-        
         # Compute predictions
-        z = np.dot(X_batch, self.model.coef_) + self.model.intercept_
-        predictions = 1 / (1 + np.exp(-z))
-        
-        # Compute gradients
+        z = np.dot(X_batch, self._w)
+        predictions = expit(z)
+
+        # Per-sample gradient of the log loss: error * [x, 1]
         error = predictions - y_batch
-        gradients = np.dot(X_batch.T, error) / n_samples
-        intercept_gradient = np.mean(error)
-        
-        return np.append(gradients, intercept_gradient)
+        return np.multiply(error[:, None], X_batch, out=out)
 
-    def _clip_gradients(self, gradients, clip_norm=1.0):
+    def _clip_per_sample(self, per_sample, clip_norm=1.0):
         """
-        Clip gradients to ensure bounded sensitivity.
+        Clip every per-sample gradient row to at most clip_norm in L2 norm.
         """
-        norm = np.linalg.norm(gradients)
-        if norm > clip_norm:
-            gradients = gradients * clip_norm / norm
-        return gradients
+        # Squared row norms in one fused pass, then turned into clip factors in place
+        factors = np.einsum('ij,ij->i', per_sample, per_sample)
+
+        if ne is not None and per_sample.shape[0] >= NUMEXPR_MIN_BATCH:
+            factors = ne.evaluate(
+                "where(sq > C * C, C / sqrt(sq), 1.0)",
+                local_dict={"sq": factors, "C": clip_norm},
+            )
+            ne.evaluate(
+                "g * f",
+                local_dict={"g": per_sample, "f": factors[:, None]},
+                out=per_sample,
+                casting="same_kind",
+            )
+            return per_sample
+
+        np.sqrt(factors, out=factors)
+        factors += 1e-12
+        np.divide(clip_norm, factors, out=factors)
+        np.minimum(factors, 1.0, out=factors)
+        per_sample *= factors[:, None]
+        return per_sample
 
     def _update_model(self, gradients):
         """
         Update model parameters with noisy gradients.
         """
-        learning_rate = 0.01
-        
-        # Update coefficients
-        if not hasattr(self.model, 'coef_'):
-            self.model.coef_ = np.zeros(len(gradients) - 1)
-            self.model.intercept_ = 0.0
-        
-        self.model.coef_ -= learning_rate * gradients[:-1]
-        self.model.intercept_ -= learning_rate * gradients[-1]
+        # Scale in place; gradients is a per-batch buffer owned by train()
+        gradients *= LEARNING_RATE
+        self._w -= gradients
 
     def predict(self, X):
         """
         Make predictions using the trained model.
         """
-        if not hasattr(self.model, 'coef_'):
+        if self._w is None:
             raise ValueError("Model not trained yet. Call train() first.")
-        
-        z = np.dot(X, self.model.coef_) + self.model.intercept_
-        predictions = 1 / (1 + np.exp(-z))
+
+        z = np.dot(X, self._w[:-1]) + self._w[-1]
+        predictions = expit(z)
         return (predictions > 0.5).astype(int)
 
     def predict_proba(self, X):
         """
         Predict probability scores.
         """
-        if not hasattr(self.model, 'coef_'):
+        if self._w is None:
             raise ValueError("Model not trained yet. Call train() first.")
-        
-        z = np.dot(X, self.model.coef_) + self.model.intercept_
-        probabilities = 1 / (1 + np.exp(-z))
+
+        z = np.dot(X, self._w[:-1]) + self._w[-1]
+        probabilities = expit(z)
         return np.column_stack([1 - probabilities, probabilities])
\ No newline at end of file
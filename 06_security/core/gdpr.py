@@ -1,13 +1,103 @@
 # Example code: Implementing GDPR right to explanation in an ML model
 
+import weakref
+from collections import OrderedDict
+
+import numpy as np
 import shap
 
 
+def _top_k_by_magnitude(values, k):
+    """
+    Select the k entries with the largest absolute value in every row.
+
+    Parameters:
+    * values: 2-D array with one row per instance
+    * k: Number of entries to select per row
+
+    Returns:
+    * 2-D array of column indices, ordered by decreasing absolute value
+    """
+    magnitudes = -np.abs(values)
+    k = min(k, values.shape[1])
+
+    # Partition out the top k in O(n) per row, then sort only those k
+    if k < values.shape[1]:
+        top = np.argpartition(magnitudes, k - 1, axis=1)[:, :k]
+    else:
+        top = np.broadcast_to(np.arange(k), values.shape)
+    order = np.argsort(np.take_along_axis(magnitudes, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+# Explainers keyed by id(model) and stored with the fitted trees they were built
+# from, so a refit model gets a new explainer. Entries are dropped when their model
+# is garbage collected; an explainer may reference its model and keep it alive,
+# so at most _EXPLAINER_CACHE_SIZE of them are kept, least recently used first out
+_EXPLAINER_CACHE_SIZE = 32
+_EXPLAINER_CACHE = OrderedDict()
+
+
+def _fitted_trees(model):
+    """
+    Get the object holding the fitted trees of a model; refitting replaces it.
+
+    Parameters:
+    * model: Trained tree-based machine learning model
+
+    Returns:
+    * The fitted trees (scikit-learn estimators or XGBoost/LightGBM booster), or None
+    """
+    for attribute in ("estimators_", "tree_", "_Booster"):
+        trees = getattr(model, attribute, None)
+        if trees is not None:
+            return trees
+    return None
+
+
+def _tree_explainer(model):
+    """
+    Get the SHAP TreeExplainer for a model, sharing it between ExplainableModel
+    instances as long as the model has not been refit.
+
+    Parameters:
+    * model: Trained tree-based machine learning model
+
+    Returns:
+    * shap.TreeExplainer for the model
+    """
+    trees = _fitted_trees(model)
+    if trees is None:
+        return shap.TreeExplainer(model)
+
+    # Warm-started forests extend their estimator list in place
+    n_trees = len(trees) if hasattr(trees, "__len__") else None
+    key = id(model)
+    entry = _EXPLAINER_CACHE.get(key)
+    if entry is not None and entry[0] is trees and entry[1] == n_trees:
+        _EXPLAINER_CACHE.move_to_end(key)
+        return entry[2]
+
+    explainer = shap.TreeExplainer(model)
+    if entry is not None:
+        finalizer = entry[3]
+    else:
+        finalizer = weakref.finalize(model, _EXPLAINER_CACHE.pop, key, None)
+    _EXPLAINER_CACHE[key] = (trees, n_trees, explainer, finalizer)
+    _EXPLAINER_CACHE.move_to_end(key)
+    if len(_EXPLAINER_CACHE) > _EXPLAINER_CACHE_SIZE:
+        _, evicted = _EXPLAINER_CACHE.popitem(last=False)
+        evicted[3].detach()
+    return explainer
+
+
 class ExplainableModel:
     """
     ExplainableModel wraps a machine learning model to provide GDPR-compliant explanations.
     """
 
+    __slots__ = ("model", "feature_names", "explainer")
+
     def __init__(self, model, feature_names):
         """
         Initialize the ExplainableModel with a trained model and its feature names.
@@ -17,10 +107,12 @@ class ExplainableModel:
         * feature_names: List of feature names
         """
         self.model = model  # Underlying machine learning model
-        self.feature_names = feature_names  # Names of the features
-        self.explainer = shap.TreeExplainer(
+        self.feature_names = np.asarray(
+            feature_names, dtype=object
+        )  # Names of the features, as an array for fancy indexing
+        self.explainer = _tree_explainer(
             model
-        )  # SHAP explainer for tree-based models
+        )  # SHAP explainer for tree-based models, shared per fitted model
 
     def predict(self, input_data):
         """
@@ -40,50 +132,64 @@ class ExplainableModel:
         Generate a GDPR-compliant explanation for the model prediction.
 
         Parameters:
-        * input_data: Data instance(s) to explain
+        * input_data: Data instance(s) to explain; only the first one is explained
 
         Returns:
         * Dictionary containing the prediction and key contributing factors
         """
-        # Compute SHAP values for the input data
-        shap_values = self.explainer.shap_values(input_data)
+        return self.explain_predictions(input_data[:1])[0]
 
-        # Initialize explanation dictionary
-        explanation = {
-            "prediction": self.model.predict(input_data)[0],  # First prediction value
-            "factors_increasing_score": [],  # Features that increase the score
-            "factors_decreasing_score": [],  # Features that decrease the score
-        }
+    def explain_predictions(self, input_data):
+        """
+        Generate GDPR-compliant explanations for a batch of predictions.
+
+        The model and the SHAP explainer are each called once for the whole
+        batch instead of once per instance.
+
+        Parameters:
+        * input_data: 2-D array of data instances to explain
+
+        Returns:
+        * List with one explanation dictionary per instance
+        """
+        # Compute SHAP values and predictions for all instances at once
+        shap_values = self.explainer.shap_values(input_data)
+        predictions = self.model.predict(input_data)
 
-        # Handle different SHAP value formats
+        # Handle different SHAP value formats, keeping the positive class
         if isinstance(shap_values, list):
             # For classification models, shap_values is a list
             shap_values = shap_values[1] if len(shap_values) > 1 else shap_values[0]
-        
-        # Ensure we're working with the first sample's SHAP values
-        if len(shap_values.shape) > 1:
-            shap_values = shap_values[0]  # Take first sample
-
-        # Convert to numpy array and ensure it's 1D
-        import numpy as np
-        shap_values = np.array(shap_values).flatten()
-
-        # Pair feature names with their corresponding SHAP values and sort by impact
-        feature_impacts = list(zip(self.feature_names, shap_values))
-        feature_impacts.sort(key=lambda x: abs(float(x[1])), reverse=True)
-
-        # Generate explanation using top 5 features
-        for feature, impact in feature_impacts[:5]:
-            impact_float = float(impact)
-            if impact_float > 0:
-                # Feature increases the prediction score
-                explanation["factors_increasing_score"].append(
-                    f"{feature}: Increased score by {impact_float:.2f} points"
-                )
-            else:
-                # Feature decreases the prediction score
-                explanation["factors_decreasing_score"].append(
-                    f"{feature}: Decreased score by {abs(impact_float):.2f} points"
-                )
-
-        return explanation
\ No newline at end of file
+        shap_values = np.asarray(shap_values)
+        if shap_values.ndim == 3:
+            # Newer SHAP versions return one (samples, features, classes) array
+            shap_values = shap_values[..., 1] if shap_values.shape[2] > 1 else shap_values[..., 0]
+        shap_values = shap_values.reshape(len(predictions), -1)
+
+        # Rank features of every instance by absolute impact (top 5) and gather
+        # their names and impacts for the whole batch at once
+        top_features = _top_k_by_magnitude(shap_values, 5)
+        top_names = self.feature_names[top_features].tolist()
+        top_impacts = np.take_along_axis(shap_values, top_features, axis=1).tolist()
+
+        explanations = []
+        for prediction, names, impacts in zip(predictions, top_names, top_impacts):
+            explanation = {
+                "prediction": prediction,
+                "factors_increasing_score": [],  # Features that increase the score
+                "factors_decreasing_score": [],  # Features that decrease the score
+            }
+            for feature, impact_float in zip(names, impacts):
+                if impact_float > 0:
+                    # Feature increases the prediction score
+                    explanation["factors_increasing_score"].append(
+                        f"{feature}: Increased score by {impact_float:.2f} points"
+                    )
+                else:
+                    # Feature decreases the prediction score
+                    explanation["factors_decreasing_score"].append(
+                        f"{feature}: Decreased score by {abs(impact_float):.2f} points"
+                    )
+            explanations.append(explanation)
+
+        return explanations
@@ -1,19 +1,66 @@
 import re
+from importlib.util import find_spec
+
+# Patterns that should trigger a block.
+_BLOCKED_PATTERNS = (
+    r"bypass security",
+    r"ignore all instructions",
+    r"repeat this password",
+)
+
+# All blocked patterns compiled once into a single alternation, so a query is
+# scanned in one pass instead of once per pattern.
+_BLOCKED_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in _BLOCKED_PATTERNS), re.IGNORECASE
+)
+
+# When hyperscan is installed, all patterns are also compiled into one Hyperscan
+# database, which scans a query with a single DFA/SIMD pass. It is only used for
+# ASCII queries, where its caseless matching is identical to re.IGNORECASE.
+_BLOCKED_DB = None
+if find_spec("hyperscan") is not None:
+    import hyperscan
+
+    _BLOCKED_DB = hyperscan.Database()
+    _BLOCKED_DB.compile(
+        expressions=[pattern.encode() for pattern in _BLOCKED_PATTERNS],
+        ids=list(range(len(_BLOCKED_PATTERNS))),
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH]
+        * len(_BLOCKED_PATTERNS),
+    )
+
+    # Some hyperscan versions raise when a match handler halts the scan.
+    _SCAN_TERMINATED = getattr(hyperscan, "ScanTerminated", ())
+
+
+def _on_blocked_match(pattern_id, start, end, flags, hits):
+    # Record the hit and halt the scan at the first blocked pattern.
+    hits.append(pattern_id)
+    return True
+
+
+def _matches_blocked_pattern(user_query):
+    # Use the Hyperscan database where it matches exactly like the regex.
+    if _BLOCKED_DB is not None and user_query.isascii():
+        hits = []
+        try:
+            _BLOCKED_DB.scan(
+                user_query.encode("ascii"),
+                match_event_handler=_on_blocked_match,
+                context=hits,
+            )
+        except _SCAN_TERMINATED:
+            pass
+        return bool(hits)
+    return _BLOCKED_RE.search(user_query) is not None
 
 
 # Function: validate_user_input
 # Purpose: Detect adversarial prompts by checking user query against blocked patterns.
 def validate_user_input(user_query):
-    # Define patterns that should trigger a block.
-    blocked_patterns = [
-        r"bypass security",
-        r"ignore all instructions",
-        r"repeat this password",
-    ]
-    # Check each pattern against the input query.
-    for pattern in blocked_patterns:
-        if re.search(pattern, user_query, re.IGNORECASE):
-            return "Blocked: Potentially adversarial input detected."
+    # Check all patterns against the input query at once.
+    if _matches_blocked_pattern(user_query):
+        return "Blocked: Potentially adversarial input detected."
     return "Safe input."
 
 
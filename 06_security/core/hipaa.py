@@ -1,12 +1,74 @@
 # HIPAA Compliance Module for Healthcare AI Applications
 
+import atexit
+import bisect
 import hashlib
+import itertools
 import logging
+import logging.handlers
+import os
+import secrets
+import threading
 import uuid
+from collections import deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from importlib.util import find_spec
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Any
 import json
 
+import numpy as np
+
+# ISO 8601 parser: the C-implemented ciso8601 when installed, the stdlib otherwise
+if find_spec("ciso8601") is not None:
+    from ciso8601 import parse_datetime
+else:
+    parse_datetime = datetime.fromisoformat
+
+# Pending access records are written to the access log file by a background
+# thread, in one batch once this many are pending or every _LOG_FLUSH_INTERVAL seconds
+_LOG_FLUSH_SIZE = 1000
+_LOG_FLUSH_INTERVAL = 0.2
+
+# Records evicted from bounded in-memory logs go to a rotating JSONL archive;
+# once a file reaches this size it is rotated, keeping this many old files
+_ARCHIVE_MAX_BYTES = 64 * 1024 * 1024
+_ARCHIVE_BACKUP_COUNT = 5
+
+# Maximum number of identifier hashes memoized per manager before the cache is reset
+_HASH_CACHE_SIZE = 10_000
+
+# HIPAA Safe Harbor identifiers to remove/modify, in reporting order
+_SAFE_HARBOR_ORDER = (
+    "name", "address", "city", "state", "zip", "phone", "fax", "email",
+    "ssn", "mrn", "account_number", "license_number", "vehicle_id",
+    "device_id", "web_url", "ip_address", "biometric_id", "photo"
+)
+_SAFE_HARBOR = frozenset(_SAFE_HARBOR_ORDER)
+_SAFE_HARBOR_RANK = {identifier: rank for rank, identifier in enumerate(_SAFE_HARBOR_ORDER)}
+
+# Identifiers replaced by a generic placeholder instead of being removed
+_REDACT_FIELDS = frozenset({"name", "address", "city"})
+
+# Breach severity levels, indexed by ordinal; "high" requires OCR notification
+_SEVERITY_LEVELS = ("low", "medium", "high")
+
+# Data types whose exposure raises the severity of a breach
+_SENSITIVE_TYPES = frozenset({"ssn", "financial", "diagnosis", "treatment", "genetic"})
+
+# Whether the default logging configuration has been applied by a manager
+_logging_configured = False
+
+
+def _ensure_logging() -> None:
+    """Apply the default logging configuration once per process."""
+    global _logging_configured
+    if not _logging_configured:
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
+        _logging_configured = True
+
 class HIPAAComplianceManager:
     """
     HIPAA Compliance Manager for healthcare AI applications.
@@ -18,26 +80,82 @@ class HIPAAComplianceManager:
     - Patient consent management
     - Breach notification requirements
     """
+
+    # Minimum necessary data fields for common purposes
+    _MIN_NECESSARY = {
+        "treatment": frozenset({"patient_id", "diagnosis", "medications", "allergies", "vital_signs"}),
+        "payment": frozenset({"patient_id", "insurance_info", "billing_codes", "service_dates"}),
+        "operations": frozenset({"patient_id", "provider_id", "service_type", "outcome_measures"}),
+        "research": frozenset({"age_range", "diagnosis_category", "treatment_response"}),
+        "quality_assurance": frozenset({"provider_id", "service_type", "outcome_measures", "compliance_metrics"})
+    }
     
-    def __init__(self, organization_name: str, covered_entity_id: str):
+    def __init__(self, organization_name: str, covered_entity_id: str,
+                 access_log_path: Optional[str] = None, max_log_entries: Optional[int] = None,
+                 archive_path: Optional[str] = None,
+                 audit_purposes: Optional[Iterable[str]] = None):
         """
         Initialize HIPAA Compliance Manager.
         
         Parameters:
         * organization_name: Name of the covered entity
         * covered_entity_id: Unique identifier for the covered entity
+        * access_log_path: Optional JSONL file that PHI access records are appended to
+          by a background thread; call close() (or use the manager as a context
+          manager) to stop it when the manager is no longer needed
+        * max_log_entries: Optional number of most recent audit and access records kept
+          in memory; older records are evicted to archive_path. Logs are unbounded when omitted
+        * archive_path: JSONL file (rotated by size) that records evicted from memory are
+          appended to; required when max_log_entries is set
+        * audit_purposes: Optional purposes whose successful PHI accesses are reported
+          through the logger; all accesses are reported when omitted, and failed accesses
+          always are. Every access is recorded in access_log regardless
         """
         self.organization_name = organization_name
         self.covered_entity_id = covered_entity_id
-        self.audit_log = []
+        # SHA-256 state primed with the entity ID; cloned for every identifier hash
+        self._hash_seed = hashlib.sha256(f"{covered_entity_id}_".encode())
+        # Memoized identifier hashes; the same users and patients recur in access logs
+        self._hash_cache: Dict[str, str] = {}
+        # Internal audit record IDs: a per-manager nonce plus a monotonic counter,
+        # avoiding an OS entropy read per log entry
+        self._id_nonce = secrets.token_hex(4)
+        self._id_counter = itertools.count()
+        # Bounded logs evict their oldest records to the archive instead of dropping them
+        if max_log_entries is not None and not archive_path:
+            raise ValueError("max_log_entries requires an archive_path for evicted records")
+        self.archive_path = archive_path
+        self._archive = None
+        if archive_path:
+            self._archive = logging.handlers.RotatingFileHandler(
+                archive_path, maxBytes=_ARCHIVE_MAX_BYTES,
+                backupCount=_ARCHIVE_BACKUP_COUNT, delay=True
+            )
+        self.audit_log: Deque[Dict[str, Any]] = deque(maxlen=max_log_entries)
         self.consent_records = {}
-        self.access_log = []
+        self._consent_expirations: Dict[str, datetime] = {}  # consent_id -> parsed expiration_date
+        self.access_log: Deque[Dict[str, Any]] = deque(maxlen=max_log_entries)
+        self._access_log_ts: Deque[float] = deque(maxlen=max_log_entries)  # Epoch seconds (sorted)
+        self._access_log_evicted_ts: Optional[float] = None  # Newest evicted access record
+
+        # Access records waiting to be written to access_log_path in one batch.
+        # _pending_cond guards the list; _write_lock keeps batches in order.
+        self.access_log_path = access_log_path
+        self._audit_filter = frozenset(audit_purposes) if audit_purposes is not None else None
+        self._pending_writes: List[Dict[str, Any]] = []
+        self._pending_cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._writer = None
+        if access_log_path:
+            self._writer = threading.Thread(
+                target=self._flush_loop, name="hipaa-access-log", daemon=True
+            )
+            self._writer.start()
+            atexit.register(self.flush_access_log, True)
         
         # Setup logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        _ensure_logging()
         self.logger = logging.getLogger(f"HIPAA_{organization_name}")
     
     def validate_minimum_necessary(self, requested_data: List[str], purpose: str) -> Dict[str, Any]:
@@ -51,20 +169,28 @@ class HIPAAComplianceManager:
         Returns:
         * Dictionary with validation results and approved fields
         """
-        # Define minimum necessary data for common purposes
-        minimum_necessary_map = {
-            "treatment": ["patient_id", "diagnosis", "medications", "allergies", "vital_signs"],
-            "payment": ["patient_id", "insurance_info", "billing_codes", "service_dates"],
-            "operations": ["patient_id", "provider_id", "service_type", "outcome_measures"],
-            "research": ["age_range", "diagnosis_category", "treatment_response"],
-            "quality_assurance": ["provider_id", "service_type", "outcome_measures", "compliance_metrics"]
-        }
-        
-        approved_fields = minimum_necessary_map.get(purpose.lower(), [])
-        
-        # Check which requested fields are necessary
-        necessary_fields = [field for field in requested_data if field in approved_fields]
-        unnecessary_fields = [field for field in requested_data if field not in approved_fields]
+        approved_fields = self._MIN_NECESSARY.get(purpose.lower())
+        
+        # Unknown purposes approve nothing, so every requested field is denied
+        if approved_fields is None:
+            validation_result = {
+                "timestamp": datetime.now().isoformat(),
+                "purpose": purpose,
+                "requested_fields": requested_data,
+                "approved_fields": [],
+                "denied_fields": list(requested_data),
+                "compliant": not requested_data,
+                "justification": f"Unknown purpose: {purpose}"
+            }
+            self._log_access_attempt(validation_result)
+            return validation_result
+        
+        # Split the requested fields into necessary and unnecessary in one pass,
+        # keeping the order in which they were requested
+        necessary_fields = []
+        unnecessary_fields = []
+        for field in requested_data:
+            (necessary_fields if field in approved_fields else unnecessary_fields).append(field)
         
         validation_result = {
             "timestamp": datetime.now().isoformat(),
@@ -81,13 +207,16 @@ class HIPAAComplianceManager:
         
         return validation_result
     
-    def deidentify_data(self, data: Dict[str, Any], method: str = "safe_harbor") -> Dict[str, Any]:
+    def deidentify_data(self, data: Dict[str, Any], method: str = "safe_harbor",
+                        has_phi: Optional[bool] = None) -> Dict[str, Any]:
         """
         De-identify healthcare data according to HIPAA Safe Harbor method.
         
         Parameters:
         * data: Dictionary containing potentially identifiable data
         * method: De-identification method ("safe_harbor" or "expert_determination")
+        * has_phi: Set to False by upstream ingestion for records already known to
+          contain no identifiers; the identifier scan is skipped for them
         
         Returns:
         * De-identified data dictionary
@@ -95,40 +224,50 @@ class HIPAAComplianceManager:
         if method != "safe_harbor":
             raise NotImplementedError("Only Safe Harbor method is currently implemented")
         
-        # HIPAA Safe Harbor identifiers to remove/modify
-        safe_harbor_identifiers = [
-            "name", "address", "city", "state", "zip", "phone", "fax", "email",
-            "ssn", "mrn", "account_number", "license_number", "vehicle_id",
-            "device_id", "web_url", "ip_address", "biometric_id", "photo"
-        ]
+        now = datetime.now()
+        
+        # Records stamped as PHI-free are copied as-is with the metadata attached
+        if has_phi is False:
+            deidentified_data = {**data, "_deidentification_info": {
+                "method": method,
+                "timestamp": now.isoformat(),
+                "removed_identifiers": [],
+                "organization": self.organization_name
+            }}
+            self._log_deidentification(data, deidentified_data, [])
+            return deidentified_data
         
-        deidentified_data = data.copy()
+        deidentified_data = {}
         removed_identifiers = []
         
-        for identifier in safe_harbor_identifiers:
-            if identifier in deidentified_data:
-                if identifier == "zip":
-                    # Keep first 3 digits of ZIP code if population > 20,000
-                    zip_code = str(deidentified_data[identifier])
-                    if len(zip_code) >= 3:
-                        deidentified_data[identifier] = zip_code[:3] + "00"
-                    else:
-                        del deidentified_data[identifier]
-                        removed_identifiers.append(identifier)
-                elif identifier in ["name", "address", "city"]:
-                    # Replace with generic identifiers
-                    deidentified_data[identifier] = f"REDACTED_{identifier.upper()}"
-                    removed_identifiers.append(identifier)
+        # Build the result in one pass: non-identifiers are copied by reference,
+        # Safe Harbor identifiers are generalized, redacted or skipped
+        for key, value in data.items():
+            if key not in _SAFE_HARBOR:
+                deidentified_data[key] = value
+            elif key == "zip":
+                # Keep first 3 digits of ZIP code if population > 20,000
+                zip_code = str(value)
+                if len(zip_code) >= 3:
+                    deidentified_data[key] = zip_code[:3] + "00"
                 else:
-                    # Remove other identifiers completely
-                    del deidentified_data[identifier]
-                    removed_identifiers.append(identifier)
+                    removed_identifiers.append(key)
+            elif key in _REDACT_FIELDS:
+                # Replace with generic identifiers
+                deidentified_data[key] = f"REDACTED_{key.upper()}"
+                removed_identifiers.append(key)
+            else:
+                # Remove other identifiers completely
+                removed_identifiers.append(key)
+        
+        # Report removed identifiers in Safe Harbor order
+        removed_identifiers.sort(key=_SAFE_HARBOR_RANK.__getitem__)
         
         # Handle dates - reduce to year only if over 89 years old
         if "date_of_birth" in deidentified_data:
             try:
                 dob = datetime.fromisoformat(str(deidentified_data["date_of_birth"]))
-                age = (datetime.now() - dob).days // 365
+                age = (now - dob).days // 365
                 if age > 89:
                     deidentified_data["age_category"] = "90+"
                 else:
@@ -142,7 +281,7 @@ class HIPAAComplianceManager:
         # Add de-identification metadata
         deidentified_data["_deidentification_info"] = {
             "method": method,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "removed_identifiers": removed_identifiers,
             "organization": self.organization_name
         }
@@ -166,10 +305,11 @@ class HIPAAComplianceManager:
         * Consent record dictionary
         """
         consent_id = str(uuid.uuid4())
+        hashed_patient_id = self._hash_identifier(patient_id)
         
         consent_record = {
             "consent_id": consent_id,
-            "patient_id": self._hash_identifier(patient_id),
+            "patient_id": hashed_patient_id,
             "consent_type": consent_type,
             "granted": granted,
             "timestamp": datetime.now().isoformat(),
@@ -183,8 +323,15 @@ class HIPAAComplianceManager:
             self.consent_records[patient_id] = {}
         
         self.consent_records[patient_id][consent_type] = consent_record
+
+        # Parse the expiration once here instead of on every consent check
+        if expiration_date:
+            self._consent_expirations[consent_id] = parse_datetime(expiration_date)
         
-        self.logger.info(f"Consent {consent_type} {'granted' if granted else 'revoked'} for patient {self._hash_identifier(patient_id)}")
+        self.logger.info(
+            "Consent %s %s for patient %s",
+            consent_type, "granted" if granted else "revoked", hashed_patient_id
+        )
         
         return consent_record
     
@@ -213,14 +360,16 @@ class HIPAAComplianceManager:
         
         # Check if consent has expired
         if consent["expiration_date"]:
-            expiration = datetime.fromisoformat(consent["expiration_date"])
+            expiration = self._consent_expirations.get(consent["consent_id"])
+            if expiration is None:
+                expiration = parse_datetime(consent["expiration_date"])
             if datetime.now() > expiration:
                 return False
         
         return True
     
     def log_phi_access(self, user_id: str, patient_id: str, data_accessed: List[str], 
-                      purpose: str, success: bool = True) -> None:
+                      purpose: str, success: bool = True, force: bool = False) -> None:
         """
         Log access to Protected Health Information (PHI).
         
@@ -230,20 +379,102 @@ class HIPAAComplianceManager:
         * data_accessed: List of data fields accessed
         * purpose: Purpose of data access
         * success: Whether access was successful
+        * force: Report the access through the logger even if its purpose is filtered out
         """
+        hashed_user_id = self._hash_identifier(user_id)
+        hashed_patient_id = self._hash_identifier(patient_id)
+
+        now = datetime.now()
         access_record = {
-            "timestamp": datetime.now().isoformat(),
-            "user_id": self._hash_identifier(user_id),
-            "patient_id": self._hash_identifier(patient_id),
+            "timestamp": now.isoformat(),
+            "user_id": hashed_user_id,
+            "patient_id": hashed_patient_id,
             "data_accessed": data_accessed,
             "purpose": purpose,
             "success": success,
             "organization": self.organization_name,
-            "session_id": str(uuid.uuid4())
+            "session_id": self._next_id()
         }
         
+        if len(self.access_log) == self.access_log.maxlen:
+            self._archive_record(self.access_log[0])
+            self._access_log_evicted_ts = self._access_log_ts[0]
         self.access_log.append(access_record)
-        self.logger.info(f"PHI access logged: User {self._hash_identifier(user_id)} accessed data for patient {self._hash_identifier(patient_id)}")
+        self._access_log_ts.append(now.timestamp())
+        if self.access_log_path:
+            # Hand the record to the writer thread; no file I/O on this path
+            with self._pending_cond:
+                self._pending_writes.append(access_record)
+                if len(self._pending_writes) >= _LOG_FLUSH_SIZE:
+                    self._pending_cond.notify()
+            # Without the writer thread of an open manager, write the record now
+            if self._closed:
+                self.flush_access_log()
+        # The audit filter and the logger level only decide whether the access is
+        # reported; the record above is always kept in the audit trail
+        reported = (self._audit_filter is None or not success or force
+                    or purpose in self._audit_filter)
+        if reported and self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "PHI access logged: User %s accessed data for patient %s",
+                hashed_user_id, hashed_patient_id
+            )
+    
+    def flush_access_log(self, sync: bool = False) -> None:
+        """
+        Append pending PHI access records to the access log file in a single write.
+        
+        Parameters:
+        * sync: Whether to fsync the file so the records survive a crash
+        """
+        with self._write_lock:
+            with self._pending_cond:
+                if not self._pending_writes:
+                    return
+                batch, self._pending_writes = self._pending_writes, []
+            with open(self.access_log_path, "a") as fp:
+                fp.writelines(json.dumps(record) + "\n" for record in batch)
+                if sync:
+                    fp.flush()
+                    os.fsync(fp.fileno())
+    
+    def _flush_loop(self) -> None:
+        """
+        Background writer: flush pending access records in batches until closed.
+        """
+        while True:
+            with self._pending_cond:
+                self._pending_cond.wait_for(
+                    lambda: self._closed or len(self._pending_writes) >= _LOG_FLUSH_SIZE,
+                    timeout=_LOG_FLUSH_INTERVAL
+                )
+                closed = self._closed
+            self.flush_access_log()
+            if closed:
+                return
+    
+    def close(self) -> None:
+        """
+        Stop the background writer, write all pending access records to disk and
+        drop the exit hook, so the manager can be garbage collected.
+        """
+        if self._archive is not None:
+            self._archive.close()
+        if self._writer is None:
+            return
+        with self._pending_cond:
+            self._closed = True
+            self._pending_cond.notify()
+        self._writer.join()
+        self._writer = None
+        atexit.unregister(self.flush_access_log)
+        self.flush_access_log(sync=True)
+    
+    def __enter__(self) -> "HIPAAComplianceManager":
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
     
     def detect_potential_breach(self, incident_description: str, affected_individuals: int,
                                data_types: List[str]) -> Dict[str, Any]:
@@ -259,34 +490,26 @@ class HIPAAComplianceManager:
         * Breach assessment dictionary
         """
         breach_id = str(uuid.uuid4())
+        now = datetime.now()
         
-        # Determine breach severity
-        severity = "low"
-        if affected_individuals > 500:
-            severity = "high"  # Requires OCR notification
-        elif affected_individuals > 100:
-            severity = "medium"
+        # Determine breach severity: one level per threshold exceeded (>100, >500)
+        level = (affected_individuals > 100) + (affected_individuals > 500)
         
-        # Check if sensitive data types are involved
-        sensitive_types = ["ssn", "financial", "diagnosis", "treatment", "genetic"]
-        has_sensitive_data = any(data_type in sensitive_types for data_type in data_types)
-        
-        if has_sensitive_data:
-            if severity == "low":
-                severity = "medium"
-            elif severity == "medium":
-                severity = "high"
+        # Sensitive data types raise the severity by one level
+        has_sensitive_data = not _SENSITIVE_TYPES.isdisjoint(data_types)
+        level = min(2, level + has_sensitive_data)
+        severity = _SEVERITY_LEVELS[level]
         
         breach_assessment = {
             "breach_id": breach_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "incident_description": incident_description,
             "affected_individuals": affected_individuals,
             "data_types": data_types,
             "severity": severity,
             "requires_ocr_notification": severity == "high",
             "requires_individual_notification": True,
-            "notification_deadline": (datetime.now() + timedelta(days=60)).isoformat(),
+            "notification_deadline": (now + timedelta(days=60)).isoformat(),
             "investigation_status": "pending",
             "organization": self.organization_name
         }
@@ -295,6 +518,33 @@ class HIPAAComplianceManager:
         
         return breach_assessment
     
+    def assess_breach_severities(self, affected_individuals: Sequence[int],
+                                 data_types: Sequence[Iterable[str]]) -> List[str]:
+        """
+        Classify the severity of many potential breaches at once, e.g. a batch of alerts.
+        
+        Applies the same rules as detect_potential_breach, with the threshold
+        arithmetic vectorized over all incidents.
+        
+        Parameters:
+        * affected_individuals: Number of potentially affected individuals per incident
+        * data_types: Types of data potentially compromised per incident
+        
+        Returns:
+        * Severity level ("low", "medium" or "high") of every incident
+        """
+        affected = np.asarray(affected_individuals)
+        sensitive = np.fromiter(
+            (not _SENSITIVE_TYPES.isdisjoint(types) for types in data_types),
+            dtype=np.int8, count=len(affected)
+        )
+        
+        # One level per threshold exceeded (>100, >500), one more for sensitive data
+        levels = np.minimum(
+            (affected > 100).astype(np.int8) + (affected > 500) + sensitive, 2
+        )
+        return [_SEVERITY_LEVELS[level] for level in levels.tolist()]
+    
     def generate_audit_report(self, start_date: str, end_date: str) -> Dict[str, Any]:
         """
         Generate HIPAA audit report for specified date range.
@@ -306,22 +556,38 @@ class HIPAAComplianceManager:
         Returns:
         * Comprehensive audit report dictionary
         """
-        start_dt = datetime.fromisoformat(start_date)
-        end_dt = datetime.fromisoformat(end_date)
-        
-        # Filter access logs by date range
-        filtered_access_logs = [
-            log for log in self.access_log
-            if start_dt <= datetime.fromisoformat(log["timestamp"]) <= end_dt
-        ]
+        start_ts = parse_datetime(start_date).timestamp()
+        end_ts = parse_datetime(end_date).timestamp()
+        
+        # Filter access logs by date range; entries are appended in time order,
+        # so the range is located by binary search over their epoch timestamps
+        lo = bisect.bisect_left(self._access_log_ts, start_ts)
+        hi = bisect.bisect_right(self._access_log_ts, end_ts)
+        
+        # Records older than the in-memory log were evicted to the archive
+        records_evicted = (self._access_log_evicted_ts is not None
+                           and start_ts <= self._access_log_evicted_ts)
+        if records_evicted:
+            self.logger.warning(
+                "Audit report period starts before the oldest in-memory access record; "
+                "evicted records are in %s", self.archive_path
+            )
+        
+        # Collect the records and their summary statistics in a single pass
+        filtered_access_logs = list(itertools.islice(self.access_log, lo, hi))
+        successful_accesses = 0
+        users = set()
+        patients = set()
+        for log in filtered_access_logs:
+            if log["success"]:
+                successful_accesses += 1
+            users.add(log["user_id"])
+            patients.add(log["patient_id"])
         
-        # Generate summary statistics
         total_access_attempts = len(filtered_access_logs)
-        successful_accesses = len([log for log in filtered_access_logs if log["success"]])
         failed_accesses = total_access_attempts - successful_accesses
-        
-        unique_users = len(set(log["user_id"] for log in filtered_access_logs))
-        unique_patients = len(set(log["patient_id"] for log in filtered_access_logs))
+        unique_users = len(users)
+        unique_patients = len(patients)
         
         audit_report = {
             "report_id": str(uuid.uuid4()),
@@ -340,18 +606,47 @@ class HIPAAComplianceManager:
                 "unique_patients_accessed": unique_patients
             },
             "access_logs": filtered_access_logs,
-            "compliance_status": "compliant" if failed_accesses == 0 else "requires_review"
+            "records_evicted": records_evicted,
+            "compliance_status": (
+                "compliant" if failed_accesses == 0 and not records_evicted else "requires_review"
+            )
         }
+        if records_evicted:
+            audit_report["evicted_records_path"] = self.archive_path
         
         return audit_report
     
+    def _next_id(self) -> str:
+        """Generate a unique ID for internal audit records."""
+        return f"{self._id_nonce}-{next(self._id_counter):x}"
+    
     def _hash_identifier(self, identifier: str) -> str:
         """Hash sensitive identifiers for logging purposes."""
-        return hashlib.sha256(f"{identifier}_{self.covered_entity_id}".encode()).hexdigest()[:16]
+        digest = self._hash_cache.get(identifier)
+        if digest is None:
+            h = self._hash_seed.copy()
+            h.update(identifier.encode())
+            digest = h.hexdigest()[:16]
+
+            # Bound memory by starting over once the cache is full
+            if len(self._hash_cache) >= _HASH_CACHE_SIZE:
+                self._hash_cache.clear()
+            self._hash_cache[identifier] = digest
+        return digest
+    
+    def _append_audit_record(self, record: Dict[str, Any]) -> None:
+        """Append a record to the audit log, archiving the oldest one when it is full."""
+        if len(self.audit_log) == self.audit_log.maxlen:
+            self._archive_record(self.audit_log[0])
+        self.audit_log.append(record)
+    
+    def _archive_record(self, record: Dict[str, Any]) -> None:
+        """Append a record evicted from an in-memory log to the rotating archive."""
+        self._archive.handle(logging.makeLogRecord({"msg": json.dumps(record)}))
     
     def _log_access_attempt(self, validation_result: Dict[str, Any]) -> None:
         """Log minimum necessary validation attempt."""
-        self.audit_log.append({
+        self._append_audit_record({
             "type": "minimum_necessary_validation",
             "timestamp": validation_result["timestamp"],
             "details": validation_result
@@ -361,7 +656,7 @@ class HIPAAComplianceManager:
                             deidentified_data: Dict[str, Any], 
                             removed_identifiers: List[str]) -> None:
         """Log de-identification process."""
-        self.audit_log.append({
+        self._append_audit_record({
             "type": "deidentification",
             "timestamp": datetime.now().isoformat(),
             "removed_identifiers": removed_identifiers,
@@ -1,9 +1,29 @@
 # Example code: Implementing PIPEDA compliance for data access and consent management
 
-import json
+import csv
+import io
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, TextIO, Tuple
+
+import orjson
+
+# Retention and disclosure information is the same for every user, so it is built
+# once at import time and shared, read-only, by all access request responses
+_RETENTION_INFO: Mapping[str, str] = MappingProxyType({
+    "policy": "Personal data retained for business purposes only",
+    "max_retention": "7 years",
+    "deletion_schedule": "Automatic deletion after retention period"
+})
+
+_DISCLOSURE_INFO: Tuple[Mapping[str, str], ...] = (
+    MappingProxyType({
+        "recipient": "Analytics Service Provider",
+        "purpose": "Website performance analysis",
+        "date": "2024-01-15",
+        "consent_basis": "Explicit consent for analytics"
+    }),
+)
 
 class PIPEDAComplianceManager:
     """
@@ -19,6 +39,11 @@ class PIPEDAComplianceManager:
         self.data_requests = {}    # Storage for data access requests
         self.data_store = {}       # Simulated personal data storage
 
+        # Secondary indexes from user ID to that user's consent and request IDs,
+        # so per-user lookups do not scan every stored record
+        self._consents_by_user: Dict[str, List[str]] = {}
+        self._requests_by_user: Dict[str, List[str]] = {}
+
     def record_consent(self, user_id: str, purpose: str, data_types: List[str], 
                       consent_given: bool, method: str = "explicit") -> str:
         """
@@ -34,7 +59,8 @@ class PIPEDAComplianceManager:
         Returns:
         * Consent record ID
         """
-        consent_id = f"consent_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now()
+        consent_id = f"consent_{user_id}_{now.strftime('%Y%m%d_%H%M%S')}"
         
         consent_record = {
             "consent_id": consent_id,
@@ -43,11 +69,13 @@ class PIPEDAComplianceManager:
             "data_types": data_types,
             "consent_given": consent_given,
             "method": method,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now.isoformat(),
             "withdrawn": False,
             "withdrawal_date": None
         }
         
+        if consent_id not in self.consent_records:
+            self._consents_by_user.setdefault(user_id, []).append(consent_id)
         self.consent_records[consent_id] = consent_record
         return consent_id
 
@@ -81,28 +109,28 @@ class PIPEDAComplianceManager:
         Returns:
         * Dictionary containing user's data and processing information
         """
-        request_id = f"req_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        now = datetime.now()
+        request_id = f"req_{user_id}_{now.strftime('%Y%m%d_%H%M%S')}"
         
         # Simulate data retrieval
         user_data = self.data_store.get(user_id, {})
         
         # Get consent history for this user
-        user_consents = [
-            record for record in self.consent_records.values() 
-            if record["user_id"] == user_id
-        ]
+        user_consents = self._user_consents(user_id)
         
         response = {
             "request_id": request_id,
             "user_id": user_id,
             "request_type": request_type,
-            "request_date": datetime.now().isoformat(),
+            "request_date": now.isoformat(),
             "personal_data": user_data,
             "consent_history": user_consents,
-            "data_retention_info": self._get_retention_info(user_id),
-            "third_party_disclosures": self._get_disclosure_info(user_id)
+            "data_retention_info": _RETENTION_INFO,
+            "third_party_disclosures": _DISCLOSURE_INFO
         }
         
+        if request_id not in self.data_requests:
+            self._requests_by_user.setdefault(user_id, []).append(request_id)
         self.data_requests[request_id] = response
         return response
 
@@ -117,14 +145,12 @@ class PIPEDAComplianceManager:
         Returns:
         * Dictionary with consent status and details
         """
-        valid_consents = []
-        
-        for record in self.consent_records.values():
-            if (record["user_id"] == user_id and 
-                purpose in record["purpose"] and 
-                record["consent_given"] and 
-                not record["withdrawn"]):
-                valid_consents.append(record)
+        valid_consents = [
+            record for record in self._user_consents(user_id)
+            if (purpose in record["purpose"] and
+                record["consent_given"] and
+                not record["withdrawn"])
+        ]
         
         return {
             "user_id": user_id,
@@ -134,6 +160,21 @@ class PIPEDAComplianceManager:
             "check_timestamp": datetime.now().isoformat()
         }
 
+    def active_consents(self, user_id: str) -> List[Dict[str, Any]]:
+        """
+        Get the consent records of a user that have not been withdrawn.
+
+        Parameters:
+        * user_id: User to get consents for
+
+        Returns:
+        * List of the user's active consent records
+        """
+        return [
+            record for record in self._user_consents(user_id)
+            if not record["withdrawn"]
+        ]
+
     def generate_privacy_report(self, user_id: str) -> Dict[str, Any]:
         """
         Generate comprehensive privacy report for user as required by PIPEDA.
@@ -144,14 +185,11 @@ class PIPEDAComplianceManager:
         Returns:
         * Complete privacy report including all data processing activities
         """
-        user_consents = [
-            record for record in self.consent_records.values() 
-            if record["user_id"] == user_id
-        ]
-        
+        user_consents = self._user_consents(user_id)
+
         user_requests = [
-            request for request in self.data_requests.values() 
-            if request["user_id"] == user_id
+            self.data_requests[request_id]
+            for request_id in self._requests_by_user.get(user_id, ())
         ]
         
         return {
@@ -168,49 +206,49 @@ class PIPEDAComplianceManager:
             }
         }
 
-    def _get_retention_info(self, user_id: str) -> Dict[str, str]:
-        """
-        Get data retention information for user.
-        """
-        return {
-            "policy": "Personal data retained for business purposes only",
-            "max_retention": "7 years",
-            "deletion_schedule": "Automatic deletion after retention period"
-        }
-
-    def _get_disclosure_info(self, user_id: str) -> List[Dict[str, str]]:
+    def _user_consents(self, user_id: str) -> List[Dict[str, Any]]:
         """
-        Get information about third-party disclosures.
+        Get all consent records of a user via the per-user index.
         """
         return [
-            {
-                "recipient": "Analytics Service Provider",
-                "purpose": "Website performance analysis",
-                "date": "2024-01-15",
-                "consent_basis": "Explicit consent for analytics"
-            }
+            self.consent_records[consent_id]
+            for consent_id in self._consents_by_user.get(user_id, ())
         ]
 
-    def export_user_data(self, user_id: str, format_type: str = "json") -> str:
+    def export_user_data(self, user_id: str, format_type: str = "json",
+                         file: Optional[TextIO] = None) -> Optional[str]:
         """
         Export user data in portable format as required by PIPEDA.
 
         Parameters:
         * user_id: User whose data to export
         * format_type: Export format (json, csv, xml)
+        * file: Optional text stream (e.g. an open file or response body) that the
+          export is written to directly instead of being built as a string
 
         Returns:
-        * Exported data as string
+        * Exported data as string, or None when it was written to file
         """
-        user_data = self.process_access_request(user_id, "export")
+        # The shared read-only fields become plain dicts and lists for the export
+        user_data = {
+            **self.process_access_request(user_id, "export"),
+            "data_retention_info": dict(_RETENTION_INFO),
+            "third_party_disclosures": [dict(disclosure) for disclosure in _DISCLOSURE_INFO]
+        }
+        out = file if file is not None else io.StringIO()
         
         if format_type.lower() == "json":
-            return json.dumps(user_data, indent=2)
+            out.write(orjson.dumps(
+                user_data, default=str,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode())
         elif format_type.lower() == "csv":
-            # Simplified CSV export
-            csv_data = "field,value\n"
-            for key, value in user_data.get("personal_data", {}).items():
-                csv_data += f"{key},{value}\n"
-            return csv_data
+            # Simplified CSV export; csv.writer quotes values containing
+            # commas, quotes or newlines and emits the rows one at a time
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(["field", "value"])
+            writer.writerows(user_data.get("personal_data", {}).items())
         else:
-            return str(user_data)
\ No newline at end of file
+            out.write(str(user_data))
+        
+        return out.getvalue() if file is None else None
\ No newline at end of file
@@ -1,14 +1,35 @@
 # CCPA Compliance Example: Social Media Platform Implementation
 
+import contextlib
+import functools
+import io
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
 
 from ccpa import CCPAComplianceManager, CCPARequestType
 from datetime import datetime
+from itertools import islice
 import json
 
 
+def _buffered_output(func):
+    """
+    Collect everything a demo prints and write it to stdout in a single call,
+    instead of one write per print() (also on error, so no output is lost).
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        buffer = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buffer):
+                return func(*args, **kwargs)
+        finally:
+            sys.stdout.write(buffer.getvalue())
+    return wrapper
+
+
+@_buffered_output
 def demonstrate_ccpa_compliance():
     """
     Demonstrate CCPA compliance implementation for a social media platform.
@@ -46,13 +67,13 @@ def demonstrate_ccpa_compliance():
     }
     
     # Simulate some data sales
-    ccpa_manager.sale_records["sale_001"] = {
+    ccpa_manager.record_sale("sale_001", {
         "consumer_id": consumer_id,
         "buyer": "MarketingCorp Inc.",
         "date": "2024-01-15",
         "categories_sold": ["commercial_info", "internet_activity"],
         "purpose": "Targeted advertising"
-    }
+    })
     
     print("1. Consumer Right to Know Request")
     print("-" * 40)
@@ -79,9 +100,12 @@ def demonstrate_ccpa_compliance():
         
         print("\nData Categories and Details:")
         for category in know_response['categories_collected'][:3]:  # Show first 3
-            print(f"  • {category['category']}: {len(category['data_points'])} data points")
-            print(f"    Source: {category['source']}")
-            print(f"    Purpose: {category['business_purpose']}")
+            # Look up each field once and print the entry in a single call
+            name, points = category['category'], category['data_points']
+            source, purpose = category['source'], category['business_purpose']
+            print(f"  • {name}: {len(points)} data points\n"
+                  f"    Source: {source}\n"
+                  f"    Purpose: {purpose}")
         
         print(f"\nData sales to third parties: {len(know_response['sale_history'])}")
         if know_response['sale_history']:
@@ -144,6 +168,7 @@ def demonstrate_ccpa_compliance():
     print("\n=== CCPA Consumer Rights Demonstration Complete ===")
 
 
+@_buffered_output
 def demonstrate_ccpa_privacy_policy():
     """
     Demonstrate CCPA privacy policy disclosure requirements.
@@ -158,10 +183,12 @@ def demonstrate_ccpa_privacy_policy():
     print("1. Categories of Personal Information")
     print("-" * 40)
     
-    collected_categories = [cat for cat in privacy_disclosures['categories_collected'] if cat['collected']]
-    print(f"We collect {len(collected_categories)} categories of personal information:")
+    # Count the collected categories, but only materialize the first 5 shown
+    categories = privacy_disclosures['categories_collected']
+    collected_count = sum(1 for cat in categories if cat['collected'])
+    print(f"We collect {collected_count} categories of personal information:")
     
-    for category in collected_categories[:5]:  # Show first 5
+    for category in islice((cat for cat in categories if cat['collected']), 5):  # Show first 5
         print(f"\n• {category['category'].replace('_', ' ').title()}:")
         print(f"  Examples: {', '.join(category['examples'][:3])}")
         print(f"  Sold to third parties: {'Yes' if category['sold'] else 'No'}")
@@ -191,6 +218,7 @@ def demonstrate_ccpa_privacy_policy():
     print(f"Web Form: {contact['web_form']}")
 
 
+@_buffered_output
 def demonstrate_ccpa_data_mapping():
     """
     Demonstrate data mapping and inventory for CCPA compliance.
@@ -230,12 +258,15 @@ def demonstrate_ccpa_data_mapping():
     print("Data System Inventory:")
     print("-" * 40)
     
-    for system, details in data_inventory.items():
-        print(f"\n{system.replace('_', ' ').title()}:")
-        print(f"  CCPA Categories: {', '.join(details['categories'])}")
-        print(f"  Retention Period: {details['retention']}")
-        print(f"  Third-Party Sharing: {', '.join(details['third_party_sharing'])}")
-        print(f"  Sale Status: {details['sale_status']}")
+    # Render the whole inventory as one string instead of printing field by field
+    print("".join(
+        f"\n{system.replace('_', ' ').title()}:\n"
+        f"  CCPA Categories: {', '.join(details['categories'])}\n"
+        f"  Retention Period: {details['retention']}\n"
+        f"  Third-Party Sharing: {', '.join(details['third_party_sharing'])}\n"
+        f"  Sale Status: {details['sale_status']}\n"
+        for system, details in data_inventory.items()
+    ), end="")
     
     print("\n" + "="*50)
     print("CCPA Compliance Checklist:")
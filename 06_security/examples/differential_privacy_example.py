@@ -1,11 +1,10 @@
 # Example implementation of Differential Privacy with mock healthcare data
 
 import numpy as np
-import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import accuracy_score, classification_report
-import matplotlib.pyplot as plt
 
 # Import the DifferentiallyPrivateTrainer class
 import sys
@@ -13,50 +12,87 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from core.differential_privacy import DifferentiallyPrivateTrainer
 
+# Features of the mock healthcare dataset, in column order
+FEATURE_NAMES = ['age', 'bmi', 'glucose', 'blood_pressure', 'insulin', 'family_history']
+
+# Generated healthcare dataset, cached next to this module so re-runs skip generation
+_DATA_CACHE_PATH = os.path.join(os.path.dirname(__file__), "healthcare_data.npz")
+
+# Diabetes risk rule as weights per feature column plus a constant offset:
+# (age - 50) / 30 + (bmi - 25) / 10 + (glucose - 100) / 50
+# + (blood_pressure - 80) / 20 + family_history * 0.5 (insulin is unused)
+_RISK_WEIGHTS = np.array([1 / 30, 1 / 10, 1 / 50, 1 / 20, 0.0, 0.5], dtype=np.float32)
+_RISK_BIAS = -(50 / 30 + 25 / 10 + 100 / 50 + 80 / 20)
+
 def create_mock_healthcare_data():
     """
     Create mock healthcare data for diabetes prediction.
     This simulates sensitive medical data that needs privacy protection.
+    
+    Returns:
+    * Tuple of (feature matrix, diabetes labels)
     """
-    np.random.seed(42)  # For reproducible results
+    # Reuse the dataset generated by an earlier run
+    if os.path.exists(_DATA_CACHE_PATH):
+        with np.load(_DATA_CACHE_PATH) as cached:
+            return cached["X"], cached["y"]
+    
+    rng = np.random.default_rng(42)  # Seeded PCG64 generator for reproducible results
     
     # Generate 2000 mock patient records
     n_samples = 2000
     
     # Mock medical features (sensitive data)
-    age = np.random.normal(55, 15, n_samples).astype(int)
-    bmi = np.random.normal(28, 6, n_samples)
-    glucose = np.random.normal(120, 30, n_samples)
-    blood_pressure = np.random.normal(80, 12, n_samples)
-    insulin = np.random.normal(100, 50, n_samples)
-    family_history = np.random.choice([0, 1], n_samples, p=[0.7, 0.3])
+    age = rng.normal(55, 15, n_samples).astype(int)
+    bmi = rng.normal(28, 6, n_samples)
+    glucose = rng.normal(120, 30, n_samples)
+    blood_pressure = rng.normal(80, 12, n_samples)
+    insulin = rng.normal(100, 50, n_samples)
+    family_history = rng.choice([0, 1], n_samples, p=[0.7, 0.3])
     
-    # Create diabetes prediction target based on medical rules
-    # Higher glucose, BMI, age, family history = higher diabetes risk
-    diabetes_risk = (
-        (glucose - 100) / 50 +           # Glucose contribution
-        (bmi - 25) / 10 +                # BMI contribution
-        (age - 50) / 30 +                # Age contribution
-        family_history * 0.5 +           # Family history contribution
-        (blood_pressure - 80) / 20       # Blood pressure contribution
-    )
+    # Write the features straight into one float32 matrix (column order matches
+    # FEATURE_NAMES) instead of wrapping them in a DataFrame
+    X = np.empty((n_samples, len(FEATURE_NAMES)), dtype=np.float32)
+    for k, column in enumerate((age, bmi, glucose, blood_pressure, insulin, family_history)):
+        X[:, k] = column
     
+    # Create diabetes prediction target based on medical rules, as one weighted
+    # sum over the feature matrix instead of one temporary array per term
+    # Higher glucose, BMI, age, family history = higher diabetes risk
     # Add some randomness and convert to binary (1 = diabetes, 0 = no diabetes)
-    diabetes_risk += np.random.normal(0, 0.2, n_samples)
-    diabetes = (diabetes_risk > 0.5).astype(int)
+    diabetes_risk = X @ _RISK_WEIGHTS + _RISK_BIAS + rng.normal(0, 0.2, n_samples)
+    diabetes = diabetes_risk > 0.5
+    
+    y = diabetes.astype(np.int8)
+    np.savez(_DATA_CACHE_PATH, X=X, y=y)
+    return X, y
+
+def _train_one(epsilon, X_train, y_train, X_test, y_test):
+    """
+    Train and evaluate one differentially private model (runs in a worker process).
     
-    # Create DataFrame with patient data
-    data = pd.DataFrame({
-        'age': age,
-        'bmi': bmi,
-        'glucose': glucose,
-        'blood_pressure': blood_pressure,
-        'insulin': insulin,
-        'family_history': family_history,
-        'diabetes': diabetes
-    })
+    Returns:
+    * Tuple of (result dictionary, error message or None)
+    """
+    # Classify the privacy level once per epsilon
+    privacy_level = 'High' if epsilon < 1 else 'Medium' if epsilon < 3 else 'Low'
     
-    return data
+    # Train the differentially private model
+    dp_trainer = DifferentiallyPrivateTrainer(epsilon=epsilon, delta=1e-5)
+    try:
+        dp_trainer.train(X_train, y_train, batch_size=32, epochs=5)
+        
+        # Make predictions and calculate accuracy
+        predictions = dp_trainer.predict(X_test)
+        accuracy, error = accuracy_score(y_test, predictions), None
+    except Exception as e:
+        accuracy, error = 0.0, str(e)
+    
+    return {
+        'epsilon': epsilon,
+        'accuracy': accuracy,
+        'privacy_level': privacy_level
+    }, error
 
 def compare_privacy_vs_accuracy():
     """
@@ -66,58 +102,42 @@ def compare_privacy_vs_accuracy():
     
     # Create mock healthcare data
     print("1. Creating mock healthcare dataset...")
-    data = create_mock_healthcare_data()
-    print(f"   Dataset created with {len(data)} patient records")
-    print(f"   Diabetes prevalence: {data['diabetes'].mean():.1%}\n")
-    
-    # Prepare features and target
-    feature_names = ['age', 'bmi', 'glucose', 'blood_pressure', 'insulin', 'family_history']
-    X = data[feature_names].values
-    y = data['diabetes'].values
+    X, y = create_mock_healthcare_data()
+    print(f"   Dataset created with {len(X)} patient records")
+    print(f"   Diabetes prevalence: {y.mean():.1%}\n")
     
     # Split data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
     
-    # Scale features
+    # Scale features and convert them (and the training labels) once to the
+    # contiguous float32 layout the trainer uses, so no epsilon run re-converts them
     scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    X_train_scaled = np.ascontiguousarray(scaler.fit_transform(X_train), dtype=np.float32)
+    X_test_scaled = np.ascontiguousarray(scaler.transform(X_test), dtype=np.float32)
+    y_train = np.ascontiguousarray(y_train, dtype=np.float32)
     
     # Test different privacy levels
     privacy_levels = [0.1, 0.5, 1.0, 2.0, 5.0]  # Different epsilon values
-    results = []
     
     print("2. Training models with different privacy levels...\n")
     
-    for epsilon in privacy_levels:
-        print(f"Training with epsilon = {epsilon} (privacy level: {'High' if epsilon < 1 else 'Medium' if epsilon < 3 else 'Low'})")
-        
-        # Train differentially private model
-        dp_trainer = DifferentiallyPrivateTrainer(epsilon=epsilon, delta=1e-5)
-        
-        # Train the differentially private model
-        try:
-            dp_trainer.train(X_train_scaled, y_train, batch_size=32, epochs=5)
-            
-            # Make predictions and calculate accuracy
-            predictions = dp_trainer.predict(X_test_scaled)
-            accuracy = accuracy_score(y_test, predictions)
-            
-            results.append({
-                'epsilon': epsilon,
-                'accuracy': accuracy,
-                'privacy_level': 'High' if epsilon < 1 else 'Medium' if epsilon < 3 else 'Low'
-            })
+    # The runs are independent (each trainer draws its own noise), so they are
+    # trained in parallel worker processes
+    outcomes = Parallel(n_jobs=min(len(privacy_levels), os.cpu_count() or 1), backend="loky")(
+        delayed(_train_one)(epsilon, X_train_scaled, y_train, X_test_scaled, y_test)
+        for epsilon in privacy_levels
+    )
+    
+    # Report the runs in epsilon order once all of them have finished
+    results = []
+    for result, error in outcomes:
+        print(f"Training with epsilon = {result['epsilon']} (privacy level: {result['privacy_level']})")
+        if error is None:
             print(f"   ✓ Model trained successfully")
-            print(f"   ✓ Accuracy: {accuracy:.3f}")
-        except Exception as e:
-            print(f"   ✗ Training failed: {e}")
-            results.append({
-                'epsilon': epsilon,
-                'accuracy': 0.0,
-                'privacy_level': 'High' if epsilon < 1 else 'Medium' if epsilon < 3 else 'Low'
-            })
-        
+            print(f"   ✓ Accuracy: {result['accuracy']:.3f}")
+        else:
+            print(f"   ✗ Training failed: {error}")
+        results.append(result)
         print()
     
     return results
@@ -157,37 +177,48 @@ def demonstrate_privacy_attack_simulation():
         print(f"  Interpretation: {'Safe' if scenario['attack_success'] < 0.6 else 'Risky'}")
         print()
 
+# Static text printed by demonstrate_gdpr_compliance(), one entry per line
+_GDPR_COMPLIANCE_LINES = (
+    "=== GDPR Compliance Demonstration ===\n",
+
+    "1. Data Minimization:",
+    "   ✓ Only necessary features are used for training",
+    "   ✓ No individual identifiers are stored",
+    "   ✓ Model cannot reconstruct individual records\n",
+
+    "2. Privacy by Design:",
+    "   ✓ Privacy protection is built into the training process",
+    "   ✓ Mathematical guarantees prevent data reconstruction",
+    "   ✓ No need for data anonymization (privacy is inherent)\n",
+
+    "3. Right to be Forgotten:",
+    "   ✓ Individual records cannot be identified from the model",
+    "   ✓ Removing one person's data has minimal impact",
+    "   ✓ Model remains functional without specific individuals\n",
+
+    "4. Accountability:",
+    "   ✓ Privacy parameters (epsilon, delta) are documented",
+    "   ✓ Privacy guarantees are mathematically provable",
+    "   ✓ Audit trail shows privacy protection measures\n",
+)
+
 def demonstrate_gdpr_compliance():
     """
     Demonstrate how differential privacy ensures GDPR compliance.
     """
-    print("=== GDPR Compliance Demonstration ===\n")
-    
-    print("1. Data Minimization:")
-    print("   ✓ Only necessary features are used for training")
-    print("   ✓ No individual identifiers are stored")
-    print("   ✓ Model cannot reconstruct individual records\n")
-    
-    print("2. Privacy by Design:")
-    print("   ✓ Privacy protection is built into the training process")
-    print("   ✓ Mathematical guarantees prevent data reconstruction")
-    print("   ✓ No need for data anonymization (privacy is inherent)\n")
-    
-    print("3. Right to be Forgotten:")
-    print("   ✓ Individual records cannot be identified from the model")
-    print("   ✓ Removing one person's data has minimal impact")
-    print("   ✓ Model remains functional without specific individuals\n")
-    
-    print("4. Accountability:")
-    print("   ✓ Privacy parameters (epsilon, delta) are documented")
-    print("   ✓ Privacy guarantees are mathematically provable")
-    print("   ✓ Audit trail shows privacy protection measures\n")
+    sys.stdout.write("\n".join(_GDPR_COMPLIANCE_LINES) + "\n")
 
 def create_visualization(results):
     """
     Create visualization of privacy vs accuracy trade-off.
     """
     try:
+        # Import matplotlib only when a plot is drawn; the figure is only saved
+        # to a file, so no GUI backend is needed
+        os.environ.setdefault("MPLBACKEND", "Agg")
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Patch
+        
         plt.figure(figsize=(10, 6))
         
         epsilons = [r['epsilon'] for r in results]
@@ -208,7 +239,6 @@ def create_visualization(results):
         plt.grid(True, alpha=0.3)
         
         # Add legend
-        from matplotlib.patches import Patch
         legend_elements = [
             Patch(facecolor='red', alpha=0.7, label='High Privacy (ε < 1)'),
             Patch(facecolor='orange', alpha=0.7, label='Medium Privacy (ε < 3)'),
@@ -223,31 +253,36 @@ def create_visualization(results):
     except Exception as e:
         print(f"Visualization failed: {e}")
 
+# Static text printed by practical_implementation_guide(), one entry per line
+_IMPLEMENTATION_GUIDE_LINES = (
+    "=== Practical Implementation Guide ===\n",
+
+    "1. Choose Privacy Parameters:",
+    "   • ε (epsilon): 0.1-1.0 for high privacy, 1.0-3.0 for medium, >3.0 for low",
+    "   • δ (delta): Typically 1e-5 or smaller",
+    "   • Balance: Higher privacy = lower accuracy\n",
+
+    "2. Data Preparation:",
+    "   • Normalize/standardize features",
+    "   • Remove identifiers and sensitive fields",
+    "   • Ensure data quality and consistency\n",
+
+    "3. Model Selection:",
+    "   • Logistic regression works well with DP",
+    "   • Neural networks can use DP-SGD",
+    "   • Tree-based models have limited DP support\n",
+
+    "4. Evaluation:",
+    "   • Test privacy guarantees with membership inference attacks",
+    "   • Monitor accuracy degradation",
+    "   • Validate privacy parameters with domain experts\n",
+)
+
 def practical_implementation_guide():
     """
     Provide practical guidance for implementing differential privacy.
     """
-    print("=== Practical Implementation Guide ===\n")
-    
-    print("1. Choose Privacy Parameters:")
-    print("   • ε (epsilon): 0.1-1.0 for high privacy, 1.0-3.0 for medium, >3.0 for low")
-    print("   • δ (delta): Typically 1e-5 or smaller")
-    print("   • Balance: Higher privacy = lower accuracy\n")
-    
-    print("2. Data Preparation:")
-    print("   • Normalize/standardize features")
-    print("   • Remove identifiers and sensitive fields")
-    print("   • Ensure data quality and consistency\n")
-    
-    print("3. Model Selection:")
-    print("   • Logistic regression works well with DP")
-    print("   • Neural networks can use DP-SGD")
-    print("   • Tree-based models have limited DP support\n")
-    
-    print("4. Evaluation:")
-    print("   • Test privacy guarantees with membership inference attacks")
-    print("   • Monitor accuracy degradation")
-    print("   • Validate privacy parameters with domain experts\n")
+    sys.stdout.write("\n".join(_IMPLEMENTATION_GUIDE_LINES) + "\n")
 
 if __name__ == "__main__":
     print("=== Differential Privacy in Healthcare Example ===\n")
@@ -1,9 +1,9 @@
 # Example implementation of HIPAA compliance for healthcare AI applications
 
 import numpy as np
-import pandas as pd
 from datetime import datetime, timedelta
-import json
+
+import orjson
 
 # Import the HIPAAComplianceManager class from hipaa.py
 import sys
@@ -11,43 +11,89 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from core.hipaa import HIPAAComplianceManager
 
+# orjson options for printing records: indented, with NumPy scalars serialized natively
+_PRETTY_JSON = orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
 def create_mock_patient_data():
     """
     Create mock patient data for HIPAA compliance demonstration.
+    
+    The data is generated column-wise, with one RNG call per field for all
+    patients; use patient_record to materialize a single patient as a dict.
+    
+    Returns:
+    * Dictionary mapping each field to an array with one entry per patient
     """
-    np.random.seed(42)  # For reproducible results
+    rng = np.random.default_rng(42)  # Seeded PCG64 generator for reproducible results
     
     # Generate 50 mock patient records
     n_patients = 50
     
-    patients = []
-    for i in range(n_patients):
-        patient = {
-            "patient_id": f"PT{i+1:03d}",
-            "name": f"Patient {i+1}",
-            "date_of_birth": (datetime.now() - timedelta(days=np.random.randint(365*20, 365*90))).isoformat(),
-            "ssn": f"{np.random.randint(100,999)}-{np.random.randint(10,99)}-{np.random.randint(1000,9999)}",
-            "address": f"{np.random.randint(100,9999)} Main St",
-            "city": "Healthcare City",
-            "state": "HC",
-            "zip": f"{np.random.randint(10000,99999)}",
-            "phone": f"555-{np.random.randint(100,999)}-{np.random.randint(1000,9999)}",
-            "email": f"patient{i+1}@email.com",
-            "mrn": f"MRN{i+1:06d}",
-            "diagnosis": np.random.choice(["Diabetes", "Hypertension", "Asthma", "Depression", "Arthritis"]),
-            "medications": np.random.choice(["Metformin", "Lisinopril", "Albuterol", "Sertraline", "Ibuprofen"]),
-            "allergies": np.random.choice(["None", "Penicillin", "Peanuts", "Shellfish", "Latex"]),
-            "vital_signs": {
-                "blood_pressure": f"{np.random.randint(90,180)}/{np.random.randint(60,120)}",
-                "heart_rate": np.random.randint(60, 100),
-                "temperature": round(np.random.uniform(97.0, 101.0), 1)
-            },
-            "insurance_info": f"INS{np.random.randint(100000,999999)}",
-            "provider_id": f"DR{np.random.randint(1,20):03d}"
-        }
-        patients.append(patient)
+    return {
+        "number": np.arange(1, n_patients + 1),
+        "age_days": rng.integers(365*20, 365*90, n_patients),
+        "ssn": np.column_stack((
+            rng.integers(100, 999, n_patients),
+            rng.integers(10, 99, n_patients),
+            rng.integers(1000, 9999, n_patients)
+        )),
+        "street_number": rng.integers(100, 9999, n_patients),
+        "zip": rng.integers(10000, 99999, n_patients),
+        "phone": np.column_stack((
+            rng.integers(100, 999, n_patients),
+            rng.integers(1000, 9999, n_patients)
+        )),
+        "diagnosis": rng.choice(["Diabetes", "Hypertension", "Asthma", "Depression", "Arthritis"], n_patients),
+        "medications": rng.choice(["Metformin", "Lisinopril", "Albuterol", "Sertraline", "Ibuprofen"], n_patients),
+        "allergies": rng.choice(["None", "Penicillin", "Peanuts", "Shellfish", "Latex"], n_patients),
+        "blood_pressure": np.column_stack((
+            rng.integers(90, 180, n_patients),
+            rng.integers(60, 120, n_patients)
+        )),
+        "heart_rate": rng.integers(60, 100, n_patients),
+        "temperature": np.round(rng.uniform(97.0, 101.0, n_patients), 1),
+        "insurance_number": rng.integers(100000, 999999, n_patients),
+        "provider_number": rng.integers(1, 20, n_patients)
+    }
+
+def patient_record(patients, i):
+    """
+    Build the record of one mock patient from the columnar patient data.
+    
+    Parameters:
+    * patients: Columnar data returned by create_mock_patient_data
+    * i: Index of the patient
     
-    return patients
+    Returns:
+    * Dictionary with the patient's fields as plain Python values
+    """
+    number = int(patients["number"][i])
+    ssn = patients["ssn"][i]
+    phone = patients["phone"][i]
+    blood_pressure = patients["blood_pressure"][i]
+    return {
+        "patient_id": f"PT{number:03d}",
+        "name": f"Patient {number}",
+        "date_of_birth": (datetime.now() - timedelta(days=int(patients["age_days"][i]))).isoformat(),
+        "ssn": f"{ssn[0]}-{ssn[1]}-{ssn[2]}",
+        "address": f"{patients['street_number'][i]} Main St",
+        "city": "Healthcare City",
+        "state": "HC",
+        "zip": f"{patients['zip'][i]}",
+        "phone": f"555-{phone[0]}-{phone[1]}",
+        "email": f"patient{number}@email.com",
+        "mrn": f"MRN{number:06d}",
+        "diagnosis": str(patients["diagnosis"][i]),
+        "medications": str(patients["medications"][i]),
+        "allergies": str(patients["allergies"][i]),
+        "vital_signs": {
+            "blood_pressure": f"{blood_pressure[0]}/{blood_pressure[1]}",
+            "heart_rate": int(patients["heart_rate"][i]),
+            "temperature": float(patients["temperature"][i])
+        },
+        "insurance_info": f"INS{patients['insurance_number'][i]}",
+        "provider_id": f"DR{patients['provider_number'][i]:03d}"
+    }
 
 def demonstrate_minimum_necessary():
     """
@@ -104,15 +150,15 @@ def demonstrate_deidentification():
     
     # Create sample patient data
     patients = create_mock_patient_data()
-    sample_patient = patients[0]
+    sample_patient = patient_record(patients, 0)
     
     print("1. Original Patient Data (contains PHI):")
-    print(json.dumps(sample_patient, indent=2))
+    print(orjson.dumps(sample_patient, option=_PRETTY_JSON).decode())
     print("\n" + "="*60 + "\n")
     
     print("2. De-identified Patient Data (Safe Harbor method):")
     deidentified_patient = hipaa_manager.deidentify_data(sample_patient)
-    print(json.dumps(deidentified_patient, indent=2))
+    print(orjson.dumps(deidentified_patient, option=_PRETTY_JSON).decode())
     print("\n" + "="*60 + "\n")
     
     print("3. De-identification Summary:")
@@ -6,7 +6,6 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'core'))
 
 from pipeda import PIPEDAComplianceManager
 from datetime import datetime
-import json
 
 
 def demonstrate_pipeda_compliance():
@@ -117,10 +116,7 @@ def demonstrate_pipeda_compliance():
     print("-" * 40)
     
     # Analyze impact of consent changes on business operations
-    remaining_consents = [
-        record for record in pipeda_manager.consent_records.values()
-        if record["user_id"] == user_id and not record["withdrawn"]
-    ]
+    remaining_consents = pipeda_manager.active_consents(user_id)
     
     print(f"Remaining active consents: {len(remaining_consents)}")
     for consent in remaining_consents:
@@ -3,13 +3,31 @@ import shap
 import xgboost
 import numpy as np
 
+
+def batched_explain(explainer, X_batch):
+    """
+    Explain a whole batch of predictions with a single SHAP call.
+
+    Build the explainer once after (re)fitting the model and keep it next to
+    the model, so it never explains predictions with outdated trees.
+
+    Parameters:
+    * explainer: shap.Explainer built from the currently fitted model
+    * X_batch: 2-D array with one row per prediction to explain
+
+    Returns:
+    * shap.Explanation with one row of SHAP values per input row
+    """
+    return explainer(X_batch)
+
+
 # Generate sample data and train an XGBoost model.
 X, y = np.random.rand(100, 5), np.random.randint(2, size=100)
 model = xgboost.XGBClassifier().fit(X, y)
 
 # Initialize SHAP explainer for the trained model.
 explainer = shap.Explainer(model)
-# Compute SHAP values for the first instance.
-shap_values = explainer(X[:1])
-# Display SHAP summary plot.
-shap.summary_plot(shap_values)
\ No newline at end of file
+# Compute SHAP values for all instances in one batched call.
+shap_values = batched_explain(explainer, X)
+# Display SHAP beeswarm plot.
+shap.plots.beeswarm(shap_values)
@@ -1,13 +1,20 @@
 # Section: Flask API Rate Limiting
+import os
+
 from flask import Flask, request, jsonify
 from flask_limiter import Limiter
 
 # Create Flask application instance.
 app = Flask(__name__)
-# Initialize rate limiter using the remote address as key.
+# Initialize rate limiter using the remote address as key. Counters live in the
+# storage named by RATE_LIMIT_STORAGE_URI (e.g. redis://localhost:6379), so all
+# worker processes share them; without it they stay in process memory. The
+# fixed-window strategy needs a single INCR (+ EXPIRE) per request.
 limiter = Limiter(
     app=app,
-    key_func=lambda: request.remote_addr
+    key_func=lambda: request.remote_addr,
+    storage_uri=os.getenv("RATE_LIMIT_STORAGE_URI", "memory://"),
+    strategy="fixed-window",
 )
 
 @app.route("/ai-service", methods=["POST"])
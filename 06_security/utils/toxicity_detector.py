@@ -1,8 +1,27 @@
 # Section: Response Filtering using Toxicity Detector
-from transformers import pipeline
+import os
 
-# Initialize toxicity detector with a pre-trained model.
-toxicity_detector = pipeline("text-classification", model="unitary/toxic-bert")
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+# Initialize toxicity detector with a pre-trained model. For CPU inference the
+# Linear layers are dynamically quantized to int8, which cuts the weight traffic
+# per forward pass by 4x; set TOXICITY_QUANTIZE=0 to keep the FP32 weights.
+_MODEL_NAME = "unitary/toxic-bert"
+_model = AutoModelForSequenceClassification.from_pretrained(_MODEL_NAME)
+if os.getenv("TOXICITY_QUANTIZE", "1") != "0":
+    _model = torch.ao.quantization.quantize_dynamic(
+        _model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+toxicity_detector = pipeline(
+    "text-classification",
+    model=_model,
+    tokenizer=AutoTokenizer.from_pretrained(_MODEL_NAME),
+)
+
+# Responses scoring above this toxicity are replaced by the block message.
+TOXICITY_THRESHOLD = 0.7
+BLOCKED_MESSAGE = "Blocked: AI response contains inappropriate content."
 
 
 def filter_toxic_response(ai_response):
@@ -17,11 +36,34 @@ def filter_toxic_response(ai_response):
     """
     toxicity_score = toxicity_detector(ai_response)[0]["score"]
     print(toxicity_score)
-    if toxicity_score > 0.7:
-        return "Blocked: AI response contains inappropriate content."
+    if toxicity_score > TOXICITY_THRESHOLD:
+        return BLOCKED_MESSAGE
     return ai_response
 
 
+def filter_toxic_responses(ai_responses, batch_size=32):
+    """
+    Evaluate many AI responses for toxicity with batched model calls.
+
+    The responses are classified in batches (padded to the longest response of
+    each batch) instead of one forward pass per response.
+
+    Parameters:
+    * ai_responses: Iterable of strings containing the AI responses.
+    * batch_size: Number of responses classified per forward pass.
+
+    Returns:
+    * List with the filtered response or a block message for every response.
+    """
+    # Materialize once: iterators would be exhausted by the classifier call
+    ai_responses = list(ai_responses)
+    results = toxicity_detector(ai_responses, batch_size=batch_size, truncation=True)
+    return [
+        BLOCKED_MESSAGE if result["score"] > TOXICITY_THRESHOLD else ai_response
+        for ai_response, result in zip(ai_responses, results)
+    ]
+
+
 # Example usage of filter_toxic_response
 ai_response = "I think certain groups of people are inferior."
 print(filter_toxic_response(ai_response))
\ No newline at end of file